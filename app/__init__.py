@@ -1,6 +1,9 @@
 from flask import Flask
 from .config import Config
-from .extensions import db
+from .extensions import db, cache, instrumentation, pool_monitor, replicas, stats_cache, versions
+from .utils.pool import configure_pools
+from .utils.routing import configure_replicas
+from .utils.serializers import configure_json
 from flask_cors import CORS
 
 def create_app(config_class=Config):
@@ -9,8 +12,17 @@ def create_app(config_class=Config):
     
     # 启用CORS，支持跨域请求
     CORS(app, resources={r"/*": {"origins": "*"}})
+    configure_json(app)
 
+    configure_replicas(app.config)
+    configure_pools(app.config)
     db.init_app(app)
+    pool_monitor.init_app(app)
+    replicas.init_app(app)
+    cache.init_app(app)
+    stats_cache.init_app(app)
+    versions.init_app(app)
+    instrumentation.init_app(app)
 
     from .routes import department_routes # 在这里添加所有的 routes
     from .routes import doctor_routes
@@ -19,6 +31,9 @@ def create_app(config_class=Config):
     from .routes import visit_routes
     from .routes import ward_routes
     from .routes import sta_routes
+    from .routes import bulk_routes
+    from .routes import cache_routes
+    from .routes import metrics_routes
     app.register_blueprint(department_routes.bp)
     app.register_blueprint(doctor_routes.bp)
     app.register_blueprint(patient_routes.bp)
@@ -26,5 +41,11 @@ def create_app(config_class=Config):
     app.register_blueprint(visit_routes.bp)
     app.register_blueprint(sta_routes.bp)
     app.register_blueprint(ward_routes.bp)
+    app.register_blueprint(bulk_routes.bp)
+    app.register_blueprint(cache_routes.bp)
+    app.register_blueprint(metrics_routes.bp)
+
+    from .commands import register_commands
+    register_commands(app)
 
     return app
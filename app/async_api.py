@@ -0,0 +1,204 @@
+import random
+import time
+from quart import Quart, jsonify, request
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from .config import Config
+from .extensions import stats_cache
+from .models.admission import Admission
+from .models.department import Department
+from .models.visit import Visit
+from .models.ward import Ward
+from .models.ward_occupancy import WardOccupancy
+from .routes.admission_routes import _active_admissions_body, _active_admissions_query
+from .routes.sta_routes import _date_range, _department_stats_entity, _department_stats_query, _department_stats_rows
+from .routes.visit_routes import VISIT_FIELDS, _visit_list_body, _visit_list_query
+from .routes.ward_routes import _occupied_beds_query, _ward_detail_data
+from .utils.pagination import INVALID_CURSOR, InvalidCursorError, paginate_async
+from .utils.projection import InvalidFieldsError, invalid_fields_error
+from .utils.routing import STICKY_COOKIE
+
+# 看板类只读接口的异步版本（Quart + SQLAlchemy 异步引擎），给大量并发轮询的病房看板、科室看板用：
+#   GET /ward/<id>、GET /admission/active、GET /department/<id>/stats、GET /visit
+# 参数解析、查询语句、分页规则和序列化都和同名的 Flask 接口共用（各 routes 模块里接收 args / make_query 的函数），
+# 这里只负责用异步会话执行，返回内容完全一致。已经结束的区间的科室统计同样走统计结果缓存（见 app/utils/stats_cache.py），写回缓存的数据从主库读。
+# 数据库驱动按同步连接串换成异步驱动：sqlite -> aiosqlite，mysql -> aiomysql（MySQL 需要另外装 aiomysql）；也可以用 ASYNC_DATABASE_URI 指定。
+# 配置了只读副本时同样读副本，带读己之写 cookie 的请求读主库。
+# 部署：hypercorn -c hypercorn.toml asgi:app，由反向代理把这几个 GET 路径转到这里，其余接口仍走 gunicorn。
+
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'mysql': 'mysql+aiomysql',
+}
+
+
+def async_url(uri):
+    url = make_url(uri)
+    return url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()])
+
+
+def _create_engine(uri, config):
+    url = async_url(uri)
+    options = {}
+    if not (url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')):
+        options = {
+            'poolclass': AsyncAdaptedQueuePool,
+            'pool_size': config['DB_POOL_SIZE'],
+            'max_overflow': config['DB_MAX_OVERFLOW'],
+            'pool_timeout': config['DB_POOL_TIMEOUT'],
+            'pool_recycle': config['DB_POOL_RECYCLE'],
+            'pool_pre_ping': config['DB_POOL_PRE_PING'],
+        }
+    return create_async_engine(url, **options)
+
+
+def create_async_app(config_class=Config):
+    app = Quart(__name__)
+    app.config.from_object(config_class)
+    stats_cache.init_app(app)
+
+    primary = _create_engine(app.config.get('ASYNC_DATABASE_URI') or app.config['SQLALCHEMY_DATABASE_URI'], app.config)
+    replicas = [_create_engine(uri, app.config) for uri in app.config['SQLALCHEMY_REPLICA_URIS']]
+    primary_sessions = async_sessionmaker(primary, expire_on_commit=False)
+    replica_sessions = [async_sessionmaker(engine, expire_on_commit=False) for engine in replicas]
+
+    def session():
+        try:
+            sticky = float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            sticky = False
+        if replica_sessions and not sticky:
+            return random.choice(replica_sessions)()
+        return primary_sessions()
+
+    @app.after_request
+    async def allow_cors(response):
+        response.headers['Access-Control-Allow-Origin'] = '*'
+        return response
+
+    @app.after_serving
+    async def dispose_engines():
+        for engine in [primary] + replicas:
+            await engine.dispose()
+
+    @app.route('/ward/<int:ward_id>', methods=['GET'])
+    async def get_ward_detail(ward_id):
+        try:
+            async with session() as db_session:
+                ward = await db_session.get(Ward, ward_id)
+                if not ward:
+                    return jsonify({
+                        "code": 404,
+                        "error": "病房不存在"
+                    }), 404
+
+                department = await db_session.get(Department, ward.DeptID)
+                summary = await db_session.get(WardOccupancy, ward_id)
+                beds = (await db_session.execute(_occupied_beds_query([ward_id]))).all()
+
+            return jsonify({
+                "code": 200,
+                "data": _ward_detail_data(ward, department, summary, beds)
+            }), 200
+
+        except Exception as e:
+            return jsonify({
+                "code": 500,
+                "error": f"服务器内部错误: {str(e)}"
+            }), 500
+
+    @app.route('/admission/active', methods=['GET'])
+    async def check_current_patients():
+        try:
+            page = request.args.get('page', 1, type=int)
+            page_size = request.args.get('pageSize', 10, type=int)
+
+            if page < 1 or page_size < 1:
+                return jsonify({
+                    "code": 400,
+                    "error": "分页参数必须大于0"
+                }), 400
+
+            query = _active_admissions_query(request.args, select)
+            async with session() as db_session:
+                pagination = await paginate_async(db_session, query, Admission.AdmissionID, page, page_size, request.args)
+
+            return jsonify(_active_admissions_body(pagination)), 200
+
+        except InvalidCursorError:
+            return jsonify(INVALID_CURSOR), 400
+        except Exception as e:
+            return jsonify({
+                "code": 500,
+                "error": f"服务器内部错误: {str(e)}"
+            }), 500
+
+    @app.route('/department/<int:dept_id>/stats', methods=['GET'])
+    async def department_stats(dept_id):
+        try:
+            start_date, end_date, error = _date_range(request.args)
+            if error:
+                return jsonify(error), 400
+
+            async def load(sessions):
+                async with sessions() as db_session:
+                    rows = (await db_session.execute(
+                        _department_stats_query([dept_id], start_date, end_date)
+                    )).all()
+                return _department_stats_rows(rows)
+
+            stats = await stats_cache.fetch_async(
+                'department_stats', _department_stats_entity([dept_id]), start_date, end_date, (), load,
+                session, primary_sessions
+            )
+            if not stats:
+                return jsonify({
+                    "code": 404,
+                    "error": f"DeptID {dept_id} 未找到"
+                }), 404
+
+            return jsonify({
+                "code": 200,
+                "data": stats
+            }), 200
+
+        except Exception as e:
+            return jsonify({
+                "code": 500,
+                "error": f"服务器内部错误: {str(e)}"
+            }), 500
+
+    @app.route('/visit', methods=['GET'])
+    async def get_visits():
+        try:
+            page = request.args.get('page', 1, type=int)
+            page_size = request.args.get('pageSize', 10, type=int)
+
+            if page < 1 or page_size < 1:
+                return jsonify({
+                    "code": 400,
+                    "error": "分页参数必须大于0"
+                }), 400
+
+            query, serialize, error = _visit_list_query(request.args, select)
+            if error:
+                return jsonify(error), 400
+
+            async with session() as db_session:
+                pagination = await paginate_async(db_session, query, Visit.VisitID, page, page_size, request.args)
+
+            return jsonify(_visit_list_body(pagination, serialize)), 200
+
+        except InvalidCursorError:
+            return jsonify(INVALID_CURSOR), 400
+        except InvalidFieldsError:
+            return jsonify(invalid_fields_error(VISIT_FIELDS)), 400
+        except Exception as e:
+            return jsonify({
+                "code": 500,
+                "error": f"服务器内部错误: {str(e)}"
+            }), 500
+
+    return app
@@ -0,0 +1,68 @@
+import click
+from flask.cli import AppGroup, with_appcontext
+
+rollup_cli = AppGroup('rollup', help='统计汇总表维护')
+occupancy_cli = AppGroup('occupancy', help='病房占用索引维护')
+versions_cli = AppGroup('versions', help='基础数据版本号（ETag）维护')
+search_cli = AppGroup('search', help='患者检索索引维护')
+
+
+@rollup_cli.command('rebuild')
+def rollup_rebuild():
+    from .utils import rollup
+    doctor_rows, dept_rows = rollup.rebuild()
+    click.echo(f"汇总表已重建: DoctorDailyStats {doctor_rows} 行, DeptDailyStats {dept_rows} 行")
+
+
+@occupancy_cli.command('reconcile')
+def occupancy_reconcile():
+    from .utils import occupancy
+    fixed = occupancy.reconcile()
+    click.echo(f"病房占用索引已校对, 修正 {fixed} 条记录")
+
+
+@versions_cli.command('bump')
+def versions_bump():
+    from .extensions import db, versions
+    from .models.department import Department
+    from .models.doctor import Doctor
+    from .models.ward import Ward
+    versions.bump(Department, Doctor, Ward)
+    db.session.commit()
+    click.echo("科室、医生、病房的版本号已更新，客户端缓存的 ETag 全部失效")
+
+
+@search_cli.command('rebuild')
+def search_rebuild():
+    from .utils import search
+    rows = search.install()
+    click.echo(f"患者检索索引已重建, 共 {rows} 名患者")
+
+
+@click.command('bulk-load')
+@click.argument('entity', type=click.Choice(['patient', 'visit', 'admission']))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']), help='默认按文件扩展名判断')
+@click.option('--batch-size', type=int, help='每批写入行数，默认取 BULK_BATCH_SIZE')
+@with_appcontext
+def bulk_load(entity, path, fmt, batch_size):
+    from flask import current_app
+    from .utils import bulk
+    if not fmt:
+        fmt = 'csv' if path.lower().endswith('.csv') else 'ndjson'
+    batch_size = batch_size or current_app.config['BULK_BATCH_SIZE']
+
+    with open(path, 'rb') as f:
+        result = bulk.load(entity, bulk.read_rows(f, fmt), batch_size=batch_size)
+
+    click.echo(f"共 {result.total} 行, 成功 {result.inserted} 行, 失败 {result.failed} 行")
+    for error in result.errors:
+        click.echo(f"  第 {error['line']} 行: {error['error']} {error['message']}")
+
+
+def register_commands(app):
+    app.cli.add_command(rollup_cli)
+    app.cli.add_command(occupancy_cli)
+    app.cli.add_command(versions_cli)
+    app.cli.add_command(search_cli)
+    app.cli.add_command(bulk_load)
@@ -1,5 +1,103 @@
 import os
 
 class Config:
-    SQLALCHEMY_DATABASE_URI = 'mysql+pymysql://root@localhost:3306/hospital_data' # 更改成你自己的 username:password@localhost:host/databasename
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URI', 'mysql+pymysql://root@localhost:3306/hospital_data') # 更改成你自己的 username:password@localhost:host/databasename
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # 批量导入每批写入的行数
+    BULK_BATCH_SIZE = 1000
+
+    # 主键分配方式：autoincrement 交给数据库自增；hilo 按号段预留，适合大批量导入
+    ID_ALLOCATION = 'autoincrement'
+    ID_BLOCK_SIZE = 1000
+
+    # 科室/医生/病房基础数据缓存；共享后端填 'memory'（本地模拟）或实现了 get/set/delete 的对象
+    REFERENCE_CACHE_ENABLED = True
+    REFERENCE_CACHE_SIZE = 1024
+    REFERENCE_CACHE_TTL = 300
+    REFERENCE_CACHE_SHARED_BACKEND = None
+
+    # 统计接口里已经结束的区间的结果缓存，补录旧日期的数据时按日期清掉受影响的条目；TTL 兜底多进程部署
+    STATS_CACHE_ENABLED = True
+    STATS_CACHE_SIZE = 4096
+    STATS_CACHE_TTL = 3600
+
+    # 收入报表一次最多返回多少个分桶
+    REVENUE_REPORT_MAX_PERIODS = 1000
+
+    # 科室/医生/病房的列表和详情带 ETag，客户端带 If-None-Match 且数据没变时返回 304
+    ETAG_ENABLED = True
+    # 各 blueprint 的 GET 响应的 Cache-Control；no-cache 表示可以缓存，但每次用之前要带 ETag 回来确认
+    CACHE_CONTROL = {
+        'department': 'no-cache',
+        'doctor': 'no-cache',
+        'ward': 'no-cache',
+    }
+
+    # JSON 响应的序列化实现：orjson（需要安装 orjson）或 default（Flask 自带的 json）
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER', 'orjson')
+
+    # 流式导出每次从数据库游标取的行数
+    EXPORT_YIELD_PER = 1000
+
+    # 请求级 SQL 统计、Server-Timing 响应头和慢查询日志阈值（毫秒）
+    SQL_INSTRUMENTATION_ENABLED = True
+    SERVER_TIMING_HEADER = True
+    SLOW_QUERY_THRESHOLD_MS = 200
+
+    # 连接池：池大小、允许溢出的连接数、取连接等待超时（秒）、
+    # 连接回收时间（秒，要小于 MySQL 的 wait_timeout，否则会遇到 "MySQL server has gone away"）、借出前 ping 一下
+    # 可以用同名环境变量覆盖
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 10))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', '1') not in ('0', 'false', 'False')
+
+    # 只读副本连接串列表（环境变量里用逗号分隔），GET 接口和统计接口走副本；不配置就全部走主库。
+    # 写请求之后同一客户端在 READ_YOUR_WRITES_SECONDS 秒内仍读主库
+    SQLALCHEMY_REPLICA_URIS = [uri for uri in os.environ.get('DATABASE_REPLICA_URIS', '').split(',') if uri]
+    READ_YOUR_WRITES_SECONDS = float(os.environ.get('READ_YOUR_WRITES_SECONDS', 5))
+    READ_ONLY_BLUEPRINTS = ['sta']
+
+    # /patient/batch、/doctor/batch、/visit/batch 一次最多查多少个 ID
+    BATCH_MAX_IDS = int(os.environ.get('BATCH_MAX_IDS', 200))
+
+    # POST /visit/batch 一次最多提交多少条就诊
+    VISIT_BATCH_MAX_ITEMS = 500
+
+    # /patient/search 一次最多返回多少条
+    PATIENT_SEARCH_MAX_LIMIT = 100
+
+    # /doctor/workload 排行榜一次最多返回多少名医生
+    WORKLOAD_RANKING_MAX_LIMIT = 100
+
+    # 异步看板接口（asgi.py）用的连接串，不配置就把 SQLALCHEMY_DATABASE_URI 换成对应的异步驱动
+    ASYNC_DATABASE_URI = os.environ.get('ASYNC_DATABASE_URI')
+
+
+class DevelopmentConfig(Config):
+    DEBUG = True
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 5))
+
+
+class TestingConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URI', 'sqlite://')
+
+
+class ProductionConfig(Config):
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 20))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 5))
+    # 线上 MySQL 的 wait_timeout 一般调到 600 秒左右
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 280))
+
+
+# APP_ENV 选择配置：development / testing / production
+config_by_name = {
+    'development': DevelopmentConfig,
+    'testing': TestingConfig,
+    'production': ProductionConfig,
+}
\ No newline at end of file
@@ -1,3 +1,15 @@
 from flask_sqlalchemy import SQLAlchemy
+from .utils.cache import ReferenceCache
+from .utils.instrumentation import SQLInstrumentation
+from .utils.pool import PoolMonitor
+from .utils.routing import RoutingSession, ReplicaRouter
+from .utils.stats_cache import StatsCache
+from .utils.versions import VersionTracker
 
-db = SQLAlchemy()
\ No newline at end of file
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+cache = ReferenceCache()
+instrumentation = SQLInstrumentation()
+pool_monitor = PoolMonitor()
+replicas = ReplicaRouter()
+stats_cache = StatsCache()
+versions = VersionTracker()
\ No newline at end of file
@@ -2,6 +2,10 @@ from ..extensions import db
 
 class Admission(db.Model):
     __tablename__ = 'Admission'
+    __table_args__ = (
+        db.Index('ix_Admission_WardID_DischargeDate', 'WardID', 'DischargeDate'),
+        db.Index('ix_Admission_DischargeDate', 'DischargeDate'),
+    )
     
     AdmissionID = db.Column(db.Integer, primary_key=True, autoincrement=True)
     WardID = db.Column(db.Integer, db.ForeignKey('Ward.WardID'), nullable=False)
@@ -0,0 +1,13 @@
+from ..extensions import db
+
+class BedOccupancy(db.Model):
+    __tablename__ = 'BedOccupancy'
+    
+    AdmissionID = db.Column(db.Integer, db.ForeignKey('Admission.AdmissionID'), primary_key=True)
+    WardID = db.Column(db.Integer, db.ForeignKey('Ward.WardID'), nullable=False, index=True)
+    BedNo = db.Column(db.String(50))
+    PatientID = db.Column(db.Integer, db.ForeignKey('Patient.PatientID'))
+    AdmissionDate = db.Column(db.Date, nullable=False)
+    
+    def __repr__(self):
+        return f'<BedOccupancy {self.WardID} {self.BedNo}>'
\ No newline at end of file
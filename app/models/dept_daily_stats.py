@@ -0,0 +1,15 @@
+from ..extensions import db
+
+class DeptDailyStats(db.Model):
+    __tablename__ = 'DeptDailyStats'
+    __table_args__ = (
+        db.Index('ix_DeptDailyStats_DeptID_StatDate', 'DeptID', 'StatDate'),
+    )
+    
+    StatDate = db.Column(db.Date, primary_key=True)
+    DeptID = db.Column(db.Integer, db.ForeignKey('Department.DeptID'), primary_key=True)
+    AdmissionCount = db.Column(db.Integer, nullable=False, default=0)
+    InpatientCount = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<DeptDailyStats {self.StatDate} {self.DeptID}>'
\ No newline at end of file
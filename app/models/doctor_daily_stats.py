@@ -0,0 +1,15 @@
+from ..extensions import db
+
+class DoctorDailyStats(db.Model):
+    __tablename__ = 'DoctorDailyStats'
+    __table_args__ = (
+        db.Index('ix_DoctorDailyStats_DoctorID_StatDate', 'DoctorID', 'StatDate'),
+    )
+    
+    StatDate = db.Column(db.Date, primary_key=True)
+    DoctorID = db.Column(db.Integer, db.ForeignKey('Doctor.DoctorID'), primary_key=True)
+    VisitCount = db.Column(db.Integer, nullable=False, default=0)
+    FeeSum = db.Column(db.DECIMAL(14, 2), nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<DoctorDailyStats {self.StatDate} {self.DoctorID}>'
\ No newline at end of file
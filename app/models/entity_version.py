@@ -0,0 +1,10 @@
+from ..extensions import db
+
+class EntityVersion(db.Model):
+    __tablename__ = 'EntityVersion'
+    
+    Entity = db.Column(db.String(64), primary_key=True)
+    Version = db.Column(db.BigInteger, nullable=False)
+    
+    def __repr__(self):
+        return f'<EntityVersion {self.Entity} {self.Version}>'
@@ -0,0 +1,10 @@
+from ..extensions import db
+
+class IdSequence(db.Model):
+    __tablename__ = 'IdSequence'
+    
+    Name = db.Column(db.String(64), primary_key=True)
+    NextValue = db.Column(db.BigInteger, nullable=False)
+    
+    def __repr__(self):
+        return f'<IdSequence {self.Name} {self.NextValue}>'
\ No newline at end of file
@@ -2,6 +2,10 @@ from ..extensions import db
 
 class Patient(db.Model):
     __tablename__ = 'Patient'
+    __table_args__ = (
+        db.Index('ix_Patient_Name', 'Name'),
+        db.Index('ix_Patient_Phone', 'Phone'),
+    )
     
     PatientID = db.Column(db.Integer, primary_key=True, autoincrement=True)
     Name = db.Column(db.String(255), nullable=False)
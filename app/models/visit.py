@@ -2,6 +2,12 @@ from ..extensions import db
 
 class Visit(db.Model):
     __tablename__ = 'Visit'
+    __table_args__ = (
+        db.Index('ix_Visit_DoctorID_VisitDate', 'DoctorID', 'VisitDate'),
+        db.Index('ix_Visit_PatientID_VisitDate', 'PatientID', 'VisitDate'),
+        db.Index('ix_Visit_AdmissionID', 'AdmissionID'),
+        db.Index('ix_Visit_VisitDate', 'VisitDate'),
+    )
     
     VisitID = db.Column(db.Integer, primary_key=True, autoincrement=True)
     PatientID = db.Column(db.Integer, db.ForeignKey('Patient.PatientID'), nullable=False)
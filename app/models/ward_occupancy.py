@@ -0,0 +1,10 @@
+from ..extensions import db
+
+class WardOccupancy(db.Model):
+    __tablename__ = 'WardOccupancy'
+    
+    WardID = db.Column(db.Integer, db.ForeignKey('Ward.WardID'), primary_key=True)
+    OccupiedBeds = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<WardOccupancy {self.WardID} {self.OccupiedBeds}>'
\ No newline at end of file
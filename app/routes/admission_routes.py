@@ -5,9 +5,21 @@ from app.models.admission import Admission
 from datetime import datetime
 from app.models.patient import Patient
 from app.models.visit import Visit
+from app.utils import rollup, occupancy
+from app.utils.ids import next_id
+from app.utils.validators import validate_admission
+from app.utils.pagination import paginate, page_meta, InvalidCursorError, invalid_cursor_response
+from app.utils.serializers import serializer
 
 bp = Blueprint('admission', __name__)
 
+_admission_data = serializer(Admission)
+_new_admission_data = serializer(Admission, ['AdmissionID', 'WardID', 'BedNo', 'AdmissionDate', 'AdmissionReason'])
+# 在院患者列表的查询结果行，PatientID / PatientName 来自 join 的 Patient
+_active_admission_data = serializer(
+    Admission, ['AdmissionID', 'PatientID', 'PatientName', 'WardID', 'BedNo', 'AdmissionDate']
+)
+
 @bp.route('/admission', methods=['POST'])
 def add_admission():
     try:
@@ -26,29 +38,7 @@ def add_admission():
                 "message": "请求体不能为空"
             }), 400
 
-        errors = []
-        
-        try:
-            ward_id = int(data.get('WardID'))
-        except (TypeError, ValueError):
-            errors.append({"field": "WardID", "message": "病区ID必须为整数"})
-        
-        bed_no = data.get('BedNo', '').strip()
-        if not bed_no:
-            errors.append({"field": "BedNo", "message": "床号不能为空"})
-        
-        admission_date = data.get('AdmissionDate', '').strip()
-        if not admission_date:
-            errors.append({"field": "AdmissionDate", "message": "入院日期不能为空"})
-        else:
-            try:
-                admission_date = datetime.strptime(admission_date, '%Y-%m-%d')
-            except ValueError:
-                errors.append({"field": "AdmissionDate", "message": "入院日期格式不正确，应该为 YYYY-MM-DD"})
-
-        admission_reason = data.get('AdmissionReason', '').strip()
-        if not admission_reason:
-            errors.append({"field": "AdmissionReason", "message": "入院原因不能为空"})
+        values, errors = validate_admission(data)
 
         if errors:
             return jsonify({
@@ -58,28 +48,18 @@ def add_admission():
                 "details": errors
             }), 400
 
-        max_admission_id = db.session.query(db.func.max(Admission.AdmissionID)).scalar()  
-        new_admission_id = max_admission_id + 1 if max_admission_id else 1  
-
-        new_admission = Admission(
-            AdmissionID=new_admission_id,
-            WardID=ward_id,
-            BedNo=bed_no,
-            AdmissionDate=admission_date,
-            AdmissionReason=admission_reason
-        )
+        new_admission = Admission(AdmissionID=next_id(Admission), **values)
         
         db.session.add(new_admission)
+        rollup.record_admission(values['WardID'], values['AdmissionDate'])
+        occupancy.record_admission(new_admission)
         db.session.commit()
+        rollup.invalidate_admission(values['WardID'], values['AdmissionDate'])
         db.session.refresh(new_admission)
 
         return jsonify({
-            "AdmissionID": new_admission_id,
-            "WardID": new_admission.WardID,
-            "VisitID": data.get('VisitID'),  
-            "BedNo": new_admission.BedNo,
-            "AdmissionDate": new_admission.AdmissionDate.strftime('%Y-%m-%d'),
-            "AdmissionReason": new_admission.AdmissionReason
+            **_new_admission_data(new_admission),
+            "VisitID": data.get('VisitID')
         }), 200
 
     except Exception as e:
@@ -127,8 +107,14 @@ def discharge_patient(admission_id):
                 "error": "DischargeDate 不能早于 AdmissionDate"
             }), 400
 
+        first_discharge = admission.DischargeDate is None
+        if first_discharge:
+            rollup.record_discharge(admission)
+            occupancy.record_discharge(admission)
         admission.DischargeDate = discharge_date
         db.session.commit()
+        if first_discharge:
+            rollup.invalidate_admission(admission.WardID, admission.AdmissionDate)
 
         visit = Visit.query.filter_by(AdmissionID=admission_id).first()
         if visit:
@@ -138,14 +124,8 @@ def discharge_patient(admission_id):
 
 
         return jsonify({
-            
-            "AdmissionID": admission.AdmissionID,          
-            "WardID": admission.WardID,                    
-            "VisitID": visit_id if visit_id else None,    
-            "BedNo": admission.BedNo,                      
-            "AdmissionDate": admission.AdmissionDate.strftime('%Y-%m-%d'),  
-            "DischargeDate": admission.DischargeDate.strftime('%Y-%m-%d'), 
-            "AdmissionReason": admission.AdmissionReason  
+            **_admission_data(admission),
+            "VisitID": visit_id if visit_id else None
         })
 
     except SQLAlchemyError as e:
@@ -162,13 +142,39 @@ def discharge_patient(admission_id):
         }), 500
 
 
+# 在院患者列表的查询，同步和异步接口（app/async_api.py）共用：make_query 是 db.session.query 或 select
+def _active_admissions_query(args, make_query):
+    ward_id = args.get('wardId', type=int)
+    dept_id = args.get('DeptId', type=int)
+
+    query = make_query(
+        Admission.AdmissionID, Patient.PatientID, Patient.Name.label('PatientName'),
+        Admission.WardID, Admission.BedNo, Admission.AdmissionDate
+    ).join(Patient, Admission.AdmissionID == Patient.PatientID) \
+        .filter(Admission.DischargeDate.is_(None))
+
+    if ward_id is not None:
+        query = query.filter(Admission.WardID == ward_id)
+    if dept_id is not None:
+        query = query.join(Ward, Admission.WardID == Ward.WardID).filter(Ward.DeptID == dept_id)
+    return query
+
+
+def _active_admissions_body(pagination):
+    return {
+        "code": 200,
+        "data": {
+            **page_meta(pagination),
+            "list": [_active_admission_data(admission) for admission in pagination.items]
+        }
+    }
+
+
 @bp.route('/admission/active', methods=['GET'])
 def check_current_patients():
     try:
         page = request.args.get('page', 1, type=int)
         page_size = request.args.get('pageSize', 10, type=int)
-        ward_id = request.args.get('wardId', type=int)
-        dept_id = request.args.get('DeptId', type=int)
 
         if page < 1 or page_size < 1:
             return jsonify({
@@ -176,41 +182,12 @@ def check_current_patients():
                 "error": "分页参数必须大于0"
             }), 400
 
-        query = db.session.query(
-            Admission.AdmissionID, Patient.PatientID, Patient.Name.label('PatientName'),
-            Admission.WardID, Admission.BedNo, Admission.AdmissionDate
-        ).join(Patient, Admission.AdmissionID == Patient.PatientID)  
-
-        query = query.filter(Admission.DischargeDate.is_(None))
-
-        if ward_id is not None:
-            query = query.filter(Admission.WardID == ward_id)
-        if dept_id is not None:
-            query = query.join(Ward, Admission.WardID == Ward.WardID).filter(Ward.DeptID == dept_id)
-
-        pagination = query.paginate(page=page, per_page=page_size, error_out=False)
-
-        active_patients_list = []
-        for admission in pagination.items:
-            active_patients_list.append({
-                "AdmissionID": admission.AdmissionID,
-                "PatientID": admission.PatientID,  
-                "PatientName": admission.PatientName,
-                "WardID": admission.WardID,
-                "BedNo": admission.BedNo,
-                "AdmissionDate": admission.AdmissionDate.strftime('%Y-%m-%d')
-            })
-
-        return jsonify({
-            "code": 200,
-            "data": {
-                "total": pagination.total,
-                "page": pagination.page,
-                "pageSize": page_size,
-                "list": active_patients_list
-            }
-        }), 200
+        query = _active_admissions_query(request.args, db.session.query)
+        pagination = paginate(query, Admission.AdmissionID, page, page_size)
+        return jsonify(_active_admissions_body(pagination)), 200
 
+    except InvalidCursorError:
+        return invalid_cursor_response()
     except Exception as e:
         return jsonify({
             "code": 500,
@@ -0,0 +1,49 @@
+from flask import jsonify, request, Blueprint, current_app
+from app.utils import bulk
+
+bp = Blueprint('bulk', __name__)
+
+
+@bp.route('/bulk/<entity>', methods=['POST'])
+def bulk_load(entity):
+    try:
+        if entity not in bulk.ENTITIES:
+            return jsonify({
+                "code": 404,
+                "error": "ENTITY_NOT_SUPPORTED",
+                "message": f"不支持批量导入: {entity}"
+            }), 404
+
+        fmt = request.args.get('format')
+        if not fmt:
+            fmt = 'csv' if request.mimetype == 'text/csv' else 'ndjson'
+        if fmt not in ('csv', 'ndjson'):
+            return jsonify({
+                "code": 400,
+                "error": "INVALID_FORMAT",
+                "message": "format 只支持 csv 或 ndjson"
+            }), 400
+
+        batch_size = request.args.get('batchSize', current_app.config['BULK_BATCH_SIZE'], type=int)
+        if batch_size < 1:
+            return jsonify({
+                "code": 400,
+                "error": "INVALID_BATCH_SIZE",
+                "message": "batchSize 必须大于0"
+            }), 400
+
+        # 直接按行读取请求体，不把整个文件读进内存
+        rows = bulk.read_rows(request.stream, fmt)
+        result = bulk.load(entity, rows, batch_size=batch_size)
+
+        return jsonify({
+            "code": 200,
+            "data": result.to_dict()
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            "code": 500,
+            "error": "INTERNAL_SERVER_ERROR",
+            "message": f"服务器内部错误: {str(e)}"
+        }), 500
@@ -0,0 +1,21 @@
+from flask import jsonify, Blueprint
+from app.extensions import cache, stats_cache
+
+bp = Blueprint('cache', __name__)
+
+
+@bp.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify({
+        "code": 200,
+        "data": cache.stats()
+    }), 200
+
+
+# 统计结果缓存：各接口的命中率、条目数、估算占用字节数和日期水位线
+@bp.route('/cache/stats/results', methods=['GET'])
+def stats_cache_stats():
+    return jsonify({
+        "code": 200,
+        "data": stats_cache.stats()
+    }), 200
@@ -2,11 +2,24 @@ from flask import Blueprint, request, jsonify
 from ..models.department import Department
 from ..models.doctor import Doctor
 from ..models.ward import Ward
-from ..extensions import db
+from ..extensions import db, cache, stats_cache, versions
 from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from ..utils.ids import next_id
+from ..utils.serializers import serializer
+from ..utils.projection import parse_fields, InvalidFieldsError, invalid_fields_response
 
 bp = Blueprint('department', __name__)
 
+_department_data = serializer(Department)
+
+# 科室详情的 fields：不要 Wards / Doctors 时就不查对应的表；病房和医生只查列表里展示的几列
+DEPARTMENT_DETAIL_FIELDS = ('DeptID', 'DeptName', 'Location', 'Wards', 'Doctors')
+DEPARTMENT_WARD_FIELDS = ('WardID', 'WardName', 'Floor', 'Capacity')
+DEPARTMENT_DOCTOR_FIELDS = ('DoctorID', 'Name', 'Title', 'Phone')
+_department_ward_data = serializer(Ward, DEPARTMENT_WARD_FIELDS)
+_department_doctor_data = serializer(Doctor, DEPARTMENT_DOCTOR_FIELDS)
+
 @bp.route('/department', methods=['POST'])
 def create_department(): # 创建科室
     # 解析 json body
@@ -25,28 +38,27 @@ def create_department(): # 创建科室
         }), 400
 
     try:
-        # 生成不重复的科室ID逻辑
-        max_id = db.session.query(func.max(Department.DeptID)).scalar() or 0
-        new_id = max_id + 1
-
-        # 检查新ID是否已被占用（防止并发冲突）
-        while Department.query.get(new_id):
-            new_id += 1
-
-        # 创建带自定义ID的科室
-        new_dept = Department(DeptID=new_id, DeptName=dept_name, Location=location)
+        # 科室ID由统一的主键分配逻辑生成
+        new_dept = Department(DeptID=next_id(Department), DeptName=dept_name, Location=location)
         db.session.add(new_dept)
+        versions.bump(Department)
         db.session.commit()
+        # 之前按这个 ID 查过的科室统计缓存的是“不存在”
+        stats_cache.invalidate(endpoints=('department_stats',), dept=new_dept.DeptID)
 
         # 返回创建结果
         return jsonify({
             "code": 201,
-            "data": {
-                "DeptID": new_dept.DeptID,
-                "DeptName": new_dept.DeptName,
-                "Location": new_dept.Location
-            }
+            "data": _department_data(new_dept)
         }), 201
+    except IntegrityError:
+        # 并发创建同名科室时由唯一约束兜底
+        db.session.rollback()
+        return jsonify({
+            "code": 400,
+            "error": "DUPLICATE_DEPARTMENT",
+            "message": "科室已存在"
+        }), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -56,6 +68,7 @@ def create_department(): # 创建科室
         }), 500
     
 @bp.route('/department', methods=['GET'])
+@versions.conditional(Department, Doctor)
 def get_departments():
     # 获取分页参数
     page = request.args.get('page', default=1, type=int)
@@ -83,14 +96,10 @@ def get_departments():
         )
 
         # 构建返回数据结构
-        departments = []
-        for dept, doctor_count in pagination.items:
-            departments.append({
-                "DeptID": dept.DeptID,
-                "DeptName": dept.DeptName,
-                "Location": dept.Location,
-                "DoctorNo": doctor_count
-            })
+        departments = [
+            {**_department_data(dept), "DoctorNo": doctor_count}
+            for dept, doctor_count in pagination.items
+        ]
 
         return jsonify({
             "code": 200,
@@ -111,10 +120,13 @@ def get_departments():
 
 
 @bp.route('/department/<int:dept_id>', methods=['GET'])
+@versions.conditional(Department, Ward, Doctor)
 def get_department(dept_id):
     try:
+        fields = parse_fields(request.args.get('fields'), DEPARTMENT_DETAIL_FIELDS, required=('DeptID',))
+
         # 查询科室基本信息
-        department = Department.query.get(dept_id)
+        department = cache.get(Department, dept_id)
 
         if not department:
             return jsonify({
@@ -123,38 +135,28 @@ def get_department(dept_id):
                 "message": "科室不存在"
             }), 404
 
+        # 构建响应数据
+        response_data = serializer(Department, [name for name in fields if name not in ('Wards', 'Doctors')])(department)
+
         # 获取关联病房信息
-        wards = Ward.query.filter_by(DeptID=dept_id).all()
-        ward_list = [{
-            "WardID": w.WardID,
-            "WardName": w.WardName,
-            "Floor": w.Floor,
-            "Capacity": w.Capacity
-        } for w in wards]
+        if 'Wards' in fields:
+            wards = db.session.query(*[getattr(Ward, name) for name in DEPARTMENT_WARD_FIELDS]) \
+                .filter(Ward.DeptID == dept_id).all()
+            response_data["Wards"] = [_department_ward_data(w) for w in wards]
 
         # 获取关联医生信息
-        doctors = Doctor.query.filter_by(DeptID=dept_id).all()
-        doctor_list = [{
-            "DoctorID": d.DoctorID,
-            "Name": d.Name,
-            "Title": d.Title,
-            "Phone": d.Phone
-        } for d in doctors]
-
-        # 构建响应数据
-        response_data = {
-            "DeptID": department.DeptID,
-            "DeptName": department.DeptName,
-            "Location": department.Location,
-            "Wards": ward_list,
-            "Doctors": doctor_list
-        }
+        if 'Doctors' in fields:
+            doctors = db.session.query(*[getattr(Doctor, name) for name in DEPARTMENT_DOCTOR_FIELDS]) \
+                .filter(Doctor.DeptID == dept_id).all()
+            response_data["Doctors"] = [_department_doctor_data(d) for d in doctors]
 
         return jsonify({
             "code": 200,
             "data": response_data
         })
 
+    except InvalidFieldsError:
+        return invalid_fields_response(DEPARTMENT_DETAIL_FIELDS)
     except Exception as e:
         return jsonify({
             "code": 500,
@@ -189,20 +191,21 @@ def update_department(dept_id):
             }), 400
 
         # 执行更新
+        old_name = department.DeptName
         department.DeptName = new_name
         if new_location:  # 允许清空位置信息
             department.Location = new_location
 
+        versions.bump(Department)
         db.session.commit()
+        cache.invalidate(Department, dept_id, ('DeptName', old_name), ('DeptName', new_name))
+        # 科室名称出现在统计结果里，所有日期的都要清
+        stats_cache.invalidate(dept=dept_id)
 
         # 返回更新后的数据
         return jsonify({
             "code": 200,
-            "data": {
-                "DeptID": department.DeptID,
-                "DeptName": department.DeptName,
-                "Location": department.Location
-            }
+            "data": _department_data(department)
         })
 
     except Exception as e:
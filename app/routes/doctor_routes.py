@@ -3,12 +3,22 @@ from sqlalchemy.exc import SQLAlchemyError
 from ..models.doctor import Doctor
 from ..models.department import Department
 from ..models.visit import Visit
-from ..extensions import db
+from ..extensions import db, cache, stats_cache, versions
+from ..utils.pagination import paginate, page_meta, InvalidCursorError, invalid_cursor_response
+from ..utils.batch import parse_ids, batch_data, InvalidIdsError, invalid_ids_response
+from ..utils.serializers import serializer
 
 # 创建医生相关的蓝图
 bp = Blueprint('doctor', __name__)
 
 
+_doctor_row = serializer(Doctor)
+
+
+def _doctor_data(doctor, dept_name):
+    return {**_doctor_row(doctor), "DeptName": dept_name}
+
+
 @bp.route('/doctor', methods=['POST'])
 def create_doctor():
     # 解析请求数据
@@ -30,7 +40,7 @@ def create_doctor():
 
     try:
         # 查询科室是否存在
-        department = Department.query.filter_by(DeptName=dept_name).first()
+        department = cache.get_by(Department, 'DeptName', dept_name)
         if not department:
             return jsonify({
                 "code": 404,
@@ -48,21 +58,12 @@ def create_doctor():
 
         # 提交数据库事务
         db.session.add(new_doctor)
+        versions.bump(Doctor)
         db.session.commit()
 
-        # 构造响应数据
-        response_data = {
-            "DoctorID": new_doctor.DoctorID,
-            "Name": new_doctor.Name,
-            "DeptID": department.DeptID,
-            "DeptName": department.DeptName,
-            "Title": new_doctor.Title,
-            "Phone": new_doctor.Phone
-        }
-
         return jsonify({
             "code": 201,
-            "data": response_data
+            "data": _doctor_data(new_doctor, department.DeptName)
         }), 201
 
     except Exception as e:
@@ -74,6 +75,7 @@ def create_doctor():
         }), 500
 
 @bp.route('/doctor', methods=['GET'])
+@versions.conditional(Doctor, Department)
 def get_doctors():
     try:
         # 获取查询参数
@@ -101,34 +103,18 @@ def get_doctors():
             base_query = base_query.filter(Doctor.Title.ilike(f"%{title}%"))
 
         # 执行分页查询
-        pagination = base_query.paginate(
-            page=page,
-            per_page=page_size,
-            error_out=False
-        )
-
-        # 构建返回数据
-        doctors = []
-        for doctor, dept_name in pagination.items:
-            doctors.append({
-                "DoctorID": doctor.DoctorID,
-                "Name": doctor.Name,
-                "DeptID": doctor.DeptID,
-                "DeptName": dept_name,
-                "Title": doctor.Title,
-                "Phone": doctor.Phone
-            })
+        pagination = paginate(base_query, Doctor.DoctorID, page, page_size)
 
         return jsonify({
             "code": 200,
             "data": {
-                "total": pagination.total,
-                "page": pagination.page,
-                "pageSize": pagination.per_page,
-                "list": doctors
+                **page_meta(pagination),
+                "list": [_doctor_data(doctor, dept_name) for doctor, dept_name in pagination.items]
             }
         })
 
+    except InvalidCursorError:
+        return invalid_cursor_response()
     except Exception as e:
         return jsonify({
             "code": 500,
@@ -137,6 +123,7 @@ def get_doctors():
         }), 500
 
 @bp.route('/doctor/<int:doctor_id>', methods=['GET'])
+@versions.conditional(Doctor, Department)
 def get_doctor_detail(doctor_id):
     try:
         # 联表查询医生信息和科室名称
@@ -156,23 +143,41 @@ def get_doctor_detail(doctor_id):
                 "message": "医生不存在"
             }), 404
 
-        doctor, dept_name = doctor_data
+        return jsonify({
+            "code": 200,
+            "data": _doctor_data(*doctor_data)
+        })
 
-        # 构建响应数据
-        response_data = {
-            "DoctorID": doctor.DoctorID,
-            "Name": doctor.Name,
-            "DeptID": doctor.DeptID,
-            "DeptName": dept_name,
-            "Title": doctor.Title,
-            "Phone": doctor.Phone
-        }
+    except Exception as e:
+        return jsonify({
+            "code": 500,
+            "error": "SERVER_ERROR",
+            "message": f"服务器内部错误: {str(e)}"
+        }), 500
+
+
+# 一次取多个医生：GET /doctor/batch?ids=3,1,2，按 ids 的顺序返回，查不到的放在 missing 里
+@bp.route('/doctor/batch', methods=['GET'])
+@versions.conditional(Doctor, Department)
+def get_doctors_batch():
+    try:
+        ids = parse_ids()
+        rows = db.session.query(
+            Doctor,
+            Department.DeptName
+        ).join(
+            Department, Doctor.DeptID == Department.DeptID
+        ).filter(
+            Doctor.DoctorID.in_(ids)
+        ).all()
 
         return jsonify({
             "code": 200,
-            "data": response_data
+            "data": batch_data(ids, rows, lambda row: row[0].DoctorID, lambda row: _doctor_data(*row))
         })
 
+    except InvalidIdsError:
+        return invalid_ids_response()
     except Exception as e:
         return jsonify({
             "code": 500,
@@ -203,7 +208,7 @@ def update_doctor(doctor_id):
 
         # 验证科室ID是否存在
         if 'DeptID' in data and data['DeptID']:
-            dept = Department.query.get(data['DeptID'])
+            dept = cache.get(Department, data['DeptID'])
             if not dept:
                 return jsonify({
                     "code": 404,
@@ -211,6 +216,8 @@ def update_doctor(doctor_id):
                     "message": "科室不存在"
                 }), 404
 
+        old_dept_id = doctor.DeptID
+
         # 应用更新字段
         for field, value in updates.items():
             if value is not None:
@@ -223,21 +230,18 @@ def update_doctor(doctor_id):
                     }), 400
                 setattr(doctor, field, value)
 
+        versions.bump(Doctor)
         db.session.commit()
+        cache.invalidate(Doctor, doctor_id)
+        # 科室统计按医生当前所在科室汇总，换科室之后新旧两个科室所有日期的统计都变了
+        stats_cache.invalidate(doctor=doctor_id, dept=(old_dept_id, doctor.DeptID))
 
         # 获取科室名称
-        dept_name = Department.query.get(doctor.DeptID).DeptName
+        dept_name = cache.get(Department, doctor.DeptID).DeptName
 
         return jsonify({
             "code": 200,
-            "data": {
-                "DoctorID": doctor.DoctorID,
-                "Name": doctor.Name,
-                "DeptID": doctor.DeptID,
-                "DeptName": dept_name,
-                "Title": doctor.Title,
-                "Phone": doctor.Phone
-            }
+            "data": _doctor_data(doctor, dept_name)
         })
 
     except Exception as e:
@@ -274,7 +278,9 @@ def delete_doctor(doctor_id):
 
         # 执行删除
         db.session.delete(doctor)
+        versions.bump(Doctor)
         db.session.commit()
+        cache.invalidate(Doctor, doctor_id)
 
         return jsonify({
             "code": 204,
@@ -0,0 +1,28 @@
+from flask import jsonify, Blueprint, Response
+from app.extensions import instrumentation, pool_monitor
+from app.utils import metrics
+
+bp = Blueprint('metrics', __name__)
+
+
+@bp.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+# 带最慢语句原文的 JSON 版本，排查 N+1 和慢接口时用
+@bp.route('/metrics/endpoints', methods=['GET'])
+def endpoint_metrics():
+    return jsonify({
+        "code": 200,
+        "data": instrumentation.snapshot()
+    }), 200
+
+
+# 各个数据源的连接池状态：借出数、溢出、等待时间分布
+@bp.route('/metrics/pool', methods=['GET'])
+def pool_metrics():
+    return jsonify({
+        "code": 200,
+        "data": pool_monitor.snapshot()
+    }), 200
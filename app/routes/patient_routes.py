@@ -1,100 +1,53 @@
-from flask import Blueprint, request, jsonify
-from sqlalchemy.exc import SQLAlchemyError
-from ..models.doctor import Doctor
-from ..models.department import Department
+from datetime import datetime
+from flask import Blueprint, request, jsonify, current_app
+from sqlalchemy.exc import IntegrityError
+from ..models.patient import Patient  # 确保有此模型
 from ..models.admission import Admission
 from ..models.visit import Visit
 from ..extensions import db
+from ..utils.validators import validate_patient
+from ..utils.pagination import paginate, page_meta, InvalidCursorError, invalid_cursor_response
+from ..utils.batch import parse_ids, batch_data, InvalidIdsError, invalid_ids_response
+from ..utils import search
+from ..utils.serializers import serializer
+from ..utils.projection import parse_fields, InvalidFieldsError, invalid_fields_response
 
 bp = Blueprint('patient', __name__)
 
-from datetime import datetime
-from flask import Blueprint, request, jsonify
-from sqlalchemy.exc import IntegrityError
-from ..models.patient import Patient  # 确保有此模型
-from ..extensions import db
+_patient_data = serializer(Patient)
 
-bp = Blueprint('patient', __name__)
+PATIENT_FIELDS = tuple(column.key for column in Patient.__mapper__.column_attrs)
+# 列表默认不返回身份证号
+PATIENT_LIST_FIELDS = tuple(name for name in PATIENT_FIELDS if name != 'IdentityNo')
+
+
+# fields=PatientID,Name：只查、只返回这些列，主键总会带上
+def _patient_query(default=PATIENT_FIELDS):
+    fields = parse_fields(request.args.get('fields'), PATIENT_FIELDS, default, required=('PatientID',))
+    return db.session.query(*[getattr(Patient, name) for name in fields]), serializer(Patient, fields)
 
 
 @bp.route('/patient', methods=['POST'])
 def create_patient():
-    # 参数校验框架
-    required_fields = ['Name', 'Gender', 'IdentityNo']
     data = request.get_json()
 
-    # 检查必填字段
-    missing = [field for field in required_fields if not data.get(field)]
-    if missing:
-        return jsonify({
-            "code": 400,
-            "error": "MISSING_REQUIRED_FIELDS",
-            "message": f"缺少必填字段: {', '.join(missing)}"
-        }), 400
-
-    # 字段长度校验
-    if len(data['Name']) > 50:
-        return jsonify({
-            "code": 400,
-            "error": "NAME_TOO_LONG",
-            "message": "姓名不能超过50个字符"
-        }), 400
-
-    # 身份证格式校验（简单版）
-    if not data['IdentityNo'].isdigit() or len(data['IdentityNo']) != 18:
+    # 参数校验
+    values, error = validate_patient(data)
+    if error:
         return jsonify({
             "code": 400,
-            "error": "INVALID_IDENTITY_NO",
-            "message": "身份证号必须为18位数字"
+            **error
         }), 400
 
-    # 日期格式校验
-    if 'BirthDate' in data:
-        try:
-            datetime.strptime(data['BirthDate'], '%Y-%m-%d')
-        except ValueError:
-            return jsonify({
-                "code": 400,
-                "error": "INVALID_DATE_FORMAT",
-                "message": "日期格式应为YYYY-MM-DD"
-            }), 400
-
-    # 手机号格式校验
-    if 'Phone' in data and data['Phone']:
-        phone = data['Phone'].strip()
-        if not (phone.startswith('1') and len(phone) == 11 and phone.isdigit()):
-            return jsonify({
-                "code": 400,
-                "error": "INVALID_PHONE",
-                "message": "手机号格式不正确"
-            }), 400
-        data['Phone'] = phone  # 标准化存储
-
     try:
         # 创建患者记录
-        new_patient = Patient(
-            Name=data['Name'].strip(),
-            Gender=data['Gender'].strip(),
-            BirthDate=data.get('BirthDate'),
-            IdentityNo=data['IdentityNo'].strip(),
-            Phone=data.get('Phone', '').strip()
-        )
+        new_patient = Patient(**values)
         db.session.add(new_patient)
         db.session.commit()
 
-        # 构建响应数据
-        patient_data = {
-            "PatientID": new_patient.PatientID,
-            "Name": new_patient.Name,
-            "Gender": new_patient.Gender,
-            "BirthDate": new_patient.BirthDate.isoformat() if new_patient.BirthDate else None,
-            "IdentityNo": new_patient.IdentityNo,
-            "Phone": new_patient.Phone
-        }
-
         return jsonify({
             "code": 201,
-            "data": patient_data
+            "data": _patient_data(new_patient)
         }), 201
 
     except IntegrityError as e:
@@ -136,7 +89,8 @@ def get_patients():
             }), 400
 
         # 构建基础查询
-        base_query = Patient.query.order_by(Patient.PatientID.desc())
+        base_query, serialize = _patient_query(PATIENT_LIST_FIELDS)
+        base_query = base_query.order_by(Patient.PatientID.desc())
 
         # 添加姓名过滤
         if name and name.strip():
@@ -144,33 +98,20 @@ def get_patients():
             base_query = base_query.filter(Patient.Name.ilike(search_name))
 
         # 执行分页查询
-        pagination = base_query.paginate(
-            page=page,
-            per_page=page_size,
-            error_out=False
-        )
-
-        # 构建响应数据
-        patients = []
-        for patient in pagination.items:
-            patients.append({
-                "PatientID": patient.PatientID,
-                "Name": patient.Name,
-                "Gender": patient.Gender,
-                "BirthDate": patient.BirthDate.isoformat() if patient.BirthDate else None,
-                "Phone": patient.Phone
-            })
+        pagination = paginate(base_query, Patient.PatientID, page, page_size, descending=True)
 
         return jsonify({
             "code": 200,
             "data": {
-                "total": pagination.total,
-                "page": pagination.page,
-                "pageSize": pagination.per_page,
-                "list": patients
+                **page_meta(pagination),
+                "list": [serialize(patient) for patient in pagination.items]
             }
         })
 
+    except InvalidCursorError:
+        return invalid_cursor_response()
+    except InvalidFieldsError:
+        return invalid_fields_response(PATIENT_FIELDS)
     except Exception as e:
         return jsonify({
             "code": 500,
@@ -183,7 +124,8 @@ def get_patients():
 def get_patient_detail(patient_id):
     try:
         # 查询患者信息
-        patient = Patient.query.get(patient_id)
+        query, serialize = _patient_query()
+        patient = query.filter(Patient.PatientID == patient_id).first()
 
         if not patient:
             return jsonify({
@@ -192,19 +134,42 @@ def get_patient_detail(patient_id):
                 "message": "患者不存在"
             }), 404
 
-        # 构建响应数据
-        patient_data = {
-            "PatientID": patient.PatientID,
-            "Name": patient.Name,
-            "Gender": patient.Gender,
-            "BirthDate": patient.BirthDate.strftime("%Y-%m-%d") if patient.BirthDate else None,
-            "IdentityNo": patient.IdentityNo,
-            "Phone": patient.Phone
-        }
+        return jsonify({
+            "code": 200,
+            "data": serialize(patient)
+        })
+
+    except InvalidFieldsError:
+        return invalid_fields_response(PATIENT_FIELDS)
+    except Exception as e:
+        return jsonify({
+            "code": 500,
+            "error": "SERVER_ERROR",
+            "message": f"服务器内部错误: {str(e)}"
+        }), 500
+
+
+# 前台找人：GET /patient/search?q=王小&limit=20，q 可以是姓名、手机号片段或身份证号前缀，结果按匹配程度排序
+@bp.route('/patient/search', methods=['GET'])
+def search_patients():
+    try:
+        q = request.args.get('q', '').strip()
+        limit = request.args.get('limit', 20, type=int)
+
+        if not q or limit < 1 or limit > current_app.config['PATIENT_SEARCH_MAX_LIMIT']:
+            return jsonify({
+                "code": 400,
+                "error": "INVALID_QUERY",
+                "message": f"q 不能为空，limit 取值 1 ~ {current_app.config['PATIENT_SEARCH_MAX_LIMIT']}"
+            }), 400
+
+        results = search.search(q, limit)
 
         return jsonify({
             "code": 200,
-            "data": patient_data
+            "data": {
+                "list": [{**_patient_data(patient), "MatchedOn": field} for patient, field in results]
+            }
         })
 
     except Exception as e:
@@ -215,6 +180,31 @@ def get_patient_detail(patient_id):
         }), 500
 
 
+# 一次取多个患者：GET /patient/batch?ids=3,1,2，按 ids 的顺序返回，查不到的放在 missing 里
+@bp.route('/patient/batch', methods=['GET'])
+def get_patients_batch():
+    try:
+        ids = parse_ids()
+        query, serialize = _patient_query()
+        patients = query.filter(Patient.PatientID.in_(ids)).all()
+
+        return jsonify({
+            "code": 200,
+            "data": batch_data(ids, patients, lambda patient: patient.PatientID, serialize)
+        })
+
+    except InvalidIdsError:
+        return invalid_ids_response()
+    except InvalidFieldsError:
+        return invalid_fields_response(PATIENT_FIELDS)
+    except Exception as e:
+        return jsonify({
+            "code": 500,
+            "error": "SERVER_ERROR",
+            "message": f"服务器内部错误: {str(e)}"
+        }), 500
+
+
 @bp.route('/patient/<int:patient_id>', methods=['PUT'])
 def update_patient(patient_id):
     try:
@@ -273,19 +263,9 @@ def update_patient(patient_id):
 
         db.session.commit()
 
-        # 构建响应数据
-        response_data = {
-            "PatientID": patient.PatientID,
-            "Name": patient.Name,
-            "Gender": patient.Gender,
-            "BirthDate": patient.BirthDate.strftime("%Y-%m-%d") if patient.BirthDate else None,
-            "IdentityNo": patient.IdentityNo,  # 身份证号不可修改
-            "Phone": patient.Phone
-        }
-
         return jsonify({
             "code": 200,
-            "data": response_data
+            "data": _patient_data(patient)
         })
 
     except Exception as e:
@@ -2,92 +2,138 @@ from flask import jsonify, request, Blueprint
 
 bp = Blueprint('sta', __name__)
 
-from flask import jsonify, request
+from flask import jsonify, request, current_app
+from contextlib import nullcontext
 from datetime import datetime
-from sqlalchemy import func
+from sqlalchemy import func, select, literal, union_all
 from app.models.admission import Admission
 from app.models.visit import Visit
 from app.models.department import Department
 from app.models.doctor import Doctor
 from app.models.ward import Ward
-from app.extensions import db
-from sqlalchemy.sql import extract
+from app.models.doctor_daily_stats import DoctorDailyStats
+from app.models.dept_daily_stats import DeptDailyStats
+from app.extensions import cache, db, stats_cache
+from app.utils.export import EXPORT_FORMATS, export_response
+from app.utils.report import GRANULARITIES, period_label, period_start, periods
+from app.utils.routing import use_primary
+
+# startDate / endDate，格式不对时返回错误内容；args 是请求参数，异步接口（app/async_api.py）也用
+def _date_range(args):
+    dates = []
+    for name in ('startDate', 'endDate'):
+        value = args.get(name)
+        try:
+            dates.append(datetime.strptime(value, '%Y-%m-%d').date() if value else None)
+        except ValueError:
+            return None, None, {
+                "code": 400,
+                "error": f"{name} 格式不正确，应该是 'YYYY-MM-DD'"
+            }
+    return dates[0], dates[1], None
 
-@bp.route('/department/<int:dept_id>/stats', methods=['GET'])
-def department_stats(dept_id):
-    try:
-        start_date_str = request.args.get('startDate')
-        end_date_str = request.args.get('endDate')
 
-        if start_date_str:
-            try:
-                start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
-            except ValueError:
-                return jsonify({
-                    "code": 400,
-                    "error": "startDate 格式不正确，应该是 'YYYY-MM-DD'"
-                }), 400
-        else:
-            start_date = None
+def _parse_date_range():
+    start_date, end_date, error = _date_range(request.args)
+    if error:
+        return None, None, (jsonify(error), 400)
+    return start_date, end_date, None
 
-        if end_date_str:
-            try:
-                end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
-            except ValueError:
-                return jsonify({
-                    "code": 400,
-                    "error": "endDate 格式不正确，应该是 'YYYY-MM-DD'"
-                }), 400
-        else:
-            end_date = None
 
-        department = Department.query.get(dept_id)
-        if not department:
-            return jsonify({
-                "code": 404,
-                "error": f"DeptID {dept_id} 未找到"
-            }), 404
+def _in_range(column, start_date, end_date):
+    conditions = []
+    if start_date:
+        conditions.append(column >= start_date)
+    if end_date:
+        conditions.append(column <= end_date)
+    return conditions
+
+
+# 一条 SQL 算出多个科室的门诊量、在院人数和收入：
+# 医生日汇总（按医生当前科室）和科室日汇总 UNION ALL 成一张明细，再按科室 GROUP BY 条件求和。
+# 只构造语句不执行，异步读接口（app/async_api.py）也用同一条语句
+def _department_stats_query(dept_ids, start_date, end_date):
+    visit_part = select(
+        Doctor.DeptID.label('DeptID'),
+        DoctorDailyStats.VisitCount.label('Visits'),
+        DoctorDailyStats.FeeSum.label('Revenue'),
+        literal(0).label('Inpatients')
+    ).join(Doctor, DoctorDailyStats.DoctorID == Doctor.DoctorID) \
+        .where(*_in_range(DoctorDailyStats.StatDate, start_date, end_date))
+
+    admission_part = select(
+        DeptDailyStats.DeptID,
+        literal(0),
+        literal(0),
+        DeptDailyStats.InpatientCount
+    ).where(*_in_range(DeptDailyStats.StatDate, start_date, end_date))
+
+    if dept_ids is not None:
+        visit_part = visit_part.where(Doctor.DeptID.in_(dept_ids))
+        admission_part = admission_part.where(DeptDailyStats.DeptID.in_(dept_ids))
 
-        outpatient_count = db.session.query(func.count(Visit.VisitID)).join(Doctor).filter(Doctor.DeptID == dept_id)
+    facts = union_all(visit_part, admission_part).subquery()
 
-        if start_date:
-            outpatient_count = outpatient_count.filter(Visit.VisitDate >= start_date)
-        if end_date:
-            outpatient_count = outpatient_count.filter(Visit.VisitDate <= end_date)
+    query = select(
+        Department.DeptID,
+        Department.DeptName,
+        func.coalesce(func.sum(facts.c.Visits), 0).label('outpatientCount'),
+        func.coalesce(func.sum(facts.c.Inpatients), 0).label('inpatientCount'),
+        func.coalesce(func.sum(facts.c.Revenue), 0).label('totalRevenue')
+    ).outerjoin(facts, facts.c.DeptID == Department.DeptID) \
+        .group_by(Department.DeptID, Department.DeptName) \
+        .order_by(Department.DeptID)
 
-        outpatient_count = outpatient_count.scalar()
+    if dept_ids is not None:
+        query = query.where(Department.DeptID.in_(dept_ids))
 
-        inpatient_count = db.session.query(func.count(Admission.AdmissionID)).filter(Admission.WardID.in_(
-            db.session.query(Ward.WardID).filter(Ward.DeptID == dept_id)
-        )).filter(Admission.DischargeDate.is_(None)) 
+    return query
 
-        if start_date:
-            inpatient_count = inpatient_count.filter(Admission.AdmissionDate >= start_date)
-        if end_date:
-            inpatient_count = inpatient_count.filter(Admission.AdmissionDate <= end_date)
 
-        inpatient_count = inpatient_count.scalar()
+def _department_stats_rows(rows):
+    return [
+        {
+            "DeptID": row.DeptID,
+            "DeptName": row.DeptName,
+            "outpatientCount": int(row.outpatientCount),
+            "inpatientCount": int(row.inpatientCount),
+            "totalRevenue": int(row.totalRevenue)
+        }
+        for row in rows
+    ]
 
-        total_revenue = db.session.query(func.sum(Visit.Fee)).join(Doctor).filter(Doctor.DeptID == dept_id)
 
-        if start_date:
-            total_revenue = total_revenue.filter(Visit.VisitDate >= start_date)
-        if end_date:
-            total_revenue = total_revenue.filter(Visit.VisitDate <= end_date)
+# 统计结果缓存里的实体，为空表示全部科室
+def _department_stats_entity(dept_ids):
+    return ('dept', frozenset(dept_ids)) if dept_ids is not None else None
+
+
+# 已经结束的区间走统计结果缓存
+def _department_stats(dept_ids, start_date, end_date):
+    def load():
+        rows = db.session.execute(_department_stats_query(dept_ids, start_date, end_date)).all()
+        return _department_stats_rows(rows)
+
+    return stats_cache.fetch('department_stats', _department_stats_entity(dept_ids), start_date, end_date, (), load)
+
+
+@bp.route('/department/<int:dept_id>/stats', methods=['GET'])
+def department_stats(dept_id):
+    try:
+        start_date, end_date, error = _parse_date_range()
+        if error:
+            return error
 
-        total_revenue = total_revenue.scalar() or 0 
+        stats = _department_stats([dept_id], start_date, end_date)
+        if not stats:
+            return jsonify({
+                "code": 404,
+                "error": f"DeptID {dept_id} 未找到"
+            }), 404
 
         return jsonify({
             "code": 200,
-            "data": [
-                {
-                    "DeptID": department.DeptID,
-                    "DeptName": department.DeptName,
-                    "outpatientCount": outpatient_count,
-                    "inpatientCount": inpatient_count,
-                    "totalRevenue": int(total_revenue)
-                }
-            ]
+            "data": stats
         }), 200
 
     except Exception as e:
@@ -95,63 +141,177 @@ def department_stats(dept_id):
             "code": 500,
             "error": f"服务器内部错误: {str(e)}"
         }), 500
-    
 
-@bp.route('/report/revenue', methods=['GET'])
-def revenue_stats():
-    try:
-        start_date_str = request.args.get('startDate')
-        end_date_str = request.args.get('endDate')
 
-        if start_date_str:
-            try:
-                start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
-            except ValueError:
-                return jsonify({
-                    "code": 400,
-                    "error": "startDate 格式不正确，应该是 'YYYY-MM-DD'"
-                }), 400
+@bp.route('/department/stats', methods=['GET'])
+def departments_stats():
+    try:
+        start_date, end_date, error = _parse_date_range()
+        if error:
+            return error
+
+        # ids=1,2,3 指定科室；不传或 ids=all 返回全部科室
+        ids_str = request.args.get('ids', '').strip()
+        if not ids_str or ids_str == 'all':
+            dept_ids = None
         else:
-            start_date = None
-
-        if end_date_str:
             try:
-                end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
+                dept_ids = [int(i) for i in ids_str.split(',') if i.strip()]
             except ValueError:
                 return jsonify({
                     "code": 400,
-                    "error": "endDate 格式不正确，应该是 'YYYY-MM-DD'"
+                    "error": "ids 格式不正确，应该是逗号分隔的科室ID或 all"
                 }), 400
+
+        return jsonify({
+            "code": 200,
+            "data": _department_stats(dept_ids, start_date, end_date)
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            "code": 500,
+            "error": f"服务器内部错误: {str(e)}"
+        }), 500
+    
+
+REVENUE_GROUPS = ('dept', 'doctor')
+# groupBy 对应的分组字段，第一个是排序用的 ID
+REVENUE_GROUP_FIELDS = {
+    None: (),
+    'dept': ('DeptID', 'DeptName'),
+    'doctor': ('DoctorID', 'DoctorName', 'DeptID', 'DeptName')
+}
+
+
+# 医生日汇总按 (分桶, 分组) 求和，分桶在 SQL 里算；按科室分组用的是医生当前所在科室，和科室统计一致
+def _revenue_rows(granularity, group_by, dept_id, start_date, end_date):
+    period = period_start(DoctorDailyStats.StatDate, granularity).label('PeriodStart')
+    columns = {
+        None: [],
+        'dept': [Doctor.DeptID, Department.DeptName],
+        'doctor': [Doctor.DoctorID, Doctor.Name.label('DoctorName'), Doctor.DeptID, Department.DeptName]
+    }[group_by]
+
+    query = db.session.query(
+        period,
+        *columns,
+        func.sum(DoctorDailyStats.VisitCount).label('VisitCount'),
+        func.sum(DoctorDailyStats.FeeSum).label('Revenue')
+    ).filter(*_in_range(DoctorDailyStats.StatDate, start_date, end_date))
+
+    if group_by or dept_id is not None:
+        query = query.join(Doctor, DoctorDailyStats.DoctorID == Doctor.DoctorID)
+    if group_by:
+        query = query.outerjoin(Department, Doctor.DeptID == Department.DeptID)
+    if dept_id is not None:
+        query = query.filter(Doctor.DeptID == dept_id)
+
+    fields = REVENUE_GROUP_FIELDS[group_by]
+    results = {}
+    for row in query.group_by(period, *columns).all():
+        results.setdefault(row.PeriodStart, []).append({
+            **{name: getattr(row, name) for name in fields},
+            "VisitCount": int(row.VisitCount),
+            "Revenue": float(row.Revenue)
+        })
+    return results
+
+
+# {分桶第一天: [各分组的汇总]}。已经结束的分桶（最后一天在今天之前）先查统计结果缓存，
+# 没命中的分桶和还没结束的分桶合在一起查一次库，结束了的写回缓存；有要写回的分桶时这次查询走主库
+def _revenue_buckets(buckets, granularity, group_by, dept_id):
+    entity = ('dept', frozenset([dept_id])) if dept_id is not None else None
+    params = (granularity, group_by)
+    generation = 0
+    if stats_cache.enabled and buckets and stats_cache.closed(buckets[0][2]):
+        generation = stats_cache.shared_generation('revenue')
+    results = {}
+    missing = []
+    for start, first_day, last_day in buckets:
+        cached = None
+        if stats_cache.closed(last_day):
+            cached = stats_cache.get('revenue', entity, first_day, last_day, params, generation)
+        if cached is None:
+            missing.append((start, first_day, last_day))
         else:
-            end_date = None
+            results[start] = cached
 
-        revenue_query = db.session.query(
-            extract('year', Visit.VisitDate).label('Year'),
-            extract('month', Visit.VisitDate).label('Month'),
-            func.sum(Visit.Fee).label('Revenue')
-        ).group_by('Year', 'Month')
+    if missing:
+        token = stats_cache.token()
+        with use_primary() if stats_cache.closed(missing[0][2]) else nullcontext():
+            rows = _revenue_rows(granularity, group_by, dept_id, missing[0][1], missing[-1][2])
+        for start, first_day, last_day in missing:
+            results[start] = rows.get(start, [])
+            stats_cache.set('revenue', entity, first_day, last_day, params, results[start], token, generation)
+    return results
 
-        if start_date:
-            revenue_query = revenue_query.filter(Visit.VisitDate >= start_date)
-        if end_date:
-            revenue_query = revenue_query.filter(Visit.VisitDate <= end_date)
 
-        revenue_details = revenue_query.all()
+# 收入报表：granularity=day|week|month|quarter（默认 month）分桶，groupBy=dept|doctor 再按科室 / 医生拆分，deptId 只看一个科室。
+# 区间内每个分桶、每个出现过的分组都有一条，没有收入的补 0；不传日期时取汇总表里最早 / 最晚的一天
+@bp.route('/report/revenue', methods=['GET'])
+def revenue_stats():
+    try:
+        start_date, end_date, error = _parse_date_range()
+        if error:
+            return error
 
-        total_revenue = int(sum([revenue.Revenue for revenue in revenue_details]))
+        granularity = request.args.get('granularity', 'month')
+        group_by = request.args.get('groupBy') or None
+        dept_id = request.args.get('deptId', type=int)
 
-        details = [
-            {
-                "Period": f"{int(revenue.Year)}-{int(revenue.Month):02d}",
-                "Revenue": float(revenue.Revenue) if revenue.Revenue else 0.0
-            }
-            for revenue in revenue_details
-        ]
+        if granularity not in GRANULARITIES or (group_by is not None and group_by not in REVENUE_GROUPS):
+            return jsonify({
+                "code": 400,
+                "error": "INVALID_QUERY",
+                "message": f"granularity 只支持 {','.join(GRANULARITIES)}，groupBy 只支持 {','.join(REVENUE_GROUPS)}"
+            }), 400
+
+        if start_date is None or end_date is None:
+            first_day, last_day = db.session.query(
+                func.min(DoctorDailyStats.StatDate), func.max(DoctorDailyStats.StatDate)
+            ).one()
+            start_date = start_date or first_day
+            end_date = end_date or last_day
+
+        buckets = periods(start_date, end_date, granularity) if start_date and end_date else []
+        max_periods = current_app.config['REVENUE_REPORT_MAX_PERIODS']
+        if len(buckets) > max_periods:
+            return jsonify({
+                "code": 400,
+                "error": "RANGE_TOO_LARGE",
+                "message": f"区间内的 {granularity} 分桶超过 {max_periods} 个，请缩小日期范围或换更粗的 granularity"
+            }), 400
+
+        results = _revenue_buckets(buckets, granularity, group_by, dept_id)
+
+        fields = REVENUE_GROUP_FIELDS[group_by]
+        groups = {}
+        for rows in results.values():
+            for row in rows:
+                groups.setdefault(tuple(row[name] for name in fields), {name: row[name] for name in fields})
+        keys = sorted(groups, key=lambda key: (key[0] is None, key[0] or 0)) if fields else [()]
+
+        details = []
+        for start, first_day, last_day in buckets:
+            found = {tuple(row[name] for name in fields): row for row in results[start]}
+            for key in keys:
+                row = found.get(key)
+                details.append({
+                    "Period": period_label(start, granularity),
+                    "StartDate": first_day.isoformat(),
+                    "EndDate": last_day.isoformat(),
+                    **groups.get(key, {}),
+                    "VisitCount": row["VisitCount"] if row else 0,
+                    "Revenue": row["Revenue"] if row else 0.0
+                })
 
         return jsonify({
             "code": 200,
             "data": {
-                "Total": total_revenue,
+                "Granularity": granularity,
+                "GroupBy": group_by,
+                "Total": int(sum(detail["Revenue"] for detail in details)),
                 "Details": details
             }
         }), 200
@@ -162,62 +322,169 @@ def revenue_stats():
             "error": f"服务器内部错误: {str(e)}"
         }), 500
 
-@bp.route('/doctor/<int:doctor_id>/workload', methods=['GET'])
-def doctor_workload(doctor_id):
+REVENUE_EXPORT_COLUMNS = [
+    'Date', 'DeptID', 'DeptName', 'DoctorID', 'DoctorName', 'VisitCount', 'Revenue'
+]
+
+
+@bp.route('/report/revenue/export', methods=['GET'])
+def export_revenue():
     try:
-        start_date_str = request.args.get('startDate')
-        end_date_str = request.args.get('endDate')
+        start_date, end_date, error = _parse_date_range()
+        if error:
+            return error
 
-        if start_date_str:
-            try:
-                start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
-            except ValueError:
-                return jsonify({
-                    "code": 400,
-                    "error": "startDate 格式不正确，应该是 'YYYY-MM-DD'"
-                }), 400
-        else:
-            start_date = None
+        fmt = request.args.get('format', 'csv')
+        if fmt not in EXPORT_FORMATS:
+            return jsonify({
+                "code": 400,
+                "error": "format 只支持 csv 或 ndjson"
+            }), 400
+
+        # 按天、按医生的收入明细，来自医生日汇总表
+        query = db.session.query(
+            DoctorDailyStats.StatDate,
+            Department.DeptID,
+            Department.DeptName,
+            Doctor.DoctorID,
+            Doctor.Name.label('DoctorName'),
+            DoctorDailyStats.VisitCount,
+            DoctorDailyStats.FeeSum
+        ).join(Doctor, DoctorDailyStats.DoctorID == Doctor.DoctorID) \
+            .join(Department, Doctor.DeptID == Department.DeptID) \
+            .filter(*_in_range(DoctorDailyStats.StatDate, start_date, end_date)) \
+            .order_by(DoctorDailyStats.StatDate, Doctor.DoctorID) \
+            .yield_per(current_app.config['EXPORT_YIELD_PER'])
+
+        def rows():
+            for row in query:
+                yield {
+                    "Date": row.StatDate.strftime('%Y-%m-%d'),
+                    "DeptID": row.DeptID,
+                    "DeptName": row.DeptName,
+                    "DoctorID": row.DoctorID,
+                    "DoctorName": row.DoctorName,
+                    "VisitCount": row.VisitCount,
+                    "Revenue": float(row.FeeSum)
+                }
 
-        if end_date_str:
-            try:
-                end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
-            except ValueError:
-                return jsonify({
-                    "code": 400,
-                    "error": "endDate 格式不正确，应该是 'YYYY-MM-DD'"
-                }), 400
-        else:
-            end_date = None
+        return export_response(REVENUE_EXPORT_COLUMNS, rows, fmt, 'revenue')
+
+    except Exception as e:
+        return jsonify({
+            "code": 500,
+            "error": f"服务器内部错误: {str(e)}"
+        }), 500
+
+# 医生工作量的三个指标，单个医生和排行榜共用：就诊数、涉及的住院数、去重患者数。
+# 去重计数跨天不能由日汇总相加，直接对区间内的就诊记录 COUNT / COUNT(DISTINCT)，走 (DoctorID, VisitDate) 索引
+WORKLOAD_METRICS = ('visitCount', 'admissionCount', 'totalPatients')
 
-        doctor_info = db.session.query(Doctor).filter(Doctor.DoctorID == doctor_id).first()
+
+def _workload_columns():
+    return [
+        func.count(Visit.VisitID).label('visitCount'),
+        func.count(func.distinct(Visit.AdmissionID)).label('admissionCount'),
+        func.count(func.distinct(Visit.PatientID)).label('totalPatients')
+    ]
+
+
+@bp.route('/doctor/<int:doctor_id>/workload', methods=['GET'])
+def doctor_workload(doctor_id):
+    try:
+        start_date, end_date, error = _parse_date_range()
+        if error:
+            return error
+
+        doctor_info = cache.get(Doctor, doctor_id)
         if not doctor_info:
             return jsonify({
                 "code": 404,
                 "error": f"Doctor with ID {doctor_id} not found"
             }), 404
 
-        visit_query = db.session.query(Visit).filter(Visit.DoctorID == doctor_id)
-
-        if start_date:
-            visit_query = visit_query.filter(Visit.VisitDate >= start_date)
-        if end_date:
-            visit_query = visit_query.filter(Visit.VisitDate <= end_date)
+        def load():
+            workload = db.session.query(*_workload_columns()) \
+                .filter(Visit.DoctorID == doctor_id, *_in_range(Visit.VisitDate, start_date, end_date)).one()
+            return {name: getattr(workload, name) for name in WORKLOAD_METRICS}
 
-        visits = visit_query.all()
-
-        visit_count = len(visits)  
-        admission_count = len(set([visit.AdmissionID for visit in visits if visit.AdmissionID]))
-        total_patients = len(set([visit.PatientID for visit in visits])) 
+        workload = stats_cache.fetch(
+            'doctor_workload', ('doctor', frozenset([doctor_id])), start_date, end_date, (), load
+        )
 
         return jsonify({
             "code": 200,
             "data": {
                 "DoctorID": doctor_info.DoctorID,
                 "Name": doctor_info.Name,
-                "visitCount": visit_count,
-                "admissionCount": admission_count,
-                "totalPatients": total_patients
+                **workload
+            }
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            "code": 500,
+            "error": f"服务器内部错误: {str(e)}"
+        }), 500
+
+
+# 医生工作量排行榜：全院或某个科室（deptId）的医生在区间内按 sortBy 从高到低排，取前 limit 名。
+# 一条 SQL：就诊按医生 GROUP BY 算指标、排序、LIMIT，再 join 医生和科室取名字；区间内没有就诊的医生不上榜
+@bp.route('/doctor/workload', methods=['GET'])
+def doctor_workload_ranking():
+    try:
+        start_date, end_date, error = _parse_date_range()
+        if error:
+            return error
+
+        dept_id = request.args.get('deptId', type=int)
+        sort_by = request.args.get('sortBy', 'visitCount')
+        limit = request.args.get('limit', 10, type=int)
+        max_limit = current_app.config['WORKLOAD_RANKING_MAX_LIMIT']
+
+        if sort_by not in WORKLOAD_METRICS or limit < 1 or limit > max_limit:
+            return jsonify({
+                "code": 400,
+                "error": "INVALID_QUERY",
+                "message": f"sortBy 只支持 {','.join(WORKLOAD_METRICS)}，limit 取值 1 ~ {max_limit}"
+            }), 400
+
+        def load():
+            columns = _workload_columns()
+            metric = columns[WORKLOAD_METRICS.index(sort_by)]
+            ranked = db.session.query(Visit.DoctorID.label('DoctorID'), *columns) \
+                .filter(*_in_range(Visit.VisitDate, start_date, end_date))
+            if dept_id is not None:
+                ranked = ranked.join(Doctor, Visit.DoctorID == Doctor.DoctorID).filter(Doctor.DeptID == dept_id)
+            ranked = ranked.group_by(Visit.DoctorID) \
+                .order_by(metric.desc(), Visit.DoctorID).limit(limit).subquery()
+
+            rows = db.session.query(
+                ranked, Doctor.Name, Doctor.DeptID, Department.DeptName
+            ).join(Doctor, ranked.c.DoctorID == Doctor.DoctorID) \
+                .outerjoin(Department, Doctor.DeptID == Department.DeptID) \
+                .order_by(ranked.c[sort_by].desc(), ranked.c.DoctorID).all()
+
+            return [
+                {
+                    "rank": rank,
+                    "DoctorID": row.DoctorID,
+                    "Name": row.Name,
+                    "DeptID": row.DeptID,
+                    "DeptName": row.DeptName,
+                    **{name: getattr(row, name) for name in WORKLOAD_METRICS}
+                }
+                for rank, row in enumerate(rows, 1)
+            ]
+
+        entity = ('dept', frozenset([dept_id])) if dept_id is not None else None
+        ranking = stats_cache.fetch('doctor_workload_ranking', entity, start_date, end_date, (sort_by, limit), load)
+
+        return jsonify({
+            "code": 200,
+            "data": {
+                "sortBy": sort_by,
+                "list": ranking
             }
         }), 200
 
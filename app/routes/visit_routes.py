@@ -1,5 +1,5 @@
-from flask import jsonify, request, Blueprint
-from app.extensions import db
+from flask import jsonify, request, Blueprint, current_app
+from app.extensions import db, cache
 from app.models.visit import Visit
 from app.models.patient import Patient
 from app.models.doctor import Doctor
@@ -7,18 +7,173 @@ from app.models.admission import Admission
 from datetime import datetime
 from app.models.ward import Ward
 from app.models.department import Department
+from app.utils import rollup, occupancy
+from app.utils.ids import assign_ids
+from app.utils.validators import validate_visit
+from app.utils.export import EXPORT_FORMATS, export_response
+from app.utils.pagination import paginate, page_meta, InvalidCursorError, invalid_cursor_response
+from app.utils.batch import parse_ids, batch_data, InvalidIdsError, invalid_ids_response
+from app.utils.bulk import visit_references
+from app.utils.serializers import serializer
+from app.utils.projection import parse_fields, InvalidFieldsError, invalid_fields_response
 
 bp = Blueprint('visit', __name__)
 
+
+# 列表和导出共用的过滤条件：patientId、doctorId、startDate、endDate。
+# args 是请求参数，query 可以是 db.session.query(...) 也可以是 select(...)，异步接口（app/async_api.py）也用；
+# 参数不对时返回错误内容
+def _filter_visits(query, args):
+    patient_id = args.get('patientId', type=int)
+    doctor_id = args.get('doctorId', type=int)
+    start_date = args.get('startDate', type=str)
+    end_date = args.get('endDate', type=str)
+
+    if patient_id is not None:
+        query = query.filter(Visit.PatientID == patient_id)
+    if doctor_id is not None:
+        query = query.filter(Visit.DoctorID == doctor_id)
+    if start_date:
+        try:
+            start_date_obj = datetime.strptime(start_date, '%Y-%m-%d')
+            query = query.filter(Visit.VisitDate >= start_date_obj)
+        except ValueError:
+            return None, {
+                "code": 400,
+                "error": "START_DATE_INVALID",
+                "message": "开始日期格式不正确，应该为 YYYY-MM-DD"
+            }
+    if end_date:
+        try:
+            end_date_obj = datetime.strptime(end_date, '%Y-%m-%d')
+            query = query.filter(Visit.VisitDate <= end_date_obj)
+        except ValueError:
+            return None, {
+                "code": 400,
+                "error": "END_DATE_INVALID",
+                "message": "结束日期格式不正确，应该为 YYYY-MM-DD"
+            }
+
+    return query, None
+
+
+VISIT_EXPANSIONS = ('patient', 'doctor', 'admission')
+# 展开时要用到的外键，不管 fields 怎么写都会查出来
+VISIT_EXPAND_KEYS = {'patient': 'PatientID', 'doctor': 'DoctorID', 'admission': 'AdmissionID'}
+
+VISIT_FIELDS = tuple(column.key for column in Visit.__mapper__.column_attrs)
+# 主诉、诊断、处方是 Text 列，列表默认不查，需要时用 fields 指定
+VISIT_TEXT_FIELDS = ('Complaint', 'Diagnosis', 'Prescription')
+VISIT_LIST_FIELDS = tuple(name for name in VISIT_FIELDS if name not in VISIT_TEXT_FIELDS)
+
+
+def _parse_visit_fields(value, default=VISIT_FIELDS, expand=()):
+    return parse_fields(
+        value, VISIT_FIELDS, default,
+        required=('VisitID',) + tuple(VISIT_EXPAND_KEYS[name] for name in expand)
+    )
+
+
+def _visit_columns(fields):
+    return [getattr(Visit, name) for name in fields]
+
+
+# expand=patient,doctor,admission：在列表里直接带上患者、医生（含科室）和住院（含病房）的摘要
+def _parse_expand(value):
+    expand = {part.strip() for part in value.split(',') if part.strip()}
+    if expand - set(VISIT_EXPANSIONS):
+        return None, {
+            "code": 400,
+            "error": "INVALID_EXPAND",
+            "message": f"expand 只支持 {','.join(VISIT_EXPANSIONS)}"
+        }
+    return expand, None
+
+
+# 在同一条联表查询里多取几列，不会按行再查；query 可以是 db.session.query(...) 也可以是 select(...)，
+# 要求已经 join 了 Patient 和 Doctor
+def _expand_visits(query, expand):
+    if 'patient' in expand:
+        query = query.add_columns(Patient.Name.label('PatientName'), Patient.Gender.label('PatientGender'))
+    if 'doctor' in expand:
+        query = query.join(Department, Doctor.DeptID == Department.DeptID).add_columns(
+            Doctor.Name.label('DoctorName'), Doctor.Title.label('DoctorTitle'),
+            Doctor.DeptID.label('DoctorDeptID'), Department.DeptName.label('DoctorDeptName')
+        )
+    if 'admission' in expand:
+        query = query.outerjoin(Admission, Visit.AdmissionID == Admission.AdmissionID) \
+            .outerjoin(Ward, Admission.WardID == Ward.WardID).add_columns(
+                Admission.WardID.label('AdmissionWardID'), Ward.WardName.label('AdmissionWardName'),
+                Admission.BedNo.label('AdmissionBedNo'), Admission.AdmissionDate.label('AdmissionDate'),
+                Admission.DischargeDate.label('AdmissionDischargeDate')
+            )
+    return query
+
+
+# expand 出来的列带前缀标签，见 _expand_visits
+_visit_patient = serializer(Patient, {"PatientID": 'PatientID', "Name": 'PatientName', "Gender": 'PatientGender'})
+_visit_doctor = serializer(Doctor, {
+    "DoctorID": 'DoctorID', "Name": 'DoctorName', "Title": 'DoctorTitle',
+    "DeptID": 'DoctorDeptID', "DeptName": 'DoctorDeptName'
+})
+_visit_admission = serializer(Admission, {
+    "AdmissionID": 'AdmissionID', "WardID": 'AdmissionWardID', "WardName": 'AdmissionWardName',
+    "BedNo": 'AdmissionBedNo', "AdmissionDate": 'AdmissionDate', "DischargeDate": 'AdmissionDischargeDate'
+})
+
+
+# 列表、详情、批量和导出接口共用；visit 可以是 Visit 对象，也可以是同名列的查询结果行，fields 是要输出的 Visit 列
+def _visit_data(visit, expand=(), fields=VISIT_FIELDS):
+    data = serializer(Visit, fields)(visit)
+    if 'patient' in expand:
+        data["Patient"] = _visit_patient(visit)
+    if 'doctor' in expand:
+        data["Doctor"] = _visit_doctor(visit)
+    if 'admission' in expand:
+        data["Admission"] = _visit_admission(visit) \
+            if visit.AdmissionID is not None and visit.AdmissionDate is not None else None
+    return data
+
+
+# GET /visit 的查询，同步和异步接口共用：make_query 是 db.session.query 或 select，
+# 返回 (查询, 每行的序列化函数, 错误内容)；fields 不对时抛 InvalidFieldsError
+def _visit_list_query(args, make_query):
+    expand, error = _parse_expand(args.get('expand', ''))
+    if error:
+        return None, None, error
+    fields = _parse_visit_fields(args.get('fields'), VISIT_LIST_FIELDS, expand)
+
+    query = make_query(*_visit_columns(fields)) \
+        .join(Patient, Visit.PatientID == Patient.PatientID).join(Doctor, Visit.DoctorID == Doctor.DoctorID)
+
+    query, error = _filter_visits(query, args)
+    if error:
+        return None, None, error
+    return _expand_visits(query, expand), lambda visit: _visit_data(visit, expand, fields), None
+
+
+# cursor 模式下需要带上 nextCursor，列表放进 list 字段；普通分页保持原来的返回格式
+def _visit_list_body(pagination, serialize):
+    visits_list = [serialize(visit) for visit in pagination.items]
+    if getattr(pagination, 'is_cursor', False):
+        return {
+            "code": 200,
+            "data": {
+                **page_meta(pagination),
+                "list": visits_list
+            }
+        }
+    return {
+        "code": 200,
+        "data": visits_list
+    }
+
+
 @bp.route('/visit', methods=['GET'])
 def get_visits():
     try:
         page = request.args.get('page', 1, type=int)
         page_size = request.args.get('pageSize', 10, type=int)
-        patient_id = request.args.get('patientId', type=int)
-        doctor_id = request.args.get('doctorId', type=int)
-        start_date = request.args.get('startDate', type=str)
-        end_date = request.args.get('endDate', type=str)
 
         if page < 1 or page_size < 1:
             return jsonify({
@@ -26,71 +181,106 @@ def get_visits():
                 "error": "分页参数必须大于0"
             }), 400
 
-        query = db.session.query(
-            Visit.VisitID, Visit.PatientID, Visit.DoctorID, Visit.AdmissionID,
-            Visit.VisitDate, Visit.Complaint, Visit.Diagnosis, Visit.Prescription, Visit.Fee
-        ).join(Patient, Visit.PatientID == Patient.PatientID).join(Doctor, Visit.DoctorID == Doctor.DoctorID)
-
-        if patient_id is not None:
-            query = query.filter(Visit.PatientID == patient_id)
-        if doctor_id is not None:
-            query = query.filter(Visit.DoctorID == doctor_id)
-        if start_date:
-            try:
-                start_date_obj = datetime.strptime(start_date, '%Y-%m-%d')
-                query = query.filter(Visit.VisitDate >= start_date_obj)
-            except ValueError:
-                return jsonify({
-                    "code": 400,
-                    "error": "START_DATE_INVALID",
-                    "message": "开始日期格式不正确，应该为 YYYY-MM-DD"
-                }), 400
-        if end_date:
-            try:
-                end_date_obj = datetime.strptime(end_date, '%Y-%m-%d')
-                query = query.filter(Visit.VisitDate <= end_date_obj)
-            except ValueError:
-                return jsonify({
-                    "code": 400,
-                    "error": "END_DATE_INVALID",
-                    "message": "结束日期格式不正确，应该为 YYYY-MM-DD"
-                }), 400
-
-        pagination = query.paginate(page=page, per_page=page_size, error_out=False)
-
-        visits_list = []
-        for visit in pagination.items:
-            visits_list.append({
-                "VisitID": visit.VisitID,
-                "PatientID": visit.PatientID,
-                "DoctorID": visit.DoctorID,
-                "AdmissionID": visit.AdmissionID,
-                "VisitDate": visit.VisitDate.strftime('%Y-%m-%d'),
-                "Complaint": visit.Complaint,
-                "Diagnosis": visit.Diagnosis,
-                "Prescription": visit.Prescription,
-                "Fee": float(visit.Fee) if visit.Fee is not None else None
-            })
+        query, serialize, error = _visit_list_query(request.args, db.session.query)
+        if error:
+            return jsonify(error), 400
 
+        pagination = paginate(query, Visit.VisitID, page, page_size)
+        return jsonify(_visit_list_body(pagination, serialize)), 200
+    except InvalidCursorError:
+        return invalid_cursor_response()
+    except InvalidFieldsError:
+        return invalid_fields_response(VISIT_FIELDS)
+    except Exception as e:
         return jsonify({
-            "code": 200,
-            "data": visits_list
-        }), 200
+            "code": 500,
+            "error": f"服务器内部错误: {str(e)}"
+        }), 500
+
+
+@bp.route('/visit/export', methods=['GET'])
+def export_visits():
+    try:
+        fmt = request.args.get('format', 'csv')
+        if fmt not in EXPORT_FORMATS:
+            return jsonify({
+                "code": 400,
+                "error": "INVALID_FORMAT",
+                "message": "format 只支持 csv 或 ndjson"
+            }), 400
+
+        fields = _parse_visit_fields(request.args.get('fields'))
+        query = db.session.query(*_visit_columns(fields)) \
+            .join(Patient, Visit.PatientID == Patient.PatientID).join(Doctor, Visit.DoctorID == Doctor.DoctorID)
+
+        query, error = _filter_visits(query, request.args)
+        if error:
+            return jsonify(error), 400
+
+        # yield_per 会开启 stream_results，用服务端游标分批取数
+        query = query.order_by(Visit.VisitID).yield_per(current_app.config['EXPORT_YIELD_PER'])
+        serialize = serializer(Visit, fields)
+
+        def rows():
+            for visit in query:
+                yield serialize(visit)
+
+        return export_response(list(fields), rows, fmt, 'visits')
+
+    except InvalidFieldsError:
+        return invalid_fields_response(VISIT_FIELDS)
     except Exception as e:
         return jsonify({
             "code": 500,
             "error": f"服务器内部错误: {str(e)}"
         }), 500
 
+# 校验一组新增就诊：引用的患者、医生、入院记录用一次查询确认存在，返回 [(values, errors)]
+def _validate_visits(items):
+    found = visit_references(items)
+    checked = []
+    for data in items:
+        try:
+            checked.append(validate_visit(
+                data,
+                patient_exists=lambda patient_id: patient_id in found["PatientID"],
+                doctor_exists=lambda doctor_id: doctor_id in found["DoctorID"],
+                admission_exists=lambda admission_id: admission_id in found["AdmissionID"]
+            ))
+        except (AttributeError, TypeError):
+            # 不是 JSON 对象，或者字段类型不对（比如主诉写成了数字）
+            checked.append((None, [{"field": "", "message": "字段类型不正确"}]))
+    return checked
+
+
+# 汇总表、占用索引和新记录在同一个事务里写入，调用方负责提交
+# 主键要在写汇总表之前一次分配好：hilo 号段用的是另一个连接，SQLite 上本事务拿到写锁之后再去取号会互相等待
+def _insert_visits(rows):
+    visits = []
+    for values in assign_ids(Visit, rows):
+        rollup.record_visit(values['DoctorID'], values['VisitDate'], values['Fee'])
+        occupancy.record_visit(values['AdmissionID'], values['PatientID'])
+        visits.append(Visit(**values))
+    db.session.add_all(visits)
+    return visits
+
+
+def _require_json():
+    if request.headers.get('Content-Type') != 'application/json':
+        return jsonify({
+            "code": 415,
+            "error": "INVALID_CONTENT_TYPE",
+            "message": "必须使用 application/json 格式"
+        }), 415
+    return None
+
+
 @bp.route('/visit', methods=['POST'])
 def add_visit():
     try:
-        if request.headers.get('Content-Type') != 'application/json':
-            return jsonify({
-                "code": 415,
-                "error": "INVALID_CONTENT_TYPE",
-                "message": "必须使用 application/json 格式"
-            }), 415
+        error = _require_json()
+        if error:
+            return error
 
         data = request.get_json()
         if not data:
@@ -100,60 +290,7 @@ def add_visit():
                 "message": "请求体不能为空"
             }), 400
 
-        errors = []
-        
-        try:
-            patient_id = int(data.get('PatientID'))
-        except (TypeError, ValueError):
-            errors.append({"field": "PatientID", "message": "患者ID必须为整数"})
-        
-        try:
-            doctor_id = int(data.get('DoctorID'))
-        except (TypeError, ValueError):
-            errors.append({"field": "DoctorID", "message": "医生ID必须为整数"})
-        else:
-            doctor = Doctor.query.get(doctor_id)
-            if not doctor:
-                errors.append({"field": "DoctorID", "message": "指定的医生不存在"})
-
-        admission_id = data.get('AdmissionID')
-        if admission_id is not None:
-            try:
-                admission_id = int(admission_id)
-            except (TypeError, ValueError):
-                errors.append({"field": "AdmissionID", "message": "入院ID必须为整数"})
-            else:
-                admission = Admission.query.get(admission_id)
-                if not admission:
-                    errors.append({"field": "AdmissionID", "message": "指定的入院记录不存在"})
-
-        visit_date = data.get('VisitDate', '').strip()
-        if not visit_date:
-            errors.append({"field": "VisitDate", "message": "就诊日期不能为空"})
-        else:
-            try:
-                visit_date = datetime.strptime(visit_date, '%Y-%m-%d')
-            except ValueError:
-                errors.append({"field": "VisitDate", "message": "就诊日期格式不正确，应该为 YYYY-MM-DD"})
-
-        complaint = data.get('Complaint', '').strip()
-        if not complaint:
-            errors.append({"field": "Complaint", "message": "主诉不能为空"})
-
-        diagnosis = data.get('Diagnosis', '').strip()
-        if not diagnosis:
-            errors.append({"field": "Diagnosis", "message": "诊断不能为空"})
-
-        prescription = data.get('Prescription', '').strip()
-        if not prescription:
-            errors.append({"field": "Prescription", "message": "处方不能为空"})
-
-        try:
-            fee = float(data.get('Fee'))
-            if fee <= 0:
-                errors.append({"field": "Fee", "message": "费用必须大于0"})
-        except (TypeError, ValueError):
-            errors.append({"field": "Fee", "message": "费用必须为正数"})
+        [(values, errors)] = _validate_visits([data])
 
         if errors:
             return jsonify({
@@ -163,44 +300,77 @@ def add_visit():
                 "details": errors
             }), 400
 
-        max_visit_id = db.session.query(db.func.max(Visit.VisitID)).scalar()  
-        new_visit_id = max_visit_id + 1 if max_visit_id else 1  
+        [new_visit] = _insert_visits([values])
+        # 提交前 flush 拿到主键并组好返回内容，提交之后对象过期，再读属性会多查一次库
+        db.session.flush()
+        visit_data = _visit_data(new_visit)
+        db.session.commit()
+        rollup.invalidate_visits([values])
 
+        return jsonify({
+            "code": 201,
+            "data": visit_data
+        }), 201
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            "code": 500,
+            "error": "INTERNAL_SERVER_ERROR",
+            "message": f"服务器内部错误: {str(e)}"
+        }), 500
 
-        new_visit = Visit(
-            VisitID=new_visit_id,
-            PatientID=patient_id,
-            DoctorID=doctor_id,
-            AdmissionID=admission_id if admission_id else None,
-            VisitDate=visit_date,
-            Complaint=complaint,
-            Diagnosis=diagnosis,
-            Prescription=prescription,
-            Fee=fee
-        )
-        
-        db.session.add(new_visit)
-        db.session.commit()
-        db.session.refresh(new_visit)
 
-        patient = Patient.query.get(patient_id)
-        doctor = Doctor.query.get(doctor_id)
-        admission = Admission.query.get(admission_id) if admission_id else None
+# 诊室终端一次提交多条就诊：body 是就诊记录数组，每条的校验规则和 POST /visit 一样。
+# 校验不通过的条目单独返回错误，其余条目在同一个事务里写入、一次提交；results 和请求顺序一一对应
+@bp.route('/visit/batch', methods=['POST'])
+def add_visits_batch():
+    try:
+        error = _require_json()
+        if error:
+            return error
+
+        items = request.get_json()
+        max_items = current_app.config['VISIT_BATCH_MAX_ITEMS']
+        if not isinstance(items, list) or not items or len(items) > max_items:
+            return jsonify({
+                "code": 400,
+                "error": "INVALID_BATCH",
+                "message": f"请求体必须是 1 ~ {max_items} 条就诊记录组成的数组"
+            }), 400
+
+        results = []
+        created = []
+        for index, (values, errors) in enumerate(_validate_visits(items)):
+            if errors:
+                results.append({
+                    "Index": index,
+                    "code": 400,
+                    "error": "PARAM_VALIDATION_FAILED",
+                    "message": "参数验证失败",
+                    "details": errors
+                })
+                continue
+            result = {"Index": index, "code": 201}
+            results.append(result)
+            created.append((result, values))
+
+        visits = _insert_visits([values for _, values in created])
+        db.session.flush()
+        for (result, _), visit in zip(created, visits):
+            result["data"] = _visit_data(visit)
+        db.session.commit()
+        rollup.invalidate_visits([values for _, values in created])
 
         return jsonify({
-            "code": 201,
+            "code": 200,
             "data": {
-                "VisitID": new_visit.VisitID,
-                "PatientID": new_visit.PatientID,
-                "DoctorID": new_visit.DoctorID,
-                "AdmissionID": new_visit.AdmissionID,
-                "VisitDate": new_visit.VisitDate.strftime('%Y-%m-%d'),
-                "Complaint": new_visit.Complaint,
-                "Diagnosis": new_visit.Diagnosis,
-                "Prescription": new_visit.Prescription,
-                "Fee": float(new_visit.Fee)
+                "total": len(items),
+                "created": len(created),
+                "failed": len(items) - len(created),
+                "results": results
             }
-        }), 201
+        }), 200
 
     except Exception as e:
         db.session.rollback()
@@ -209,13 +379,13 @@ def add_visit():
             "error": "INTERNAL_SERVER_ERROR",
             "message": f"服务器内部错误: {str(e)}"
         }), 500
-    
 
 
 @bp.route('/visit/<int:visit_id>', methods=['GET'])
 def check_visit(visit_id):
     try:
-        visit = Visit.query.get(visit_id)
+        fields = _parse_visit_fields(request.args.get('fields'))
+        visit = db.session.query(*_visit_columns(fields)).filter(Visit.VisitID == visit_id).first()
 
         if not visit:
             return jsonify({
@@ -225,19 +395,35 @@ def check_visit(visit_id):
 
         return jsonify({
             "code": 200,
-            "data": {
-                "VisitID": visit.VisitID,
-                "PatientID": visit.PatientID,
-                "DoctorID": visit.DoctorID,
-                "AdmissionID": visit.AdmissionID,
-                "VisitDate": visit.VisitDate.strftime('%Y-%m-%d'), 
-                "Complaint": visit.Complaint,
-                "Diagnosis": visit.Diagnosis,
-                "Prescription": visit.Prescription,
-                "Fee": float(visit.Fee) if visit.Fee is not None else None
-            }
+            "data": _visit_data(visit, fields=fields)
+        }), 200
+
+    except InvalidFieldsError:
+        return invalid_fields_response(VISIT_FIELDS)
+    except Exception as e:
+        return jsonify({
+            "code": 500,
+            "error": f"服务器内部错误: {str(e)}"
+        }), 500
+
+
+# 一次取多条就诊记录：GET /visit/batch?ids=3,1,2，按 ids 的顺序返回，查不到的放在 missing 里
+@bp.route('/visit/batch', methods=['GET'])
+def check_visits_batch():
+    try:
+        ids = parse_ids()
+        fields = _parse_visit_fields(request.args.get('fields'))
+        visits = db.session.query(*_visit_columns(fields)).filter(Visit.VisitID.in_(ids)).all()
+
+        return jsonify({
+            "code": 200,
+            "data": batch_data(ids, visits, lambda visit: visit.VisitID, lambda visit: _visit_data(visit, fields=fields))
         }), 200
 
+    except InvalidIdsError:
+        return invalid_ids_response()
+    except InvalidFieldsError:
+        return invalid_fields_response(VISIT_FIELDS)
     except Exception as e:
         return jsonify({
             "code": 500,
@@ -266,21 +452,12 @@ def edit_prescription(visit_id):
             }), 400
 
         visit.Prescription = prescription
+        # 处方不参与任何统计，不用清统计结果缓存
         db.session.commit()  
 
         return jsonify({
             "code": 200,
-            "data": {
-                "VisitID": visit.VisitID,
-                "PatientID": visit.PatientID,
-                "DoctorID": visit.DoctorID,
-                "AdmissionID": visit.AdmissionID,
-                "VisitDate": visit.VisitDate.strftime('%Y-%m-%d'),  
-                "Complaint": visit.Complaint,
-                "Diagnosis": visit.Diagnosis,
-                "Prescription": visit.Prescription,
-                "Fee": float(visit.Fee)
-            }
+            "data": _visit_data(visit)
         }), 200
 
     except Exception as e:
@@ -1,17 +1,26 @@
 from flask import jsonify, request, Blueprint
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import select
 from app.models.ward import Ward
 from app.models.department import Department
 from app.models.admission import Admission
-from app.extensions import db
+from app.extensions import db, cache, versions
 from app.models.patient import Patient
 from app.models.visit import Visit
+from app.models.ward_occupancy import WardOccupancy
+from app.models.bed_occupancy import BedOccupancy
+from app.utils.ids import next_id
+from app.utils.pagination import paginate, page_meta, InvalidCursorError, invalid_cursor_response
+from app.utils.serializers import serializer
 
 
 bp = Blueprint('ward', __name__)
 
+_ward_data = serializer(Ward)
+
 
 @bp.route('/ward', methods=['GET'])
+@versions.conditional(Ward, Department)
 def get_wards():
     try:
         page = request.args.get('page', 1, type=int)
@@ -32,32 +41,17 @@ def get_wards():
         if floor is not None:
             query = query.filter(Ward.Floor == floor)
 
-        pagination = query.paginate(
-            page=page,
-            per_page=page_size,
-            error_out=False
-        )
-
-        wards_list = []
-        for ward, dept_name in pagination.items:
-            wards_list.append({
-                "WardID": ward.WardID,
-                "WardName": ward.WardName,
-                "Floor": ward.Floor,
-                "Capacity": ward.Capacity,
-                "DeptID": ward.DeptID,
-                "DeptName": dept_name 
-            })
+        pagination = paginate(query, Ward.WardID, page, page_size)
 
         return jsonify({
             "code": 200,
             "data": {
-                "total": pagination.total,
-                "page": pagination.page,
-                "pageSize": page_size,
-                "list": wards_list
+                **page_meta(pagination),
+                "list": [{**_ward_data(ward), "DeptName": dept_name} for ward, dept_name in pagination.items]
             }
         }), 200
+    except InvalidCursorError:
+        return invalid_cursor_response()
     except Exception as e:
         return jsonify({
             "code": 500,
@@ -108,7 +102,7 @@ def add_ward():
         except (TypeError, ValueError):
             errors.append({"field": "DeptID", "message": "科室ID必须为整数"})
         else:
-            department = Department.query.get(dept_id)
+            department = cache.get(Department, dept_id)
             if not department:
                 return jsonify({
                     "code": 404,
@@ -124,11 +118,8 @@ def add_ward():
                 "details": errors
             }), 400
         
-        max_ward_id = db.session.query(db.func.max(Ward.WardID)).scalar()  
-        new_ward_id = max_ward_id + 1 if max_ward_id else 1  
-
         new_ward = Ward(
-            WardID=new_ward_id,  
+            WardID=next_id(Ward),
             WardName=ward_name,
             Floor=floor,
             Capacity=capacity,
@@ -136,17 +127,14 @@ def add_ward():
         )
         
         db.session.add(new_ward)
+        versions.bump(Ward)
         db.session.commit()
         db.session.refresh(new_ward)
 
         return jsonify({
             "code": 201,
             "data": {
-                "WardID": new_ward.WardID,
-                "WardName": new_ward.WardName,
-                "Floor": new_ward.Floor,
-                "Capacity": new_ward.Capacity,
-                "DeptID": new_ward.DeptID,
+                **_ward_data(new_ward),
                 "DeptName": department.DeptName
             }
         }), 201
@@ -160,51 +148,97 @@ def add_ward():
         }), 500
 
 
+# 只构造语句不执行，异步读接口（app/async_api.py）也用同一条语句
+def _occupied_beds_query(ward_ids):
+    return select(BedOccupancy, Patient.Name).outerjoin(
+        Patient, Patient.PatientID == BedOccupancy.PatientID
+    ).where(BedOccupancy.WardID.in_(ward_ids)).order_by(BedOccupancy.AdmissionID)
+
+
+def _occupied_beds(ward_ids):
+    return db.session.execute(_occupied_beds_query(ward_ids)).all()
+
+
+def _bed_status(bed, patient_name):
+    return {
+        "BedNo": bed.BedNo,
+        "PatientID": bed.PatientID,
+        "PatientName": patient_name if patient_name else "未知"
+    }
+
+
+# 病房详情，同步和异步接口共用；summary 是 WardOccupancy 行，beds 是 _occupied_beds_query 的结果
+def _ward_detail_data(ward, department, summary, beds):
+    occupied = summary.OccupiedBeds if summary else 0
+    return {
+        **_ward_data(ward),
+        "DeptName": department.DeptName if department else "",
+        "OccupiedBeds": occupied,
+        "AvailableBeds": ward.Capacity - occupied,
+        "BedStatus": [_bed_status(bed, patient_name) for bed, patient_name in beds]
+    }
+
+
+@bp.route('/ward/occupancy', methods=['GET'])
+def get_wards_occupancy():
+    try:
+        dept_id = request.args.get('deptId', type=int)
+        with_beds = request.args.get('withBeds', '0') in ('1', 'true')
+
+        query = db.session.query(Ward, WardOccupancy.OccupiedBeds).outerjoin(
+            WardOccupancy, WardOccupancy.WardID == Ward.WardID
+        )
+        if dept_id is not None:
+            query = query.filter(Ward.DeptID == dept_id)
+        wards = query.order_by(Ward.WardID).all()
+
+        beds = {}
+        if with_beds and wards:
+            for bed, patient_name in _occupied_beds([ward.WardID for ward, _ in wards]):
+                beds.setdefault(bed.WardID, []).append(_bed_status(bed, patient_name))
+
+        occupancy_list = []
+        for ward, occupied in wards:
+            occupied = occupied or 0
+            item = {
+                **_ward_data(ward),
+                "OccupiedBeds": occupied,
+                "AvailableBeds": ward.Capacity - occupied if ward.Capacity is not None else None
+            }
+            if with_beds:
+                item["BedStatus"] = beds.get(ward.WardID, [])
+            occupancy_list.append(item)
+
+        return jsonify({
+            "code": 200,
+            "data": occupancy_list
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            "code": 500,
+            "error": f"服务器内部错误: {str(e)}"
+        }), 500
+
+
 @bp.route('/ward/<int:ward_id>', methods=['GET'])
 def get_ward_detail(ward_id):
     try:
-        ward = Ward.query.get(ward_id)
+        ward = cache.get(Ward, ward_id)
         if not ward:
             return jsonify({
                 "code": 404,
                 "error": "病房不存在"
             }), 404
 
-        department = Department.query.get(ward.DeptID)  
-
-        admissions = db.session.query(Admission, Patient).join(
-            Visit, Visit.AdmissionID == Admission.AdmissionID  
-        ).join(
-            Patient, Patient.PatientID == Visit.PatientID  
-        ).filter(
-            Admission.WardID == ward_id,
-            Admission.DischargeDate == None  
-        ).all()
+        department = cache.get(Department, ward.DeptID)
 
-        occupied = len(admissions)
-        available = ward.Capacity - occupied
-
-        bed_status = []
-        for admission, patient in admissions:
-            bed_status.append({
-                "BedNo": admission.BedNo,
-                "PatientID": patient.PatientID if patient else None,
-                "PatientName": patient.Name if patient else "未知"
-            })
+        # 床位占用从占用索引读取，不再扫描 Admission 表
+        summary = WardOccupancy.query.get(ward_id)
 
         return jsonify({
             "code": 200,
-            "data": {
-                "WardID": ward.WardID,
-                "WardName": ward.WardName,
-                "Floor": ward.Floor,
-                "Capacity": ward.Capacity,
-                "DeptID": ward.DeptID,
-                "DeptName": department.DeptName if department else "", 
-                "OccupiedBeds": occupied,
-                "AvailableBeds": available,
-                "BedStatus": bed_status
-            }
+            "data": _ward_detail_data(ward, department, summary, _occupied_beds([ward_id]))
         }), 200
 
     except Exception as e:
@@ -233,18 +267,16 @@ def edit_ward(ward_id):
         if "Capacity" in data:
             ward.Capacity = data["Capacity"]
 
+        versions.bump(Ward)
         db.session.commit()
+        cache.invalidate(Ward, ward_id)
 
-        department = Department.query.get(ward.DeptID)
+        department = cache.get(Department, ward.DeptID)
 
         return jsonify({
             "code": 200,
             "data": {
-                "WardID": ward.WardID,
-                "WardName": ward.WardName,
-                "Floor": ward.Floor,
-                "Capacity": ward.Capacity,
-                "DeptID": ward.DeptID,
+                **_ward_data(ward),
                 "DeptName": department.DeptName if department else ""  
             }
         }), 200
@@ -0,0 +1,37 @@
+from flask import current_app, request, jsonify
+
+
+class InvalidIdsError(ValueError):
+    pass
+
+
+# ids=3,1,2：去掉重复但保留请求里的顺序，数量不能超过 BATCH_MAX_IDS
+def parse_ids():
+    ids_str = request.args.get('ids', '').strip()
+    ids = []
+    try:
+        for part in ids_str.split(','):
+            if part.strip() and int(part) not in ids:
+                ids.append(int(part))
+    except ValueError:
+        raise InvalidIdsError(ids_str)
+    if not ids or len(ids) > current_app.config['BATCH_MAX_IDS']:
+        raise InvalidIdsError(ids_str)
+    return ids
+
+
+# rows 是一次 IN 查询的结果，按请求的顺序排好，查不到的 ID 放进 missing
+def batch_data(ids, rows, key, serialize):
+    by_id = {key(row): row for row in rows}
+    return {
+        "list": [serialize(by_id[i]) for i in ids if i in by_id],
+        "missing": [i for i in ids if i not in by_id]
+    }
+
+
+def invalid_ids_response():
+    return jsonify({
+        "code": 400,
+        "error": "INVALID_IDS",
+        "message": f"ids 应该是逗号分隔的 ID，最多 {current_app.config['BATCH_MAX_IDS']} 个"
+    }), 400
@@ -0,0 +1,273 @@
+import csv
+import json
+from datetime import datetime
+from sqlalchemy import insert, literal, select, union_all
+from sqlalchemy.exc import IntegrityError
+from ..extensions import db
+from ..models.patient import Patient
+from ..models.visit import Visit
+from ..models.admission import Admission
+from ..models.doctor import Doctor
+from ..models.ward import Ward
+from . import rollup, occupancy
+from .ids import assign_ids
+from .validators import validate_patient, validate_visit, validate_admission
+
+# 批量导入：逐行读取 NDJSON / CSV，复用单条接口的字段校验，
+# 按 batch_size 攒批后用 Core insert() 一次 executemany 写入并提交。
+# 某一批写入冲突时回退到逐行写入，只记录出错的行，不影响同批其他行。
+
+ENTITIES = ('patient', 'visit', 'admission')
+
+
+def _decode(lines):
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8-sig')
+        yield line
+
+
+def read_rows(lines, fmt):
+    lines = _decode(lines)
+    if fmt == 'csv':
+        reader = csv.DictReader(lines)
+        for row in reader:
+            # CSV 空单元格视为未填写
+            yield reader.line_num, {k: v for k, v in row.items() if k and v != ''}
+        return
+
+    for line_no, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError:
+            data = None
+        yield line_no, data
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# 一次查询确认一批就诊记录引用的患者、医生、入院记录是否存在，返回 {字段: 存在的 ID 集合}；
+# 单条新增就诊和 /visit/batch 也用它
+def visit_references(items):
+    found = {"PatientID": set(), "DoctorID": set(), "AdmissionID": set()}
+    parts = []
+    for field, column in (
+        ("PatientID", Patient.PatientID), ("DoctorID", Doctor.DoctorID), ("AdmissionID", Admission.AdmissionID)
+    ):
+        ids = {_to_int(data.get(field)) for data in items if isinstance(data, dict)} - {None}
+        if ids:
+            parts.append(select(literal(field).label('Field'), column.label('ID')).where(column.in_(ids)))
+    if parts:
+        for field, value in db.session.execute(union_all(*parts) if len(parts) > 1 else parts[0]):
+            found[field].add(value)
+    return found
+
+
+def _ids_in(column, ids):
+    ids = {i for i in ids if i is not None}
+    if not ids:
+        return set()
+    return {row[0] for row in db.session.query(column).filter(column.in_(ids))}
+
+
+# 字段类型不对（比如 NDJSON 里把身份证号写成数字）时校验函数会直接抛异常，这里转成行错误
+def _validate(validate, line_no, data, *args, **kwargs):
+    try:
+        return validate(data, *args, **kwargs)
+    except (AttributeError, TypeError):
+        return None, {"line": line_no, "error": "INVALID_ROW", "message": "字段类型不正确"}
+
+
+def _validation_error(line_no, errors):
+    return {
+        "line": line_no,
+        "error": "PARAM_VALIDATION_FAILED",
+        "message": "参数验证失败",
+        "details": errors
+    }
+
+
+def _prepare_patients(batch):
+    ok, failed = [], []
+    for line_no, data in batch:
+        values, error = _validate(validate_patient, line_no, data)
+        if error:
+            failed.append({"line": line_no, **error})
+        else:
+            ok.append((line_no, values))
+
+    # 身份证号唯一：一次 IN 查询检查库内重复，同时检查批内重复
+    existing = _ids_in(Patient.IdentityNo, [values['IdentityNo'] for _, values in ok])
+    rows = []
+    for line_no, values in ok:
+        if values['IdentityNo'] in existing:
+            failed.append({"line": line_no, "error": "DUPLICATE_IDENTITY_NO", "message": "身份证号已存在"})
+            continue
+        existing.add(values['IdentityNo'])
+        rows.append((line_no, values))
+    return rows, failed
+
+
+def _prepare_visits(batch):
+    # 一批里涉及的患者、医生和入院记录用一次查询确认存在
+    found = visit_references([data for _, data in batch])
+
+    rows, failed = [], []
+    for line_no, data in batch:
+        values, errors = _validate(
+            validate_visit, line_no, data,
+            patient_exists=lambda patient_id: patient_id in found["PatientID"],
+            doctor_exists=lambda doctor_id: doctor_id in found["DoctorID"],
+            admission_exists=lambda admission_id: admission_id in found["AdmissionID"]
+        )
+        if isinstance(errors, dict):
+            failed.append(errors)
+        elif errors:
+            failed.append(_validation_error(line_no, errors))
+        else:
+            rows.append((line_no, values))
+    return rows, failed
+
+
+def _prepare_admissions(batch):
+    # 一批里涉及的病房用一次查询确认存在
+    wards = _ids_in(Ward.WardID, [_to_int(data.get('WardID')) for _, data in batch if isinstance(data, dict)])
+
+    rows, failed = [], []
+    for line_no, data in batch:
+        values, errors = _validate(validate_admission, line_no, data, ward_exists=lambda ward_id: ward_id in wards)
+        if isinstance(errors, dict):
+            failed.append(errors)
+            continue
+        if errors:
+            failed.append(_validation_error(line_no, errors))
+            continue
+
+        # 历史数据允许带出院日期，规则与出院接口一致
+        discharge_date = data.get('DischargeDate')
+        if discharge_date:
+            try:
+                discharge_date = datetime.strptime(discharge_date, '%Y-%m-%d')
+            except ValueError:
+                failed.append(_validation_error(line_no, [
+                    {"field": "DischargeDate", "message": "出院日期格式不正确，应该为 YYYY-MM-DD"}
+                ]))
+                continue
+            if discharge_date < values['AdmissionDate']:
+                failed.append(_validation_error(line_no, [
+                    {"field": "DischargeDate", "message": "出院日期不能早于入院日期"}
+                ]))
+                continue
+            values['DischargeDate'] = discharge_date
+        rows.append((line_no, values))
+    return rows, failed
+
+
+_LOADERS = {
+    'patient': (Patient, _prepare_patients, None),
+    'visit': (Visit, _prepare_visits, 'VisitDate'),
+    'admission': (Admission, _prepare_admissions, 'AdmissionDate'),
+}
+
+
+class BulkResult:
+    def __init__(self, max_errors):
+        self.total = 0
+        self.inserted = 0
+        self.failed = 0
+        self.errors = []
+        self.max_errors = max_errors
+        self.min_date = None
+        self.max_date = None
+
+    def fail(self, error):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append(error)
+
+    def touch(self, value):
+        if value is None:
+            return
+        self.min_date = value if self.min_date is None else min(self.min_date, value)
+        self.max_date = value if self.max_date is None else max(self.max_date, value)
+
+    def to_dict(self):
+        return {
+            "total": self.total,
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": self.errors
+        }
+
+
+def _insert_batch(model, rows, result, date_field):
+    table = model.__table__
+    assign_ids(model, [values for _, values in rows])
+    try:
+        with db.session.begin_nested():
+            db.session.execute(insert(table), [values for _, values in rows])
+        result.inserted += len(rows)
+    except IntegrityError:
+        # 整批冲突时逐行重试，定位具体出错的行
+        for line_no, values in rows:
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(insert(table), values)
+                result.inserted += 1
+            except IntegrityError as e:
+                result.fail({
+                    "line": line_no,
+                    "error": "DATABASE_CONSTRAINT",
+                    "message": f"数据库约束冲突: {str(e.orig)}"
+                })
+                continue
+            if date_field:
+                result.touch(values[date_field])
+        db.session.commit()
+        return
+
+    if date_field:
+        for _, values in rows:
+            result.touch(values[date_field])
+    db.session.commit()
+
+
+def _flush(entity, batch, result):
+    model, prepare, date_field = _LOADERS[entity]
+    rows, failed = prepare(batch)
+    for error in sorted(failed, key=lambda e: e['line']):
+        result.fail(error)
+    if rows:
+        _insert_batch(model, rows, result, date_field)
+
+
+def load(entity, rows, batch_size=1000, max_errors=1000):
+    result = BulkResult(max_errors)
+    batch = []
+    for line_no, data in rows:
+        result.total += 1
+        if not isinstance(data, dict):
+            result.fail({"line": line_no, "error": "INVALID_ROW", "message": "无法解析的数据行"})
+            continue
+        batch.append((line_no, data))
+        if len(batch) >= batch_size:
+            _flush(entity, batch, result)
+            batch = []
+    if batch:
+        _flush(entity, batch, result)
+
+    # 就诊和住院数据会影响统计汇总表，导入结束后重算涉及的日期区间
+    if result.min_date is not None:
+        rollup.rebuild(result.min_date, result.max_date)
+        # 新住院记录和就诊关联也要同步到病房占用索引
+        occupancy.reconcile()
+
+    return result
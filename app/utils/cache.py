@@ -0,0 +1,211 @@
+import threading
+import time
+from collections import OrderedDict
+from flask import g, has_request_context
+from . import metrics
+
+# 科室、医生、病房这类很少变化的基础数据的读穿透缓存：
+#   一级：进程内 LRU + TTL
+#   二级（可选）：多进程共享的后端，只要实现 get / set / delete 三个方法即可，
+#                值是 [版本号, 列值 dict]，方便序列化；本地开发和测试用 MemorySharedBackend 代替
+# 缓存的是列值快照而不是 ORM 对象，需要修改数据的地方仍然直接查库。
+# 共享后端开启时，其他进程的一级缓存最多在 TTL 之后才会看到修改。
+# 例外是带 ETag 的读接口：条目记着查库时该表的版本号，比本次请求读到的版本号（g.entity_versions，
+# 见 app/utils/versions.py）旧就重新查库，保证返回内容不比 ETag 旧。
+
+
+class CachedRow(dict):
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+
+class LRUCache:
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class MemorySharedBackend:
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+def _snapshot(row):
+    return {column.key: getattr(row, column.key) for column in row.__mapper__.column_attrs}
+
+
+class ReferenceCache:
+    def __init__(self):
+        self.local = LRUCache(1024, 300)
+        self.shared = None
+        self.enabled = True
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        self.enabled = app.config['REFERENCE_CACHE_ENABLED']
+        self.local = LRUCache(app.config['REFERENCE_CACHE_SIZE'], app.config['REFERENCE_CACHE_TTL'])
+        shared = app.config['REFERENCE_CACHE_SHARED_BACKEND']
+        self.shared = MemorySharedBackend() if shared == 'memory' else shared
+        self.hits = self.shared_hits = self.misses = 0
+        metrics.register_collector('reference_cache', self.collect)
+
+    def _key(self, model, field, value):
+        return f'{model.__tablename__}:{field}:{value}'
+
+    # 本次请求的 ETag 用的是哪个版本号，不是条件 GET 时为 0（不检查）
+    @staticmethod
+    def _required_version(model):
+        if not has_request_context():
+            return 0
+        return g.get('entity_versions', {}).get(model.__tablename__, 0)
+
+    def _lookup(self, model, key, load):
+        if not self.enabled:
+            row = load()
+            return CachedRow(_snapshot(row)) if row is not None else None
+
+        # 条目是 (版本号, 列值)
+        version = self._required_version(model)
+        item = self.local.get(key)
+        if item is not None and item[0] >= version:
+            self.hits += 1
+            return CachedRow(item[1])
+
+        if self.shared is not None:
+            item = self.shared.get(key)
+            if item is not None and item[0] >= version:
+                self.shared_hits += 1
+                self.local.set(key, item)
+                return CachedRow(item[1])
+
+        self.misses += 1
+        row = load()
+        # 不缓存“不存在”的结果，避免新建之后还查不到
+        if row is None:
+            return None
+        # 先读的版本号再查的库，查到的数据不会比这个版本旧
+        item = (version, _snapshot(row))
+        self.local.set(key, item)
+        if self.shared is not None:
+            self.shared.set(key, list(item), self.local.ttl)
+        return CachedRow(item[1])
+
+    def get(self, model, pk):
+        return self._lookup(model, self._key(model, 'id', pk), lambda: model.query.get(pk))
+
+    def get_by(self, model, field, value):
+        return self._lookup(
+            model,
+            self._key(model, field, value),
+            lambda: model.query.filter_by(**{field: value}).first()
+        )
+
+    # 启动预热：把整张表（不超过缓存容量）按主键和 fields 里的字段放进缓存。
+    # 和 _lookup 一样先读该表的版本号再查库，条目记着这个版本号，带 ETag 的接口也能直接命中
+    def preload(self, model, *fields):
+        from ..extensions import versions
+
+        if not self.enabled:
+            return 0
+        version = versions.current(model)[model.__tablename__]
+        pk = model.__mapper__.primary_key[0].key
+        rows = model.query.limit(self.local.maxsize).all()
+        for row in rows:
+            value = _snapshot(row)
+            for field in (pk,) + fields:
+                key = self._key(model, 'id' if field == pk else field, value[field])
+                self.local.set(key, (version, value))
+        return len(rows)
+
+    # 写接口提交之后调用；按名称等其他字段缓存的条目需要额外传 (字段, 值)
+    def invalidate(self, model, pk, *extra):
+        keys = [self._key(model, 'id', pk)] + [self._key(model, field, value) for field, value in extra]
+        for key in keys:
+            self.local.delete(key)
+            if self.shared is not None:
+                self.shared.delete(key)
+
+    def clear(self):
+        self.local.clear()
+
+    def collect(self):
+        stats = self.stats()
+        return [
+            ('hospital_reference_cache_hits_total', 'counter', '基础数据缓存命中次数', [
+                ({"tier": "local"}, stats["hits"]),
+                ({"tier": "shared"}, stats["sharedHits"])
+            ]),
+            ('hospital_reference_cache_misses_total', 'counter', '基础数据缓存未命中次数（即实际查库次数）', [({}, stats["misses"])]),
+            ('hospital_reference_cache_evictions_total', 'counter', 'LRU 淘汰次数', [({}, stats["evictions"])]),
+            ('hospital_reference_cache_entries', 'gauge', '进程内缓存条目数', [({}, stats["size"])]),
+        ]
+
+    def stats(self):
+        lookups = self.hits + self.shared_hits + self.misses
+        return {
+            "hits": self.hits,
+            "sharedHits": self.shared_hits,
+            "misses": self.misses,
+            "hitRatio": round((self.hits + self.shared_hits) / lookups, 4) if lookups else 0.0,
+            "size": len(self.local),
+            "evictions": self.local.evictions
+        }
@@ -0,0 +1,16 @@
+from sqlalchemy.exc import IntegrityError
+from ..extensions import db
+
+
+# 计数行的增量更新：先按主键 UPDATE，行不存在时再插入
+def increment(model, keys, deltas):
+    values = {getattr(model, k): getattr(model, k) + v for k, v in deltas.items()}
+    updated = db.session.query(model).filter_by(**keys).update(values, synchronize_session=False)
+    if updated:
+        return
+    try:
+        # 并发时可能同时插入同一行，用 savepoint 兜底后改为更新
+        with db.session.begin_nested():
+            db.session.add(model(**keys, **deltas))
+    except IntegrityError:
+        db.session.query(model).filter_by(**keys).update(values, synchronize_session=False)
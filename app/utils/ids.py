@@ -0,0 +1,102 @@
+import os
+import threading
+from flask import current_app
+from sqlalchemy import create_engine, func, select, update, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.pool import NullPool
+from ..extensions import db
+from ..models.id_sequence import IdSequence
+
+# 主键分配：
+#   ID_ALLOCATION = 'autoincrement'（默认）—— 不指定主键，交给数据库自增，插入时不再额外查 MAX(ID)
+#   ID_ALLOCATION = 'hilo' —— 每个进程从 IdSequence 表一次预留 ID_BLOCK_SIZE 个号段，
+#                            之后在内存里发号，批量导入时不用等数据库回填主键
+# 两种模式不能混用：开启 hilo 后所有写入路径（单条接口和批量导入）都从号段取号。
+
+
+class HiLoAllocator:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._blocks = {}
+        self._pid = os.getpid()
+        self._engines = {}
+
+    # 号段预留走单独的、不带连接池的引擎：
+    # 请求线程手里已经占着一个池连接，再向同一个池要连接在高并发下会互相等待
+    def _engine(self):
+        engine = db.engine
+        if engine.url.database in (None, '', ':memory:'):
+            return engine
+        key = str(engine.url)
+        if key not in self._engines:
+            self._engines[key] = create_engine(engine.url, poolclass=NullPool)
+        return self._engines[key]
+
+    def _reserve(self, model, size):
+        table = model.__tablename__
+        pk = model.__mapper__.primary_key[0]
+        # 用独立连接和短事务预留号段，先 UPDATE 再读，保证并发下号段不重叠
+        with self._engine().begin() as conn:
+            updated = conn.execute(
+                update(IdSequence.__table__)
+                .where(IdSequence.Name == table)
+                .values(NextValue=IdSequence.NextValue + size)
+            ).rowcount
+            if updated:
+                end = conn.execute(
+                    select(IdSequence.NextValue).where(IdSequence.Name == table)
+                ).scalar()
+                return end - size, end
+
+        # 第一次使用时从表里现有最大 ID 之后开始
+        try:
+            with self._engine().begin() as conn:
+                start = (conn.execute(select(func.max(pk))).scalar() or 0) + 1
+                conn.execute(insert(IdSequence.__table__).values(Name=table, NextValue=start + size))
+            return start, start + size
+        except IntegrityError:
+            # 其他进程抢先初始化了，重新走 UPDATE
+            return self._reserve(model, size)
+
+    def allocate(self, model, count=1):
+        block_size = current_app.config['ID_BLOCK_SIZE']
+        with self._lock:
+            # fork 出来的子进程不能沿用父进程手里的号段
+            if os.getpid() != self._pid:
+                self._blocks = {}
+                self._pid = os.getpid()
+
+            ids = []
+            table = model.__tablename__
+            while len(ids) < count:
+                current, end = self._blocks.get(table, (0, 0))
+                if current >= end:
+                    current, end = self._reserve(model, max(block_size, count - len(ids)))
+                take = min(end - current, count - len(ids))
+                ids.extend(range(current, current + take))
+                self._blocks[table] = (current + take, end)
+            return ids
+
+
+_hilo = HiLoAllocator()
+
+
+def _use_hilo():
+    return current_app.config['ID_ALLOCATION'] == 'hilo'
+
+
+# 单条插入：autoincrement 模式返回 None，由数据库生成主键
+def next_id(model):
+    if not _use_hilo():
+        return None
+    return _hilo.allocate(model)[0]
+
+
+# 批量插入：hilo 模式下给每行的字段 dict 填好主键，autoincrement 模式下不做处理
+def assign_ids(model, rows):
+    if not _use_hilo() or not rows:
+        return rows
+    pk = model.__mapper__.primary_key[0].key
+    for row, new_id in zip(rows, _hilo.allocate(model, len(rows))):
+        row[pk] = new_id
+    return rows
@@ -0,0 +1,198 @@
+import json
+import logging
+import threading
+import time
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from . import metrics
+
+# 请求级 SQL 统计：
+#   SQLAlchemy 引擎事件记录每条语句的耗时和行数，累加到当前请求（flask.g）上。
+#   行数：有结果集的语句数实际取回的行（包一层 DBAPI 游标，fetch 时计数），其余语句数影响的行；
+#   请求结束时按 endpoint 汇总，并写 Server-Timing 响应头；
+#   超过 SLOW_QUERY_THRESHOLD_MS 的语句写一条 JSON 格式的慢查询日志（不记录参数，避免泄露患者信息）。
+# 流式导出的查询发生在响应返回之后，不计入该请求。
+
+slow_query_logger = logging.getLogger('app.slow_query')
+
+
+class RequestSQLStats:
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.statements = 0
+        self.db_time = 0.0
+        self.rows = 0
+        self.slowest = 0.0
+        self.slowest_statement = None
+
+
+class EndpointStats:
+    def __init__(self):
+        self.requests = 0
+        self.statements = 0
+        self.db_time = 0.0
+        self.request_time = 0.0
+        self.rows = 0
+        self.slowest = 0.0
+        self.slowest_statement = None
+
+
+# 查询的 rowcount 在 SQLite 等驱动里是 -1，取回多少行只能在读结果的时候数
+class CountingCursor:
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self._stats = stats
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._stats.rows += 1
+            yield row
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._stats.rows += 1
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._stats.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._stats.rows += len(rows)
+        return rows
+
+
+class SQLInstrumentation:
+    def __init__(self):
+        self.enabled = True
+        self.slow_threshold = 0.2
+        self.server_timing = True
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._listening = False
+
+    def init_app(self, app):
+        self.enabled = app.config['SQL_INSTRUMENTATION_ENABLED']
+        self.slow_threshold = app.config['SLOW_QUERY_THRESHOLD_MS'] / 1000.0
+        self.server_timing = app.config['SERVER_TIMING_HEADER']
+        if not self.enabled:
+            return
+
+        # 监听 Engine 类而不是某个具体引擎，多个数据源（bind）也能统计到
+        if not self._listening:
+            event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+            self._listening = True
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        metrics.register_collector('sql', self.collect)
+
+    # 开始时间记在这条语句的执行上下文上：语句出错时没有 after_cursor_execute，上下文随之丢弃，
+    # 不会在连接上留下对不上的记录
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None and has_request_context() and 'sql_stats' in g:
+            context._query_started_at = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if not (has_request_context() and 'sql_stats' in g):
+            return
+        started = getattr(context, '_query_started_at', None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+
+        stats = g.sql_stats
+        stats.statements += 1
+        stats.db_time += elapsed
+        if cursor.description is None:
+            if cursor.rowcount and cursor.rowcount > 0:
+                stats.rows += cursor.rowcount
+        elif not isinstance(context.cursor, CountingCursor):
+            # 结果集从 context.cursor 读，换成计数的游标
+            context.cursor = CountingCursor(context.cursor, stats)
+        if elapsed > stats.slowest:
+            stats.slowest = elapsed
+            stats.slowest_statement = statement
+
+        if elapsed >= self.slow_threshold:
+            slow_query_logger.warning(json.dumps({
+                "event": "slow_query",
+                "endpoint": request.endpoint,
+                "method": request.method,
+                "path": request.path,
+                "durationMs": round(elapsed * 1000, 2),
+                "rowcount": cursor.rowcount,
+                "executemany": executemany,
+                "statement": ' '.join(statement.split())
+            }, ensure_ascii=False))
+
+    def _before_request(self):
+        g.sql_stats = RequestSQLStats()
+
+    def _after_request(self, response):
+        stats = g.pop('sql_stats', None)
+        if stats is None:
+            return response
+        request_time = time.perf_counter() - stats.started_at
+        endpoint = request.endpoint or 'unknown'
+
+        with self._lock:
+            summary = self._endpoints.setdefault(endpoint, EndpointStats())
+            summary.requests += 1
+            summary.statements += stats.statements
+            summary.db_time += stats.db_time
+            summary.request_time += request_time
+            summary.rows += stats.rows
+            if stats.slowest > summary.slowest:
+                summary.slowest = stats.slowest
+                summary.slowest_statement = stats.slowest_statement
+
+        if self.server_timing:
+            response.headers.add(
+                'Server-Timing',
+                f'db;dur={stats.db_time * 1000:.2f};desc="{stats.statements} queries", '
+                f'app;dur={request_time * 1000:.2f}'
+            )
+        return response
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                endpoint: {
+                    "requests": s.requests,
+                    "statements": s.statements,
+                    "dbSeconds": s.db_time,
+                    "requestSeconds": s.request_time,
+                    "rows": s.rows,
+                    "slowestSeconds": s.slowest,
+                    "slowestStatement": s.slowest_statement
+                }
+                for endpoint, s in self._endpoints.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}
+
+    def collect(self):
+        endpoints = self.snapshot()
+
+        def samples(field):
+            return [({"endpoint": name}, values[field]) for name, values in sorted(endpoints.items())]
+
+        return [
+            ('hospital_http_requests_total', 'counter', '按 endpoint 统计的请求数', samples('requests')),
+            ('hospital_request_seconds_total', 'counter', '请求处理总耗时（秒）', samples('requestSeconds')),
+            ('hospital_db_statements_total', 'counter', '执行的 SQL 语句数', samples('statements')),
+            ('hospital_db_seconds_total', 'counter', 'SQL 执行总耗时（秒）', samples('dbSeconds')),
+            ('hospital_db_rows_total', 'counter', '查询取回的行数加上写语句影响的行数', samples('rows')),
+            ('hospital_db_slowest_statement_seconds', 'gauge', '单条 SQL 最长耗时（秒）', samples('slowestSeconds')),
+        ]
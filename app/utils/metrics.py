@@ -0,0 +1,32 @@
+# /metrics 输出的 Prometheus 文本格式。
+# 各个子系统通过 register_collector 注册采集函数，采集函数返回
+# [(指标名, 类型, 说明, [(标签 dict, 值), ...]), ...]
+# histogram 这类一个指标有多个后缀的，样本写成 (后缀, 标签 dict, 值)，如 ('_bucket', {"le": "0.1"}, 3)
+
+_collectors = {}
+
+
+def register_collector(name, collect):
+    _collectors[name] = collect
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in sorted(labels.items())) + '}'
+
+
+def render():
+    lines = []
+    for collect in list(_collectors.values()):
+        for name, kind, help_text, samples in collect():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for sample in samples:
+                suffix, labels, value = sample if len(sample) == 3 else ('', *sample)
+                lines.append(f'{name}{suffix}{_format_labels(labels)} {value}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,109 @@
+from datetime import datetime
+from sqlalchemy import func
+from ..extensions import db
+from .counters import increment
+from ..models.admission import Admission
+from ..models.visit import Visit
+from ..models.ward_occupancy import WardOccupancy
+from ..models.bed_occupancy import BedOccupancy
+
+# 病房占用索引：
+#   BedOccupancy  —— 每条未出院的住院记录一行（病房、床号、患者）
+#   WardOccupancy —— 每个病房的已占床位数
+# 入院、出院、就诊关联住院记录时同步维护；reconcile() 按 Admission 表重算并修正偏差。
+# 患者ID取该住院记录的第一条就诊记录，尚无就诊记录时为空。
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+# 新住院记录加入 session 之后调用
+def record_admission(admission):
+    db.session.flush()
+    db.session.add(BedOccupancy(
+        AdmissionID=admission.AdmissionID,
+        WardID=admission.WardID,
+        BedNo=admission.BedNo,
+        AdmissionDate=_as_date(admission.AdmissionDate)
+    ))
+    increment(WardOccupancy, {"WardID": admission.WardID}, {"OccupiedBeds": 1})
+
+
+# 仅在住院记录第一次出院时调用
+def record_discharge(admission):
+    removed = BedOccupancy.query.filter_by(AdmissionID=admission.AdmissionID) \
+        .delete(synchronize_session=False)
+    if removed:
+        increment(WardOccupancy, {"WardID": admission.WardID}, {"OccupiedBeds": -removed})
+
+
+def record_visit(admission_id, patient_id):
+    if not admission_id:
+        return
+    BedOccupancy.query.filter(
+        BedOccupancy.AdmissionID == admission_id,
+        BedOccupancy.PatientID.is_(None)
+    ).update({BedOccupancy.PatientID: patient_id}, synchronize_session=False)
+
+
+def _expected_rows():
+    first_visit = db.session.query(
+        Visit.AdmissionID,
+        func.min(Visit.VisitID).label('VisitID')
+    ).filter(Visit.AdmissionID.isnot(None)).group_by(Visit.AdmissionID).subquery()
+
+    rows = db.session.query(
+        Admission.AdmissionID, Admission.WardID, Admission.BedNo, Admission.AdmissionDate, Visit.PatientID
+    ).outerjoin(
+        first_visit, first_visit.c.AdmissionID == Admission.AdmissionID
+    ).outerjoin(
+        Visit, Visit.VisitID == first_visit.c.VisitID
+    ).filter(Admission.DischargeDate.is_(None)).all()
+
+    return {
+        row.AdmissionID: (row.WardID, row.BedNo, row.PatientID, _as_date(row.AdmissionDate))
+        for row in rows
+    }
+
+
+# 以 Admission 表为准修正占用索引，返回修正的行数（床位行 + 病房计数行）
+def reconcile():
+    expected = _expected_rows()
+    actual = {
+        row.AdmissionID: (row.WardID, row.BedNo, row.PatientID, row.AdmissionDate)
+        for row in BedOccupancy.query.all()
+    }
+
+    fixed = 0
+    for admission_id in actual.keys() - expected.keys():
+        BedOccupancy.query.filter_by(AdmissionID=admission_id).delete(synchronize_session=False)
+        fixed += 1
+    for admission_id, (ward_id, bed_no, patient_id, admission_date) in expected.items():
+        if actual.get(admission_id) == expected[admission_id]:
+            continue
+        db.session.merge(BedOccupancy(
+            AdmissionID=admission_id,
+            WardID=ward_id,
+            BedNo=bed_no,
+            PatientID=patient_id,
+            AdmissionDate=admission_date
+        ))
+        fixed += 1
+
+    counts = {}
+    for ward_id, _, _, _ in expected.values():
+        counts[ward_id] = counts.get(ward_id, 0) + 1
+    for summary in WardOccupancy.query.all():
+        if summary.OccupiedBeds != counts.get(summary.WardID, 0):
+            summary.OccupiedBeds = counts.get(summary.WardID, 0)
+            fixed += 1
+        counts.pop(summary.WardID, None)
+    for ward_id, occupied in counts.items():
+        db.session.add(WardOccupancy(WardID=ward_id, OccupiedBeds=occupied))
+        fixed += 1
+
+    db.session.commit()
+    return fixed
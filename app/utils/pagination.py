@@ -0,0 +1,126 @@
+import base64
+import json
+from flask import request, jsonify
+from sqlalchemy import func, select
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+class CursorPage:
+    # 与 Flask-SQLAlchemy 的 Pagination 保持相同的属性名，路由里可以直接替换
+    def __init__(self, items, per_page, total=None, next_cursor=None):
+        self.items = items
+        self.per_page = per_page
+        self.total = total
+        self.page = None
+        self.next_cursor = next_cursor
+        self.is_cursor = True
+
+
+# 异步读接口的 OFFSET/LIMIT 分页结果，属性名同上
+class OffsetPage:
+    def __init__(self, items, page, per_page, total):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+
+
+def encode_cursor(value):
+    raw = json.dumps([value], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        value = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))[0]
+    except (ValueError, TypeError, IndexError, UnicodeError):
+        raise InvalidCursorError(token)
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise InvalidCursorError(token)
+    return value
+
+
+def _row_key(row, name):
+    # 查询结果可能是模型对象、具名列的 Row，或 (模型, 其他列) 的元组
+    if hasattr(row, name):
+        return getattr(row, name)
+    return getattr(row[0], name)
+
+
+def _with_total(args):
+    return args.get('withTotal', '0') in ('1', 'true')
+
+
+# 从 cursor 之后开始按主键排序，多取一行用来判断是否还有下一页；query 可以是 db.session.query(...) 也可以是 select(...)
+def _seek(query, key, page_size, args, descending):
+    token = args.get('cursor', '').strip()
+    seek_query = query.order_by(None)
+    if token:
+        last_key = decode_cursor(token)
+        seek_query = seek_query.filter(key < last_key if descending else key > last_key)
+    return seek_query.order_by(key.desc() if descending else key.asc()).limit(page_size + 1)
+
+
+def _cursor_page(rows, key, page_size, total):
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(_row_key(rows[-1], key.key))
+    return CursorPage(rows, page_size, total=total, next_cursor=next_cursor)
+
+
+# 统一的分页入口：
+# 请求带 cursor 参数时按主键做 keyset 分页（首页传空值 cursor=），默认不统计总数，
+# 传 withTotal=1 才执行 COUNT；不带 cursor 时沿用 OFFSET/LIMIT 分页
+def paginate(query, key, page, page_size, descending=False):
+    if 'cursor' not in request.args:
+        return query.paginate(page=page, per_page=page_size, error_out=False)
+
+    total = query.order_by(None).count() if _with_total(request.args) else None
+    rows = _seek(query, key, page_size, request.args, descending).all()
+    return _cursor_page(rows, key, page_size, total)
+
+
+# 异步读接口（app/async_api.py）用的版本，规则和 paginate 一样：statement 是 select(...)，args 是 Quart 的请求参数
+async def paginate_async(session, statement, key, page, page_size, args, descending=False):
+    count = select(func.count()).select_from(statement.order_by(None).subquery())
+    if 'cursor' not in args:
+        total = (await session.execute(count)).scalar()
+        items = (await session.execute(statement.limit(page_size).offset((page - 1) * page_size))).all()
+        return OffsetPage(items, page, page_size, total)
+
+    total = (await session.execute(count)).scalar() if _with_total(args) else None
+    rows = (await session.execute(_seek(statement, key, page_size, args, descending))).all()
+    return _cursor_page(rows, key, page_size, total)
+
+
+def page_meta(pagination):
+    if getattr(pagination, 'is_cursor', False):
+        meta = {
+            "pageSize": pagination.per_page,
+            "nextCursor": pagination.next_cursor
+        }
+        if pagination.total is not None:
+            meta["total"] = pagination.total
+        return meta
+    return {
+        "total": pagination.total,
+        "page": pagination.page,
+        "pageSize": pagination.per_page
+    }
+
+
+# 错误内容单独列出来，异步接口用 Quart 的 jsonify 返回同样的内容
+INVALID_CURSOR = {
+    "code": 400,
+    "error": "INVALID_CURSOR",
+    "message": "cursor 参数无效"
+}
+
+
+def invalid_cursor_response():
+    return jsonify(INVALID_CURSOR), 400
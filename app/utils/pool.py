@@ -0,0 +1,185 @@
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+from . import metrics
+
+# 连接池配置和监控：
+#   configure_pools 把 Config 里的 DB_POOL_* 转成 create_engine 参数，默认库和 SQLALCHEMY_BINDS 里的库都适用；
+#   InstrumentedQueuePool 统计取连接的等待时间（含新建连接的时间）、溢出连接和等待超时；
+#   PoolMonitor 汇总各个引擎的连接池状态，供 /metrics 和 /metrics/pool 使用。
+# 内存 SQLite 用的是 StaticPool，没有池可配，直接跳过。
+
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.overflow_checkouts = 0
+        self.timeouts = 0
+        self.invalidations = 0
+        self.wait_sum = 0.0
+        self.wait_max = 0.0
+        self.buckets = [0] * len(WAIT_BUCKETS_MS)
+
+    def record_wait(self, seconds, overflow):
+        elapsed_ms = seconds * 1000
+        with self._lock:
+            self.checkouts += 1
+            if overflow:
+                self.overflow_checkouts += 1
+            self.wait_sum += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            for i, bound in enumerate(WAIT_BUCKETS_MS):
+                if elapsed_ms <= bound:
+                    self.buckets[i] += 1
+                    break
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def record_invalidation(self):
+        with self._lock:
+            self.invalidations += 1
+
+
+class InstrumentedQueuePool(QueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    # 包括排队等待、新建连接和 pre_ping 的时间，也就是请求真正卡在取连接上的时间
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self.stats.record_timeout()
+            raise
+        # overflow() 大于 0 说明池子已经用满，这次拿到的可能是溢出连接
+        self.stats.record_wait(time.perf_counter() - started, self.overflow() > 0)
+        return connection
+
+
+def _is_memory_sqlite(url):
+    url = make_url(url)
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def _pool_options(config, url, options):
+    options = dict(options)
+    if 'poolclass' in options or _is_memory_sqlite(url):
+        return options
+    options.setdefault('poolclass', InstrumentedQueuePool)
+    options.setdefault('pool_size', config['DB_POOL_SIZE'])
+    options.setdefault('max_overflow', config['DB_MAX_OVERFLOW'])
+    options.setdefault('pool_timeout', config['DB_POOL_TIMEOUT'])
+    options.setdefault('pool_recycle', config['DB_POOL_RECYCLE'])
+    options.setdefault('pool_pre_ping', config['DB_POOL_PRE_PING'])
+    return options
+
+
+# 在 db.init_app 之前调用；不修改配置类上的 dict，避免多个 app 之间互相影响
+def configure_pools(config):
+    if config.get('SQLALCHEMY_DATABASE_URI'):
+        config['SQLALCHEMY_ENGINE_OPTIONS'] = _pool_options(
+            config, config['SQLALCHEMY_DATABASE_URI'], config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}
+        )
+
+    binds = {}
+    for key, value in (config.get('SQLALCHEMY_BINDS') or {}).items():
+        options = dict(value) if isinstance(value, dict) else {'url': value}
+        binds[key] = _pool_options(config, options['url'], options)
+    config['SQLALCHEMY_BINDS'] = binds
+
+
+class PoolMonitor:
+    def __init__(self):
+        self._engines = {}
+
+    def init_app(self, app):
+        from ..extensions import db
+
+        with app.app_context():
+            self._engines = {key or 'default': engine for key, engine in db.engines.items()}
+        for engine in self._engines.values():
+            # pre_ping 发现断开的连接、连接出错被作废时都会触发；dispose 之后的新连接池会沿用监听
+            event.listen(engine.pool, 'invalidate', self._on_invalidate(engine))
+        metrics.register_collector('pool', self.collect)
+
+    def _on_invalidate(self, engine):
+        def listener(dbapi_connection, connection_record, exception):
+            stats = getattr(engine.pool, 'stats', None)
+            if stats is not None:
+                stats.record_invalidation()
+        return listener
+
+    def snapshot(self):
+        result = {}
+        for name, engine in self._engines.items():
+            pool = engine.pool
+            data = {"poolClass": type(pool).__name__}
+            if isinstance(pool, QueuePool):
+                data.update({
+                    "size": pool.size(),
+                    "checkedOut": pool.checkedout(),
+                    "checkedIn": pool.checkedin(),
+                    "overflow": max(pool.overflow(), 0),
+                    "maxOverflow": pool._max_overflow,
+                    "timeoutSeconds": pool.timeout(),
+                })
+            stats = getattr(pool, 'stats', None)
+            if stats is not None:
+                with stats._lock:
+                    data.update({
+                        "checkouts": stats.checkouts,
+                        "overflowCheckouts": stats.overflow_checkouts,
+                        "timeouts": stats.timeouts,
+                        "invalidations": stats.invalidations,
+                        "waitSecondsSum": stats.wait_sum,
+                        "waitSecondsMax": stats.wait_max,
+                        "waitBucketsMs": dict(zip(WAIT_BUCKETS_MS, stats.buckets)),
+                    })
+            result[name] = data
+        return result
+
+    def collect(self):
+        pools = self.snapshot()
+        gauges = [
+            ('hospital_db_pool_size', '连接池大小', 'size'),
+            ('hospital_db_pool_checked_out', '已借出的连接数', 'checkedOut'),
+            ('hospital_db_pool_overflow', '当前溢出连接数', 'overflow'),
+        ]
+        counters = [
+            ('hospital_db_pool_overflow_checkouts_total', '拿到溢出连接的次数', 'overflowCheckouts'),
+            ('hospital_db_pool_timeouts_total', '等待连接超时次数', 'timeouts'),
+            ('hospital_db_pool_invalidations_total', '连接被作废的次数（含 pre_ping 检测到断开）', 'invalidations'),
+        ]
+        families = []
+        for name, help_text, field in gauges:
+            families.append((name, 'gauge', help_text, [
+                ({"bind": bind}, data[field]) for bind, data in sorted(pools.items()) if field in data
+            ]))
+        for name, help_text, field in counters:
+            families.append((name, 'counter', help_text, [
+                ({"bind": bind}, data[field]) for bind, data in sorted(pools.items()) if field in data
+            ]))
+
+        histogram = []
+        for bind, data in sorted(pools.items()):
+            if 'waitBucketsMs' not in data:
+                continue
+            cumulative = 0
+            for bound, count in data["waitBucketsMs"].items():
+                cumulative += count
+                histogram.append(('_bucket', {"bind": bind, "le": str(bound / 1000)}, cumulative))
+            histogram.append(('_bucket', {"bind": bind, "le": '+Inf'}, data["checkouts"]))
+            histogram.append(('_sum', {"bind": bind}, data["waitSecondsSum"]))
+            histogram.append(('_count', {"bind": bind}, data["checkouts"]))
+        families.append(('hospital_db_pool_checkout_wait_seconds', 'histogram', '取连接的等待时间（秒）', histogram))
+        return families
@@ -0,0 +1,31 @@
+from flask import jsonify
+
+
+class InvalidFieldsError(ValueError):
+    pass
+
+
+# fields=VisitID,VisitDate,Fee：只查询、只返回这些字段；不传用 default（默认全部）。
+# required 里的字段总会带上（主键、expand 要用到的外键）；返回的顺序和 allowed 一致，同一组字段得到同一个 tuple，
+# 序列化函数按投影缓存。value 直接传参数字符串，Flask 和 Quart 的路由都能用
+def parse_fields(value, allowed, default=None, required=()):
+    if value is None or not value.strip():
+        wanted = set(allowed if default is None else default)
+    else:
+        wanted = {part.strip() for part in value.split(',') if part.strip()}
+        if wanted - set(allowed):
+            raise InvalidFieldsError(value)
+    wanted.update(required)
+    return tuple(name for name in allowed if name in wanted)
+
+
+def invalid_fields_error(allowed):
+    return {
+        "code": 400,
+        "error": "INVALID_FIELDS",
+        "message": f"fields 只支持 {','.join(allowed)}"
+    }
+
+
+def invalid_fields_response(allowed):
+    return jsonify(invalid_fields_error(allowed)), 400
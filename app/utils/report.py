@@ -0,0 +1,94 @@
+from datetime import timedelta
+from sqlalchemy import Date
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.sql.visitors import InternalTraversal
+
+# 报表按时间分桶：
+#   period_start(column, granularity) 在 SQL 里把日期换成所在区间的第一天（周从周一开始），SQLite 和 MySQL 各编译成自己的日期函数，
+#     生成的 SQL 里不带绑定参数，GROUP BY 里重复出现时 MySQL 的 ONLY_FULL_GROUP_BY 也认为是同一个表达式。
+#   periods(start, end, granularity) 在 Python 里列出区间内的全部分桶，用来补零和判断哪些分桶已经结束。
+
+GRANULARITIES = ('day', 'week', 'month', 'quarter')
+
+
+class period_start(FunctionElement):
+    type = Date()
+    inherit_cache = True
+    # granularity 要进语句缓存的键，否则不同粒度会共用同一条编译好的 SQL
+    _traverse_internals = FunctionElement._traverse_internals + [('granularity', InternalTraversal.dp_string)]
+
+    def __init__(self, column, granularity):
+        if granularity not in GRANULARITIES:
+            raise ValueError(f'granularity 只支持 {",".join(GRANULARITIES)}')
+        self.granularity = granularity
+        super().__init__(column)
+
+
+@compiles(period_start, 'sqlite')
+def _period_start_sqlite(element, compiler, **kw):
+    column = compiler.process(list(element.clauses)[0], **kw)
+    if element.granularity == 'day':
+        return f"date({column})"
+    if element.granularity == 'week':
+        return f"date({column}, '-' || ((CAST(strftime('%w', {column}) AS INTEGER) + 6) % 7) || ' days')"
+    if element.granularity == 'month':
+        return f"date({column}, 'start of month')"
+    return (f"date({column}, 'start of month', "
+            f"'-' || ((CAST(strftime('%m', {column}) AS INTEGER) - 1) % 3) || ' months')")
+
+
+@compiles(period_start, 'mysql')
+def _period_start_mysql(element, compiler, **kw):
+    column = compiler.process(list(element.clauses)[0], **kw)
+    if element.granularity == 'day':
+        return f"DATE({column})"
+    if element.granularity == 'week':
+        return f"DATE_SUB(DATE({column}), INTERVAL WEEKDAY({column}) DAY)"
+    if element.granularity == 'month':
+        return f"DATE_SUB(DATE({column}), INTERVAL DAYOFMONTH({column}) - 1 DAY)"
+    return f"(MAKEDATE(YEAR({column}), 1) + INTERVAL QUARTER({column}) - 1 QUARTER)"
+
+
+def bucket_start(day, granularity):
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    if granularity == 'quarter':
+        return day.replace(month=(day.month - 1) // 3 * 3 + 1, day=1)
+    return day
+
+
+def _next_bucket(start, granularity):
+    if granularity == 'day':
+        return start + timedelta(days=1)
+    if granularity == 'week':
+        return start + timedelta(days=7)
+    months = 1 if granularity == 'month' else 3
+    month = start.month - 1 + months
+    return start.replace(year=start.year + month // 12, month=month % 12 + 1)
+
+
+# 2024-01-05 / 2024-W01（ISO 周）/ 2024-01 / 2024-Q1
+def period_label(start, granularity):
+    if granularity == 'week':
+        year, week, _ = start.isocalendar()
+        return f'{year}-W{week:02d}'
+    if granularity == 'month':
+        return f'{start.year}-{start.month:02d}'
+    if granularity == 'quarter':
+        return f'{start.year}-Q{(start.month - 1) // 3 + 1}'
+    return start.isoformat()
+
+
+# [(分桶第一天, 区间内第一天, 区间内最后一天)]，首尾两个分桶按 start / end 截断
+def periods(start, end, granularity):
+    result = []
+    current = bucket_start(start, granularity)
+    while current <= end:
+        following = _next_bucket(current, granularity)
+        result.append((current, max(current, start), min(following - timedelta(days=1), end)))
+        current = following
+    return result
+
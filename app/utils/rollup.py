@@ -0,0 +1,126 @@
+from datetime import datetime
+from sqlalchemy import func, case, insert, select
+from ..extensions import db, cache, stats_cache
+from .counters import increment
+from ..models.doctor import Doctor
+from ..models.visit import Visit
+from ..models.admission import Admission
+from ..models.ward import Ward
+from ..models.doctor_daily_stats import DoctorDailyStats
+from ..models.dept_daily_stats import DeptDailyStats
+
+# 统计汇总表（按天）：
+#   DoctorDailyStats —— 每天每位医生的就诊数、费用合计
+#   DeptDailyStats   —— 每天每个科室（按病房所属科室）的入院数、仍在院人数
+# 科室的门诊量和收入通过 DoctorDailyStats 关联 Doctor 的当前科室汇总，
+# 这样医生换科室时不需要搬迁汇总数据，口径与原来直接查 Visit 一致。
+# 去重的患者数、住院数不能按天相加，医生工作量直接对 Visit 表 COUNT(DISTINCT)，汇总表里不存。
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def record_visit(doctor_id, visit_date, fee):
+    visit_date = _as_date(visit_date)
+    if visit_date is None:
+        return
+    increment(DoctorDailyStats, {"StatDate": visit_date, "DoctorID": doctor_id}, {
+        "VisitCount": 1,
+        "FeeSum": fee or 0
+    })
+
+
+def record_admission(ward_id, admission_date):
+    ward = cache.get(Ward, ward_id)
+    if not ward:
+        return
+    increment(DeptDailyStats, {"StatDate": _as_date(admission_date), "DeptID": ward.DeptID}, {
+        "AdmissionCount": 1,
+        "InpatientCount": 1
+    })
+
+
+# 仅在住院记录第一次出院时调用
+def record_discharge(admission):
+    ward = cache.get(Ward, admission.WardID)
+    if not ward:
+        return
+    increment(DeptDailyStats, {"StatDate": _as_date(admission.AdmissionDate), "DeptID": ward.DeptID}, {
+        "InpatientCount": -1
+    })
+
+
+# 就诊会影响的统计接口（见 app/utils/stats_cache.py）；入院、出院只影响科室统计里的在院人数
+VISIT_STATS = ('revenue', 'department_stats', 'doctor_workload', 'doctor_workload_ranking')
+ADMISSION_STATS = ('department_stats',)
+
+
+# 写接口提交之后调用：补录旧日期的数据会改变已经缓存的统计结果，按日期区间和医生 / 科室清掉受影响的条目。
+# 多条就诊合成一次：取日期的最小、最大值和涉及的医生、科室
+def invalidate_visits(rows):
+    dates = [_as_date(values['VisitDate']) for values in rows if values['VisitDate'] is not None]
+    if not dates:
+        return
+    doctor_ids = {values['DoctorID'] for values in rows}
+    dept_ids = {doctor.DeptID for doctor in (cache.get(Doctor, doctor_id) for doctor_id in doctor_ids) if doctor}
+    stats_cache.invalidate(min(dates), max(dates), VISIT_STATS, doctor=doctor_ids, dept=dept_ids)
+
+
+# 入院和第一次出院都只改动入院当天的在院人数
+def invalidate_admission(ward_id, admission_date):
+    ward = cache.get(Ward, ward_id)
+    admission_date = _as_date(admission_date)
+    stats_cache.invalidate(admission_date, admission_date, ADMISSION_STATS, dept=ward.DeptID if ward else None)
+
+
+# 不传日期时全量重建；传入日期区间时只重算区间内的汇总行（批量导入后使用）
+def rebuild(start_date=None, end_date=None):
+    start_date, end_date = _as_date(start_date), _as_date(end_date)
+
+    def in_range(column):
+        conditions = []
+        if start_date:
+            conditions.append(column >= start_date)
+        if end_date:
+            conditions.append(column <= end_date)
+        return conditions
+
+    db.session.query(DoctorDailyStats).filter(*in_range(DoctorDailyStats.StatDate)) \
+        .delete(synchronize_session=False)
+    db.session.query(DeptDailyStats).filter(*in_range(DeptDailyStats.StatDate)) \
+        .delete(synchronize_session=False)
+
+    doctor_rows = select(
+        Visit.VisitDate,
+        Visit.DoctorID,
+        func.count(Visit.VisitID),
+        func.coalesce(func.sum(Visit.Fee), 0)
+    ).where(Visit.VisitDate.isnot(None), *in_range(Visit.VisitDate)) \
+        .group_by(Visit.VisitDate, Visit.DoctorID)
+    db.session.execute(insert(DoctorDailyStats).from_select(
+        ['StatDate', 'DoctorID', 'VisitCount', 'FeeSum'],
+        doctor_rows
+    ))
+
+    dept_rows = select(
+        Admission.AdmissionDate,
+        Ward.DeptID,
+        func.count(Admission.AdmissionID),
+        func.sum(case((Admission.DischargeDate.is_(None), 1), else_=0))
+    ).join(Ward, Admission.WardID == Ward.WardID).where(*in_range(Admission.AdmissionDate)) \
+        .group_by(Admission.AdmissionDate, Ward.DeptID)
+    db.session.execute(insert(DeptDailyStats).from_select(
+        ['StatDate', 'DeptID', 'AdmissionCount', 'InpatientCount'],
+        dept_rows
+    ))
+
+    db.session.commit()
+    stats_cache.invalidate(start_date, end_date)
+
+    return (
+        db.session.query(func.count()).select_from(DoctorDailyStats).scalar(),
+        db.session.query(func.count()).select_from(DeptDailyStats).scalar()
+    )
@@ -0,0 +1,85 @@
+import random
+import time
+from contextlib import contextmanager
+from flask import g, request, has_app_context
+from flask_sqlalchemy.session import Session
+
+# 读写分离：
+#   SQLALCHEMY_REPLICA_URIS 里的每个只读副本注册成一个 bind（replica_0、replica_1 ...），
+#   GET/HEAD 请求和 READ_ONLY_BLUEPRINTS 里的整个 blueprint 在请求开始时随机选一个副本，
+#   之后这个请求里默认库的查询都发到该副本；没配置副本时一切照旧走主库。
+#   写请求（POST/PUT/PATCH/DELETE）成功后给客户端写一个 cookie，
+#   READ_YOUR_WRITES_SECONDS 秒内这个客户端的读请求仍然走主库，避免读到复制延迟之前的旧数据。
+# 命令行、批量导入和号段分配等没有请求上下文的地方一律走主库。
+
+STICKY_COOKIE = 'db_primary_until'
+WRITE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+
+def replica_binds(config):
+    return [f'replica_{i}' for i in range(len(config.get('SQLALCHEMY_REPLICA_URIS') or []))]
+
+
+# 在 configure_pools 之前调用，把副本加到 SQLALCHEMY_BINDS 里，连接池参数和主库一致
+def configure_replicas(config):
+    binds = dict(config.get('SQLALCHEMY_BINDS') or {})
+    for key, uri in zip(replica_binds(config), config.get('SQLALCHEMY_REPLICA_URIS') or []):
+        binds[key] = uri
+    config['SQLALCHEMY_BINDS'] = binds
+
+
+# 请求里临时改回主库，比如要写进统计结果缓存的查询不能读到复制延迟之前的数据
+@contextmanager
+def use_primary():
+    replica = g.pop('db_replica', None) if has_app_context() else None
+    try:
+        yield
+    finally:
+        if replica is not None:
+            g.db_replica = replica
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        replica = g.get('db_replica') if has_app_context() else None
+        if replica is None or bind is not None:
+            return engine
+        # 只替换默认库；有未提交的修改或正在 flush 时也留在主库
+        if engine is not self._db.engines.get(None) or self._flushing or self.new or self.dirty or self.deleted:
+            return engine
+        return self._db.engines[replica]
+
+
+class ReplicaRouter:
+    def __init__(self):
+        self.replicas = []
+        self.sticky_seconds = 0
+        self.read_only_blueprints = set()
+
+    def init_app(self, app):
+        self.replicas = replica_binds(app.config)
+        self.sticky_seconds = app.config['READ_YOUR_WRITES_SECONDS']
+        self.read_only_blueprints = set(app.config['READ_ONLY_BLUEPRINTS'])
+        if not self.replicas:
+            return
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    def _is_sticky(self):
+        try:
+            return float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def _before_request(self):
+        read_only = request.method in ('GET', 'HEAD') or request.blueprint in self.read_only_blueprints
+        if read_only and not self._is_sticky():
+            g.db_replica = random.choice(self.replicas)
+
+    def _after_request(self, response):
+        if request.method in WRITE_METHODS and response.status_code < 400 and self.sticky_seconds > 0:
+            until = time.time() + self.sticky_seconds
+            response.set_cookie(STICKY_COOKIE, f'{until:.3f}', max_age=int(self.sticky_seconds) + 1, httponly=True)
+        response.headers['X-DB-Route'] = g.get('db_replica') or 'primary'
+        return response
@@ -0,0 +1,141 @@
+from sqlalchemy import event, text
+from ..extensions import db
+from ..models.patient import Patient
+
+# 患者检索（前台按姓名、手机号片段、身份证号前缀找人）：
+#   完全相同和前缀匹配 —— 姓名、手机号、身份证号上的普通索引做范围查询
+#   任意位置的片段 —— MySQL 用 ngram 分词的 FULLTEXT 索引，SQLite 用 trigram 分词的 FTS5 表（片段至少 3 个字符）
+# 全文索引由数据库自己维护：MySQL 的 FULLTEXT 随表更新，SQLite 的 FTS5 表由触发器同步，
+# 所以单条接口、批量导入、直接改库都不用额外处理。其他数据库只有前缀匹配，片段退回 LIKE。
+# db.create_all() 建 Patient 表时一起建好（见 _create_index）；在这之前就有的库执行 flask --app run search rebuild。
+#
+# 排序：身份证号/手机号完全相同 > 姓名完全相同 > 身份证号/手机号前缀 > 姓名前缀 > 片段（按相关度），
+# 前缀匹配同一档里匹配到的值越短越靠前。
+
+SEARCH_FIELDS = ('IdentityNo', 'Phone', 'Name')
+
+FTS_TABLE = 'PatientSearch'
+SQLITE_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"Name, Phone, IdentityNo, content='Patient', content_rowid='PatientID', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON Patient BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, Name, Phone, IdentityNo) VALUES (new.PatientID, new.Name, new.Phone, new.IdentityNo); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON Patient BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, Name, Phone, IdentityNo) "
+    f"VALUES ('delete', old.PatientID, old.Name, old.Phone, old.IdentityNo); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON Patient BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, Name, Phone, IdentityNo) "
+    f"VALUES ('delete', old.PatientID, old.Name, old.Phone, old.IdentityNo); "
+    f"INSERT INTO {FTS_TABLE}(rowid, Name, Phone, IdentityNo) VALUES (new.PatientID, new.Name, new.Phone, new.IdentityNo); END",
+]
+MYSQL_INDEX = 'ft_Patient_Search'
+
+# 档位：数字越小越靠前
+EXACT_ID, EXACT_NAME, PREFIX_ID, PREFIX_NAME, FRAGMENT = range(5)
+
+
+def _backend():
+    return db.engine.dialect.name
+
+
+# 建全文索引，已经有了就跳过
+def _create_index(connection):
+    backend = connection.dialect.name
+    if backend == 'sqlite':
+        for statement in SQLITE_DDL:
+            connection.execute(text(statement))
+    elif backend == 'mysql':
+        exists = connection.execute(text(
+            "SELECT COUNT(*) FROM information_schema.statistics "
+            "WHERE table_schema = DATABASE() AND table_name = 'Patient' AND index_name = :name"
+        ), {"name": MYSQL_INDEX}).scalar()
+        if not exists:
+            connection.execute(text(
+                f"ALTER TABLE Patient ADD FULLTEXT INDEX {MYSQL_INDEX} (Name, Phone, IdentityNo) WITH PARSER ngram"
+            ))
+
+
+# 新建的 Patient 表是空的，建好索引就行，不用重建
+def _create_index_with_table(target, connection, **kw):
+    _create_index(connection)
+
+
+event.listen(Patient.__table__, 'after_create', _create_index_with_table)
+
+
+# 建全文索引（已经有了就跳过）并按现有数据重建，返回索引里的行数
+def install():
+    _create_index(db.session.connection())
+    if _backend() == 'sqlite':
+        db.session.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    db.session.commit()
+    return db.session.query(Patient).count()
+
+
+def _next_prefix(prefix):
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+# column >= prefix AND column < 下一个前缀，两种数据库都能用上普通索引（SQLite 的 LIKE 'x%' 用不上）
+def _prefix_query(column, prefix, limit):
+    return Patient.query.filter(column >= prefix, column < _next_prefix(prefix)) \
+        .order_by(column, Patient.PatientID).limit(limit).all()
+
+
+def _fragment_ids(q, limit):
+    backend = _backend()
+    if backend == 'sqlite':
+        if len(q) < 3:
+            return []
+        phrase = '"' + q.replace('"', '""') + '"'
+        rows = db.session.execute(text(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :q ORDER BY rank LIMIT :limit"
+        ), {"q": phrase, "limit": limit})
+    elif backend == 'mysql':
+        phrase = '"' + q.replace('"', ' ') + '"'
+        rows = db.session.execute(text(
+            "SELECT PatientID FROM Patient WHERE MATCH(Name, Phone, IdentityNo) AGAINST (:q IN BOOLEAN MODE) "
+            "ORDER BY MATCH(Name, Phone, IdentityNo) AGAINST (:q IN BOOLEAN MODE) DESC LIMIT :limit"
+        ), {"q": phrase, "limit": limit})
+    else:
+        rows = db.session.query(Patient.PatientID).filter(
+            Patient.Name.contains(q) | Patient.Phone.contains(q) | Patient.IdentityNo.contains(q)
+        ).limit(limit)
+    return [row[0] for row in rows]
+
+
+# 返回 [(患者, 匹配到的字段)]，按上面的规则排好序
+def search(q, limit):
+    q = q.strip()
+    found = {}
+
+    def add(patient, tier, field, order=0):
+        key = (tier, order, len(getattr(patient, field) or ''), patient.PatientID)
+        if patient.PatientID not in found or key < found[patient.PatientID][0]:
+            found[patient.PatientID] = (key, patient, field)
+
+    # 纯数字只查身份证号和手机号，其余只查姓名
+    if q.isdigit():
+        for field in ('IdentityNo', 'Phone'):
+            for patient in _prefix_query(getattr(Patient, field), q, limit):
+                add(patient, EXACT_ID if getattr(patient, field) == q else PREFIX_ID, field)
+    else:
+        for patient in _prefix_query(Patient.Name, q, limit):
+            add(patient, EXACT_NAME if patient.Name == q else PREFIX_NAME, 'Name')
+
+    # 身份证号/手机号完全相同，或者前缀已经凑够了，就不用再查片段（数字的 trigram 很常见，片段查询反而最慢）
+    if len(found) >= limit or any(key[0] == EXACT_ID for key, _, _ in found.values()):
+        fragment_ids = []
+    else:
+        fragment_ids = [pid for pid in _fragment_ids(q, limit) if pid not in found]
+    if fragment_ids:
+        patients = {p.PatientID: p for p in Patient.query.filter(Patient.PatientID.in_(fragment_ids)).all()}
+        for order, pid in enumerate(fragment_ids):
+            patient = patients.get(pid)
+            if patient is None:
+                continue
+            field = next((f for f in SEARCH_FIELDS if q.lower() in (getattr(patient, f) or '').lower()), 'Name')
+            add(patient, FRAGMENT, field, order)
+
+    ranked = sorted(found.values(), key=lambda item: item[0])
+    return [(patient, field) for _, patient, field in ranked[:limit]]
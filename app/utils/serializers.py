@@ -0,0 +1,126 @@
+import keyword
+from datetime import date
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import Date, Numeric
+from sqlalchemy.engine import Row
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 响应序列化：
+#   serializer(model, fields) 按模型和列投影生成一个 row -> dict 函数（拼成源码后 compile，一次生成反复使用），
+#     row 可以是模型对象，也可以是带同名列的查询结果行；Date 列输出 'YYYY-MM-DD'，DECIMAL 列输出 float，空值保持 None。
+#     查询结果行按名字取属性很慢，所以对每种结果列布局（Row._fields）再生成一个按下标取值的版本。
+#     fields 可以是列名列表，也可以是 {输出字段: 行上的属性名}，用于 join 出来带前缀标签的列；不是模型列的字段原样输出。
+#   OrjsonProvider 替换 Flask 默认的 json 提供者，jsonify 和 request.get_json 都走 orjson；
+#     其余行为和默认提供者一致：键排序，日期按 HTTP 日期格式、Decimal 按字符串输出。没装 orjson 时保持默认提供者。
+
+_SERIALIZERS = {}
+
+
+# 每个请求都会按 fields 参数取一次，所以先用传进来的参数本身查缓存，命中时不做任何转换
+def serializer(model, fields=None):
+    if isinstance(fields, dict):
+        key = (model, tuple(fields.items()))
+    else:
+        key = (model, None if fields is None else tuple(fields))
+    func = _SERIALIZERS.get(key)
+    if func is None:
+        if fields is None:
+            fields = [column.key for column in model.__mapper__.column_attrs]
+        if not isinstance(fields, dict):
+            fields = {name: name for name in fields}
+        func = _SERIALIZERS[key] = _dispatch(model, fields)
+    return func
+
+
+def _dispatch(model, fields):
+    by_attr = _compile(model, fields)
+    by_layout = {}
+    # 同一个查询结果的行共用一个 _parent（列元数据），记住上一次用的版本，省掉每行都算一遍 _fields
+    last = (None, None)
+
+    def serialize(row):
+        nonlocal last
+        if not isinstance(row, Row):
+            return by_attr(row)
+        parent, func = last
+        if row._parent is not parent:
+            layout = row._fields
+            func = by_layout.get(layout)
+            if func is None:
+                func = by_layout[layout] = _compile(model, fields, layout)
+            last = (row._parent, func)
+        return func(row)
+
+    return serialize
+
+
+def _compile(model, fields, layout=()):
+    columns = model.__mapper__.columns
+    positions = {name: i for i, name in enumerate(layout)}
+    items = []
+    for name, attr in fields.items():
+        if not attr.isidentifier() or keyword.iskeyword(attr):
+            raise ValueError(f'{attr!r} 不是合法的属性名')
+        value = f'row[{positions[attr]}]' if attr in positions else f'row.{attr}'
+        column_type = columns[name].type if name in columns else None
+        # date 和 datetime 的 isoformat 前 10 位都是 YYYY-MM-DD，比 strftime 快得多
+        if isinstance(column_type, Date):
+            value = f'(None if (v := {value}) is None else v.isoformat()[:10])'
+        elif isinstance(column_type, Numeric):
+            value = f'(None if (v := {value}) is None else float(v))'
+        items.append(f'{name!r}: {value}')
+
+    source = 'def serialize(row):\n    return {' + ', '.join(items) + '}\n'
+    namespace = {}
+    exec(compile(source, f'<serializer {model.__name__}>', 'exec'), namespace)
+    return namespace['serialize']
+
+
+def _default(o):
+    if isinstance(o, date):
+        return http_date(o)
+    if isinstance(o, Decimal):
+        return str(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    def _options(self, indent=None):
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        # 只认 indent / separators，带了其他 json.dumps 参数（比如 cls）就交回默认实现
+        if set(kwargs) - {'indent', 'separators'}:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=self._options(kwargs.get('indent'))).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    # 直接输出 bytes，省掉一次 decode / encode
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        body = orjson.dumps(obj, default=_default, option=self._options(indent))
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+
+# 在 create_app 里调用；JSON_PROVIDER 设成 'default' 可以换回 Flask 自带的提供者
+def configure_json(app):
+    if app.config['JSON_PROVIDER'] == 'orjson' and orjson is not None:
+        app.json = OrjsonProvider(app)
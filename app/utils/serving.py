@@ -0,0 +1,43 @@
+from sqlalchemy import text
+from ..extensions import db, cache
+from ..models.department import Department
+from ..models.doctor import Doctor
+from ..models.ward import Ward
+
+# 生产环境多进程部署（gunicorn preload_app）用到的钩子，配合根目录的 gunicorn.conf.py：
+#   after_fork —— 子进程里丢掉从主进程继承来的连接池，不关闭连接（连接还属于主进程），之后按需重新建
+#   warmup —— 接流量之前先把连接池里的连接建好，并把科室/医生/病房放进基础数据缓存
+#   shutdown —— 进程退出前关闭连接池
+# 号段分配器（ids.py）自己会在 fork 之后重置。
+
+
+def after_fork(app):
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    cache.clear()
+
+
+def warmup(app, connections=None):
+    loaded = {}
+    with app.app_context():
+        for key, engine in db.engines.items():
+            size = engine.pool.size() if hasattr(engine.pool, 'size') else 1
+            count = min(connections or size, size)
+            opened = [engine.connect() for _ in range(count)]
+            for conn in opened:
+                conn.execute(text('SELECT 1'))
+                conn.close()
+            loaded[f'pool:{key or "default"}'] = count
+
+        loaded['Department'] = cache.preload(Department, 'DeptName')
+        loaded['Doctor'] = cache.preload(Doctor)
+        loaded['Ward'] = cache.preload(Ward)
+        db.session.remove()
+    return loaded
+
+
+def shutdown(app):
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
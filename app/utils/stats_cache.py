@@ -0,0 +1,256 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from sqlalchemy import select
+from . import metrics
+from .routing import use_primary
+
+# 统计接口（收入报表、科室统计、医生工作量）的结果缓存：
+#   只缓存已经结束的区间（结束日期在今天之前），键是 (接口, 实体, 开始日期, 结束日期, 其他参数)。
+#   实体是 ('doctor', {医生ID}) / ('dept', {科室ID})，None 表示结果和所有医生、科室都有关（全院汇总、不分科室的报表）。
+#   结束了的区间只有补录旧日期的就诊、入院、出院才会变。写接口提交之后调用 invalidate(开始, 结束, 接口, doctor=, dept=)，
+#   只清掉区间有交集、实体对得上的条目。每个接口记一个日期水位线（缓存过的最晚结束日期），
+#   写入的日期在水位线之后（比如今天的就诊）不可能影响任何缓存条目，直接跳过，不用扫描。
+#   读的过程中发生了失效，读出来的结果可能是旧的，不写回缓存（token 机制）。
+# 缓存在进程内，失效的代数存在数据库里（EntityVersion 表里 stats:<接口> 这一行）：
+#   补录结束了的日期时 invalidate 把涉及接口的代数加一，条目写入时记下当时的代数，
+#   读的时候先从主库取当前代数，对不上就当没命中，所以其他进程（gunicorn 的其他 worker、命令行 rollup rebuild）的补录也能马上看到。
+#   本进程精确清掉受影响的条目之后，剩下的条目直接改记成新代数，不会被自己的补录连带清空。
+#   代数和写回缓存的数据都从主库读，副本的复制延迟不会把旧结果写进缓存。
+
+GENERATION_PREFIX = 'stats:'
+ENDPOINTS = ('revenue', 'department_stats', 'doctor_workload', 'doctor_workload_ranking')
+
+
+def _estimate_size(key, value):
+    return len(repr(key)) + len(json.dumps(value, default=str, ensure_ascii=False).encode('utf-8'))
+
+
+def _ids(value):
+    return frozenset(value) if isinstance(value, (list, tuple, set, frozenset)) else frozenset([value])
+
+
+class StatsCache:
+    def __init__(self):
+        self.enabled = True
+        self.maxsize = 4096
+        self.ttl = 3600
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        # key -> (value, expires_at, size, entity, start, end, generation)
+        self._data = OrderedDict()
+        self._keys = {}
+        self.watermarks = {}
+        self.generation = 0
+        self.bytes = 0
+        self.hits = {}
+        self.misses = {}
+        self.evictions = 0
+        self.invalidations = 0
+
+    def init_app(self, app):
+        self.enabled = app.config['STATS_CACHE_ENABLED']
+        self.maxsize = app.config['STATS_CACHE_SIZE']
+        self.ttl = app.config['STATS_CACHE_TTL']
+        with self._lock:
+            self._reset()
+        metrics.register_collector('stats_cache', self.collect)
+
+    @staticmethod
+    def closed(end, today=None):
+        return end is not None and end < (today or date.today())
+
+    def _remove(self, key):
+        size = self._data.pop(key)[2]
+        self._keys[key[0]].discard(key)
+        self.bytes -= size
+
+    def get(self, endpoint, entity, start, end, params=(), generation=0):
+        if not self.enabled:
+            return None
+        key = (endpoint, entity, start, end, params)
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and (item[1] < time.monotonic() or item[6] != generation):
+                self._remove(key)
+                item = None
+            counter = self.misses if item is None else self.hits
+            counter[endpoint] = counter.get(endpoint, 0) + 1
+            if item is None:
+                return None
+            self._data.move_to_end(key)
+            return item[0]
+
+    # 查库之前取一个 token，写回时带上；这期间有过失效就不写
+    def token(self):
+        return self.generation
+
+    def set(self, endpoint, entity, start, end, params, value, token, generation=0):
+        if not self.enabled or not self.closed(end):
+            return
+        key = (endpoint, entity, start, end, params)
+        size = _estimate_size(key, value)
+        with self._lock:
+            if token != self.generation:
+                return
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, time.monotonic() + self.ttl, size, entity, start, end, generation)
+            self._keys.setdefault(endpoint, set()).add(key)
+            self.bytes += size
+            if end > self.watermarks.get(endpoint, date.min):
+                self.watermarks[endpoint] = end
+            while len(self._data) > self.maxsize:
+                self._remove(next(iter(self._data)))
+                self.evictions += 1
+
+    def generation_query(self, endpoint):
+        from ..models.entity_version import EntityVersion
+
+        return select(EntityVersion.Version).where(EntityVersion.Entity == GENERATION_PREFIX + endpoint)
+
+    # 接口当前的失效代数，总是读主库
+    def shared_generation(self, endpoint):
+        from ..extensions import db
+
+        return db.session.execute(self.generation_query(endpoint), bind_arguments={'bind': db.engine}).scalar() or 0
+
+    # 代数加一并提交，返回 {接口: 新代数}。在写接口提交之后调用，会话里没有别的修改
+    def _bump(self, endpoints):
+        from ..extensions import db
+        from ..models.entity_version import EntityVersion
+        from .counters import increment
+
+        names = [GENERATION_PREFIX + endpoint for endpoint in endpoints]
+        with use_primary():
+            # 一条 UPDATE 加完所有接口，只有第一次用到的接口才逐个插入
+            updated = db.session.query(EntityVersion).filter(EntityVersion.Entity.in_(names)) \
+                .update({EntityVersion.Version: EntityVersion.Version + 1}, synchronize_session=False)
+            if updated < len(names):
+                existing = set(db.session.execute(
+                    select(EntityVersion.Entity).where(EntityVersion.Entity.in_(names))
+                ).scalars())
+                for name in names:
+                    if name not in existing:
+                        increment(EntityVersion, {"Entity": name}, {"Version": 1})
+            # 同一个事务里读回来：其他进程的加一要等这个事务提交，读到的新代数减一就是加之前的值
+            rows = dict(db.session.execute(
+                select(EntityVersion.Entity, EntityVersion.Version).where(EntityVersion.Entity.in_(names))
+            ).all())
+            db.session.commit()
+        return {endpoint: rows[name] for endpoint, name in zip(endpoints, names)}
+
+    # 读穿透：区间已经结束时先查缓存，没命中从主库 load() 再写回；没结束的区间直接查库
+    def fetch(self, endpoint, entity, start, end, params, load):
+        if not self.enabled or not self.closed(end):
+            return load()
+        generation = self.shared_generation(endpoint)
+        value = self.get(endpoint, entity, start, end, params, generation)
+        if value is None:
+            token = self.token()
+            with use_primary():
+                value = load()
+            self.set(endpoint, entity, start, end, params, value, token, generation)
+        return value
+
+    # 异步读接口（app/async_api.py）用的版本：load(sessions) 是协程函数，用传入的 sessions() 开会话；
+    # sessions 是这个请求平时用的（可能是副本），primary_sessions 是主库的，代数和写回缓存的数据从主库读
+    async def fetch_async(self, endpoint, entity, start, end, params, load, sessions, primary_sessions):
+        if not self.enabled or not self.closed(end):
+            return await load(sessions)
+        async with primary_sessions() as db_session:
+            generation = (await db_session.execute(self.generation_query(endpoint))).scalar() or 0
+        value = self.get(endpoint, entity, start, end, params, generation)
+        if value is None:
+            token = self.token()
+            value = await load(primary_sessions)
+            self.set(endpoint, entity, start, end, params, value, token, generation)
+        return value
+
+    # 清掉和 [start, end] 有交集（None 表示不限）、实体对得上的条目；endpoints 不传表示所有接口。
+    # touched 是这次写入涉及的实体，如 doctor=3, dept=(1, 2)。
+    # 写入日期早于今天时还要把数据库里的代数加一，其他进程的条目就都作废了
+    def invalidate(self, start=None, end=None, endpoints=None, **touched):
+        touched = {kind: _ids(value) for kind, value in touched.items() if value is not None}
+        bumped = {}
+        if self.enabled and (start is None or self.closed(start)):
+            bumped = self._bump(tuple(endpoints or ENDPOINTS))
+        removed = 0
+        with self._lock:
+            self.generation += 1
+            for endpoint in list(endpoints or self._keys):
+                # 水位线之后的写入不会落在任何已缓存的区间里
+                if start is not None and start > self.watermarks.get(endpoint, date.min):
+                    continue
+                for key in list(self._keys.get(endpoint, ())):
+                    entity, entry_start, entry_end = self._data[key][3:6]
+                    if start is not None and entry_end < start:
+                        continue
+                    if end is not None and entry_start is not None and entry_start > end:
+                        continue
+                    if entity is not None:
+                        kind, ids = entity
+                        if kind not in touched or not (ids & touched[kind]):
+                            continue
+                    self._remove(key)
+                    removed += 1
+            # 没被清掉的条目和这次补录无关，改记成新代数；更早的代数说明中间还有别的进程补录过，留着等下次读时作废
+            for endpoint, generation in bumped.items():
+                for key in self._keys.get(endpoint, ()):
+                    item = self._data[key]
+                    if item[6] == generation - 1:
+                        self._data[key] = item[:6] + (generation,)
+            self.invalidations += removed
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._data.clear()
+            self._keys.clear()
+            self.watermarks.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            endpoints = sorted(set(self.hits) | set(self.misses) | set(self._keys))
+            per_endpoint = {}
+            for endpoint in endpoints:
+                hits, misses = self.hits.get(endpoint, 0), self.misses.get(endpoint, 0)
+                per_endpoint[endpoint] = {
+                    "hits": hits,
+                    "misses": misses,
+                    "hitRatio": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+                    "size": len(self._keys.get(endpoint, ())),
+                    "watermark": self.watermarks[endpoint].isoformat() if endpoint in self.watermarks else None
+                }
+            hits, misses = sum(self.hits.values()), sum(self.misses.values())
+            return {
+                "enabled": self.enabled,
+                "hits": hits,
+                "misses": misses,
+                "hitRatio": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+                "size": len(self._data),
+                "bytes": self.bytes,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "endpoints": per_endpoint
+            }
+
+    def collect(self):
+        stats = self.stats()
+        endpoints = stats["endpoints"]
+        return [
+            ('hospital_stats_cache_hits_total', 'counter', '统计结果缓存命中次数',
+             [({"endpoint": name}, item["hits"]) for name, item in endpoints.items()]),
+            ('hospital_stats_cache_misses_total', 'counter', '统计结果缓存未命中次数（已结束区间的实际查库次数）',
+             [({"endpoint": name}, item["misses"]) for name, item in endpoints.items()]),
+            ('hospital_stats_cache_invalidations_total', 'counter', '补录旧日期数据清掉的缓存条目数', [({}, stats["invalidations"])]),
+            ('hospital_stats_cache_evictions_total', 'counter', 'LRU 淘汰次数', [({}, stats["evictions"])]),
+            ('hospital_stats_cache_entries', 'gauge', '缓存条目数', [({}, stats["size"])]),
+            ('hospital_stats_cache_bytes', 'gauge', '缓存结果按 JSON 估算的字节数', [({}, stats["bytes"])]),
+        ]
@@ -0,0 +1,172 @@
+from datetime import datetime
+
+# 单条接口和批量导入共用的字段校验
+# patient 按原接口的习惯遇到第一个错误就返回 (None, {"error", "message"})；
+# visit / admission 收集全部错误返回 (None, [{"field", "message"}, ...])。
+# 校验通过时返回 (可直接用于构造模型的字段 dict, None)。
+
+
+def validate_patient(data):
+    required_fields = ['Name', 'Gender', 'IdentityNo']
+
+    # 检查必填字段
+    missing = [field for field in required_fields if not data.get(field)]
+    if missing:
+        return None, {
+            "error": "MISSING_REQUIRED_FIELDS",
+            "message": f"缺少必填字段: {', '.join(missing)}"
+        }
+
+    # 字段长度校验
+    if len(data['Name']) > 50:
+        return None, {
+            "error": "NAME_TOO_LONG",
+            "message": "姓名不能超过50个字符"
+        }
+
+    # 身份证格式校验（简单版）
+    if not data['IdentityNo'].isdigit() or len(data['IdentityNo']) != 18:
+        return None, {
+            "error": "INVALID_IDENTITY_NO",
+            "message": "身份证号必须为18位数字"
+        }
+
+    # 日期格式校验
+    birth_date = None
+    if data.get('BirthDate'):
+        try:
+            birth_date = datetime.strptime(data['BirthDate'], '%Y-%m-%d').date()
+        except ValueError:
+            return None, {
+                "error": "INVALID_DATE_FORMAT",
+                "message": "日期格式应为YYYY-MM-DD"
+            }
+
+    # 手机号格式校验
+    phone = (data.get('Phone') or '').strip()
+    if phone and not (phone.startswith('1') and len(phone) == 11 and phone.isdigit()):
+        return None, {
+            "error": "INVALID_PHONE",
+            "message": "手机号格式不正确"
+        }
+
+    return {
+        "Name": data['Name'].strip(),
+        "Gender": data['Gender'].strip(),
+        "BirthDate": birth_date,
+        "IdentityNo": data['IdentityNo'].strip(),
+        "Phone": phone
+    }, None
+
+
+# patient_exists / doctor_exists / admission_exists 由调用方提供，一般是预先用一次查询查好的 ID 集合
+def validate_visit(data, patient_exists, doctor_exists, admission_exists):
+    errors = []
+
+    try:
+        patient_id = int(data.get('PatientID'))
+    except (TypeError, ValueError):
+        errors.append({"field": "PatientID", "message": "患者ID必须为整数"})
+    else:
+        if not patient_exists(patient_id):
+            errors.append({"field": "PatientID", "message": "指定的患者不存在"})
+
+    try:
+        doctor_id = int(data.get('DoctorID'))
+    except (TypeError, ValueError):
+        errors.append({"field": "DoctorID", "message": "医生ID必须为整数"})
+    else:
+        if not doctor_exists(doctor_id):
+            errors.append({"field": "DoctorID", "message": "指定的医生不存在"})
+
+    admission_id = data.get('AdmissionID')
+    if admission_id is not None:
+        try:
+            admission_id = int(admission_id)
+        except (TypeError, ValueError):
+            errors.append({"field": "AdmissionID", "message": "入院ID必须为整数"})
+        else:
+            if not admission_exists(admission_id):
+                errors.append({"field": "AdmissionID", "message": "指定的入院记录不存在"})
+
+    visit_date = (data.get('VisitDate') or '').strip()
+    if not visit_date:
+        errors.append({"field": "VisitDate", "message": "就诊日期不能为空"})
+    else:
+        try:
+            visit_date = datetime.strptime(visit_date, '%Y-%m-%d')
+        except ValueError:
+            errors.append({"field": "VisitDate", "message": "就诊日期格式不正确，应该为 YYYY-MM-DD"})
+
+    complaint = (data.get('Complaint') or '').strip()
+    if not complaint:
+        errors.append({"field": "Complaint", "message": "主诉不能为空"})
+
+    diagnosis = (data.get('Diagnosis') or '').strip()
+    if not diagnosis:
+        errors.append({"field": "Diagnosis", "message": "诊断不能为空"})
+
+    prescription = (data.get('Prescription') or '').strip()
+    if not prescription:
+        errors.append({"field": "Prescription", "message": "处方不能为空"})
+
+    try:
+        fee = float(data.get('Fee'))
+        if fee <= 0:
+            errors.append({"field": "Fee", "message": "费用必须大于0"})
+    except (TypeError, ValueError):
+        errors.append({"field": "Fee", "message": "费用必须为正数"})
+
+    if errors:
+        return None, errors
+
+    return {
+        "PatientID": patient_id,
+        "DoctorID": doctor_id,
+        "AdmissionID": admission_id if admission_id else None,
+        "VisitDate": visit_date,
+        "Complaint": complaint,
+        "Diagnosis": diagnosis,
+        "Prescription": prescription,
+        "Fee": fee
+    }, None
+
+
+# ward_exists 不传时不检查病房是否存在（单条接口靠外键约束）
+def validate_admission(data, ward_exists=None):
+    errors = []
+
+    try:
+        ward_id = int(data.get('WardID'))
+    except (TypeError, ValueError):
+        errors.append({"field": "WardID", "message": "病区ID必须为整数"})
+    else:
+        if ward_exists is not None and not ward_exists(ward_id):
+            errors.append({"field": "WardID", "message": "指定的病房不存在"})
+
+    bed_no = (data.get('BedNo') or '').strip()
+    if not bed_no:
+        errors.append({"field": "BedNo", "message": "床号不能为空"})
+
+    admission_date = (data.get('AdmissionDate') or '').strip()
+    if not admission_date:
+        errors.append({"field": "AdmissionDate", "message": "入院日期不能为空"})
+    else:
+        try:
+            admission_date = datetime.strptime(admission_date, '%Y-%m-%d')
+        except ValueError:
+            errors.append({"field": "AdmissionDate", "message": "入院日期格式不正确，应该为 YYYY-MM-DD"})
+
+    admission_reason = (data.get('AdmissionReason') or '').strip()
+    if not admission_reason:
+        errors.append({"field": "AdmissionReason", "message": "入院原因不能为空"})
+
+    if errors:
+        return None, errors
+
+    return {
+        "WardID": ward_id,
+        "BedNo": bed_no,
+        "AdmissionDate": admission_date,
+        "AdmissionReason": admission_reason
+    }, None
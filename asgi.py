@@ -0,0 +1,6 @@
+import os
+from app.async_api import create_async_app
+from app.config import config_by_name
+
+# 看板只读接口的异步入口：hypercorn -c hypercorn.toml asgi:app
+app = create_async_app(config_by_name[os.environ.get('APP_ENV', 'production')])
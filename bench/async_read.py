@@ -0,0 +1,67 @@
+import argparse
+import multiprocessing
+import random
+from urllib.parse import quote
+
+from common import DEFAULT_URI, make_app, write_results
+from micro import ROUTES, BenchContext
+from serve import run_server
+
+# 看板只读接口在高并发连接下的对比：gunicorn（同步 Flask，gthread）和 hypercorn（asgi.py 的异步版本）。
+# 只压 asgi.py 里有的四个接口，URL 序列两边完全相同。
+
+ASYNC_ROUTES = (
+    'ward.get_ward_detail',
+    'admission.check_current_patients',
+    'sta.department_stats',
+    'visit.get_visits',
+    'visit.get_visits[patient]',
+    'visit.get_visits[cursor]',
+)
+
+
+def _urls(uri, count, random_seed):
+    app = make_app(uri)
+    with app.app_context():
+        ctx = BenchContext(app.test_client(), random.Random(random_seed))
+    makers = [make for name, method, make in ROUTES if name in ASYNC_ROUTES]
+    return [quote(ctx.rng.choice(makers)(ctx)[0], safe='/?&=,') for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='看板只读接口：gunicorn 同步版和 hypercorn 异步版的高并发对比')
+    parser.add_argument('--uri', default=DEFAULT_URI)
+    parser.add_argument('--server', action='append', choices=['gunicorn', 'hypercorn'], help='默认两个都跑')
+    parser.add_argument('--connections', type=int, action='append', help='并发连接数，可以写多次，默认 50 和 200')
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count() * 2 + 1, help='服务器进程数')
+    parser.add_argument('--threads', type=int, default=8, help='gunicorn 每个进程的线程数')
+    parser.add_argument('--clients', type=int, default=4, help='压测客户端进程数，连接平均分到各个进程')
+    parser.add_argument('--duration', type=float, default=15.0)
+    parser.add_argument('--port', type=int, default=5078)
+    parser.add_argument('--seed', type=int, default=3170)
+    parser.add_argument('--out', help='结果 JSON 路径，默认写到 bench/results/')
+    args = parser.parse_args()
+
+    urls = _urls(args.uri, 2000, args.seed)
+    results = {}
+    for connections in args.connections or [50, 200]:
+        client_threads = max(connections // args.clients, 1)
+        for server in args.server or ['gunicorn', 'hypercorn']:
+            summary = run_server(
+                server, args.port, args.uri, urls, args.duration,
+                args.clients, client_threads, args.workers, args.threads
+            )
+            results.setdefault(str(connections), {})[server] = summary
+            print(f"{connections:4d} conns  {server:9s} {summary['throughputRps']:9.1f} req/s  "
+                  f"p50 {summary['p50Ms']:8.2f}ms  p95 {summary['p95Ms']:8.2f}ms  "
+                  f"p99 {summary['p99Ms']:8.2f}ms  errors {summary['errors']}")
+
+    out = write_results('async_read', {
+        "uri": args.uri.split('@')[-1], "workers": args.workers, "threads": args.threads,
+        "clients": args.clients, "connections": args.connections or [50, 200], "duration": args.duration
+    }, results, args.out)
+    print(f"结果已写入 {out}")
+
+
+if __name__ == '__main__':
+    main()
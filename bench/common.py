@@ -0,0 +1,85 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.config import Config
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+DEFAULT_URI = 'sqlite:///' + os.path.join(RESULTS_DIR, 'bench.db')
+
+
+def bench_config(uri, **overrides):
+    attrs = {
+        'SQLALCHEMY_DATABASE_URI': uri,
+        # 压测时不输出慢查询日志，避免日志本身影响结果
+        'SLOW_QUERY_THRESHOLD_MS': 10 ** 9,
+    }
+    if uri.startswith('sqlite'):
+        attrs['SQLALCHEMY_ENGINE_OPTIONS'] = {'connect_args': {'timeout': 60, 'check_same_thread': False}}
+    attrs.update(overrides)
+    return type('BenchConfig', (Config,), attrs)
+
+
+def make_app(uri, **overrides):
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    return create_app(bench_config(uri, **overrides))
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    # nearest-rank
+    index = max(0, min(len(sorted_values) - 1, int(round(p / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, elapsed=None, errors=0):
+    values = sorted(latencies)
+    summary = {
+        "count": len(values),
+        "errors": errors,
+        "meanMs": round(sum(values) / len(values) * 1000, 3) if values else None,
+        "p50Ms": round(percentile(values, 50) * 1000, 3) if values else None,
+        "p95Ms": round(percentile(values, 95) * 1000, 3) if values else None,
+        "p99Ms": round(percentile(values, 99) * 1000, 3) if values else None,
+        "maxMs": round(values[-1] * 1000, 3) if values else None,
+    }
+    if elapsed:
+        summary["throughputRps"] = round(len(values) / elapsed, 2)
+    return summary
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(kind, params, results, out=None):
+    commit = git_commit()
+    payload = {
+        "kind": kind,
+        "commit": commit,
+        "createdAt": datetime.now().isoformat(timespec='seconds'),
+        "python": sys.version.split()[0],
+        "params": params,
+        "results": results,
+    }
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        out = os.path.join(RESULTS_DIR, f'{kind}-{stamp}-{commit or "nogit"}.json')
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    return out
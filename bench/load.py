@@ -0,0 +1,187 @@
+import argparse
+import itertools
+import random
+import threading
+import time
+
+from common import DEFAULT_URI, make_app, summarize, write_results
+from micro import ROUTES, BenchContext
+
+from app.extensions import db, pool_monitor
+
+# 并发场景：每个线程一个 test client，按权重随机挑路由，持续 duration 秒。
+# test client 不经过网络，测的是应用 + 数据库在多线程下的表现（含 GIL 争用），
+# 用来比较不同提交之间的相对变化，不等同于线上 WSGI 服务器的绝对吞吐。
+
+SCENARIOS = {
+    # 门诊前台：挂号/接诊写入为主，夹杂查询
+    'front_desk': [
+        (40, 'visit.add_visit'),
+        (20, 'visit.get_visits[patient]'),
+        (15, 'patient.get_patient_detail'),
+        (10, 'patient.create_patient'),
+        (5, 'admission.add_admission'),
+        (5, 'ward.get_ward_detail'),
+        (5, 'doctor.get_doctor_detail'),
+    ],
+    # 查房/护士站：以读为主
+    'read_mostly': [
+        (25, 'ward.get_ward_detail'),
+        (15, 'ward.get_wards_occupancy'),
+        (15, 'admission.check_current_patients'),
+        (15, 'visit.get_visits'),
+        (10, 'visit.check_visit'),
+        (10, 'department.get_department'),
+        (10, 'doctor.get_doctors'),
+    ],
+    # 管理端报表
+    'reporting': [
+        (30, 'sta.department_stats'),
+        (20, 'sta.departments_stats'),
+        (20, 'sta.revenue_stats'),
+        (20, 'sta.doctor_workload'),
+        (10, 'sta.doctor_workload_ranking'),
+    ],
+    # 只做新增，检查并发写入分配到的主键没有重复（ID_ALLOCATION 两种模式都适用）
+    'id_collision': [
+        (40, 'visit.add_visit'),
+        (30, 'admission.add_admission'),
+        (15, 'ward.add_ward'),
+        (15, 'department.create_department'),
+    ],
+}
+
+CREATED_ID_FIELDS = {
+    'visit.add_visit': 'VisitID',
+    'admission.add_admission': 'AdmissionID',
+    'ward.add_ward': 'WardID',
+    'department.create_department': 'DeptID',
+}
+
+
+def _worker(ctx, mix, deadline, records, created, lock):
+    routes = {name: (method, make) for name, method, make in ROUTES}
+    names = [name for _, name in mix]
+    weights = [weight for weight, _ in mix]
+    rng = ctx.rng
+
+    local = []
+    local_created = []
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        method, make = routes[name]
+        url, body = make(ctx)
+        started = time.perf_counter()
+        response = ctx.client.open(url, method=method, json=body)
+        response.get_data()
+        local.append((name, time.perf_counter() - started, response.status_code))
+        if name in CREATED_ID_FIELDS and response.status_code in (200, 201):
+            payload = response.get_json()
+            payload = payload.get('data', payload)
+            local_created.append((CREATED_ID_FIELDS[name], payload[CREATED_ID_FIELDS[name]]))
+
+    with lock:
+        records.extend(local)
+        created.extend(local_created)
+
+
+def run_scenario(app, name, concurrency, duration, random_seed=3170):
+    mix = SCENARIOS[name]
+    records = []
+    created = []
+    lock = threading.Lock()
+    counter = itertools.count(1)
+
+    # 准备工作在开始计时之前做完，避免线程启动时抢连接影响结果
+    contexts = []
+    with app.app_context():
+        for i in range(concurrency):
+            ctx = BenchContext(app.test_client(), random.Random(random_seed + i))
+            ctx.counter = counter
+            contexts.append(ctx)
+
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    threads = [
+        threading.Thread(target=_worker, args=(ctx, mix, deadline, records, created, lock))
+        for ctx in contexts
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    # dispose 会换一个新的连接池，统计要先取出来
+    pools = pool_monitor.snapshot()
+    with app.app_context():
+        db.engine.dispose()
+
+    overall = summarize(
+        [latency for _, latency, _ in records],
+        elapsed=elapsed,
+        errors=sum(1 for _, _, status in records if status >= 500)
+    )
+    per_route = {}
+    for route in sorted({route for route, _, _ in records}):
+        rows = [(latency, status) for r, latency, status in records if r == route]
+        per_route[route] = summarize(
+            [latency for latency, _ in rows],
+            elapsed=elapsed,
+            errors=sum(1 for _, status in rows if status >= 500)
+        )
+
+    result = {
+        "concurrency": concurrency,
+        "durationSeconds": round(elapsed, 3),
+        "overall": overall,
+        "routes": per_route,
+        "pools": pools,
+    }
+    if name == 'id_collision':
+        by_field = {}
+        for field, value in created:
+            by_field.setdefault(field, []).append(value)
+        duplicates = {
+            field: len(values) - len(set(values)) for field, values in by_field.items()
+        }
+        result["createdIds"] = {field: len(values) for field, values in by_field.items()}
+        result["duplicateIds"] = duplicates
+        result["passed"] = not any(duplicates.values()) and overall["errors"] == 0
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='并发负载场景，输出 p50/p95/p99 和吞吐')
+    parser.add_argument('--uri', default=DEFAULT_URI)
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS), help='默认跑全部场景')
+    parser.add_argument('--concurrency', type=int, action='append', help='并发线程数，可重复以对比，默认 8')
+    parser.add_argument('--duration', type=float, default=10.0, help='每个场景持续秒数')
+    parser.add_argument('--seed', type=int, default=3170)
+    parser.add_argument('--out', help='结果 JSON 路径，默认写到 bench/results/')
+    args = parser.parse_args()
+
+    app = make_app(args.uri)
+    scenarios = args.scenario or sorted(SCENARIOS)
+    levels = args.concurrency or [8]
+
+    results = {}
+    for scenario in scenarios:
+        for concurrency in levels:
+            key = f'{scenario}@{concurrency}'
+            results[key] = run_scenario(app, scenario, concurrency, args.duration, args.seed)
+            overall = results[key]["overall"]
+            line = (f"{key:24s} {overall['throughputRps']:9.1f} req/s  p50 {overall['p50Ms']:8.2f}ms  "
+                    f"p95 {overall['p95Ms']:8.2f}ms  p99 {overall['p99Ms']:8.2f}ms  errors {overall['errors']}")
+            if 'passed' in results[key]:
+                line += f"  duplicateIds {results[key]['duplicateIds']}"
+            print(line)
+
+    out = write_results('load', {
+        "uri": args.uri.split('@')[-1], "scenarios": scenarios, "concurrency": levels, "duration": args.duration
+    }, results, args.out)
+    print(f"结果已写入 {out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+import argparse
+import itertools
+import random
+import time
+
+from common import DEFAULT_URI, make_app, summarize, write_results
+from seed import SURNAMES
+
+from sqlalchemy import func
+from app.extensions import db, cache
+from app.models.department import Department
+from app.models.doctor import Doctor
+from app.models.ward import Ward
+from app.models.patient import Patient
+from app.models.admission import Admission
+from app.models.visit import Visit
+
+
+# 压测时随机取已有的 ID，写接口生成不冲突的新数据
+class BenchContext:
+    def __init__(self, client, rng):
+        self.client = client
+        self.rng = rng
+        self.counter = itertools.count(1)
+        self.run_id = int(time.time()) % 100000
+        self.max_ids = {
+            model: db.session.query(func.max(pk)).scalar() or 0
+            for model, pk in [
+                (Department, Department.DeptID), (Doctor, Doctor.DoctorID), (Ward, Ward.WardID),
+                (Patient, Patient.PatientID), (Admission, Admission.AdmissionID), (Visit, Visit.VisitID)
+            ]
+        }
+        self.open_admissions = [
+            row[0] for row in db.session.query(Admission.AdmissionID)
+            .filter(Admission.DischargeDate.is_(None)).limit(10000)
+        ]
+        db.session.remove()
+
+    def pick(self, model):
+        return self.rng.randint(1, max(1, self.max_ids[model]))
+
+    # 一页列表里大概会出现的 ID 数量，给 /xxx/batch 用
+    def ids(self, model, count=20):
+        return ','.join(str(self.pick(model)) for _ in range(count))
+
+    def unique(self):
+        return f'{self.run_id:05d}{next(self.counter):07d}'
+
+    def date(self):
+        return f'2024-{self.rng.randint(1, 12):02d}-{self.rng.randint(1, 28):02d}'
+
+    def visit_body(self):
+        return {
+            "PatientID": self.pick(Patient), "DoctorID": self.pick(Doctor), "VisitDate": self.date(),
+            "Complaint": '发热', "Diagnosis": '上呼吸道感染', "Prescription": '对乙酰氨基酚', "Fee": 56.5
+        }
+
+    # 不计时的准备工作，比如先建一条可以删除的记录
+    def create(self, url, body):
+        response = self.client.post(url, json=body)
+        data = response.get_json() or {}
+        return data.get('data', data)
+
+
+def _new_patient(ctx):
+    return ctx.create('/patient', {"Name": '压测', "Gender": '男', "IdentityNo": '9' + ctx.unique().rjust(17, '0')})['PatientID']
+
+
+def _new_doctor(ctx):
+    return ctx.create('/doctor', {"Name": '压测', "DeptName": '科室001'})['DoctorID']
+
+
+def _discharge_target(ctx):
+    if ctx.open_admissions:
+        return ctx.open_admissions.pop()
+    return ctx.create('/admission', {
+        "WardID": ctx.pick(Ward), "BedNo": '1', "AdmissionDate": '2024-06-01', "AdmissionReason": '压测'
+    })['AdmissionID']
+
+
+# 种子数据里科室名是 科室001 这样的格式，更新时保持名称不变只改位置
+def _update_department(ctx, dept_id):
+    return f'/department/{dept_id}', {"DeptName": f'科室{dept_id:03d}', "Location": f'{ctx.rng.randint(1, 9)}号楼'}
+
+
+# (名称, 方法, 生成 (url, json) 的函数)；每个 blueprint 的每个路由至少一条
+ROUTES = [
+    ('department.create_department', 'POST', lambda c: ('/department', {"DeptName": f'压测科室{c.unique()}', "Location": 'B'})),
+    ('department.get_departments', 'GET', lambda c: ('/department?page=1&pageSize=10', None)),
+    ('department.get_department', 'GET', lambda c: (f'/department/{c.pick(Department)}', None)),
+    ('department.update_department', 'PUT', lambda c: _update_department(c, c.pick(Department))),
+
+    ('doctor.create_doctor', 'POST', lambda c: ('/doctor', {"Name": '压测', "DeptName": '科室001', "Title": '主治医师'})),
+    ('doctor.get_doctors', 'GET', lambda c: (f'/doctor?page=1&pageSize=10&deptId={c.pick(Department)}', None)),
+    ('doctor.get_doctor_detail', 'GET', lambda c: (f'/doctor/{c.pick(Doctor)}', None)),
+    ('doctor.get_doctors_batch', 'GET', lambda c: (f'/doctor/batch?ids={c.ids(Doctor)}', None)),
+    ('doctor.update_doctor', 'PUT', lambda c: (f'/doctor/{c.pick(Doctor)}', {"Title": c.rng.choice(['主任医师', '主治医师'])})),
+    ('doctor.delete_doctor', 'DELETE', lambda c: (f'/doctor/{_new_doctor(c)}', None)),
+
+    ('patient.create_patient', 'POST', lambda c: ('/patient', {"Name": '压测', "Gender": '女', "IdentityNo": '8' + c.unique().rjust(17, '0')})),
+    ('patient.get_patients', 'GET', lambda c: ('/patient?page=1&pageSize=20&surname=王', None)),
+    ('patient.get_patient_detail', 'GET', lambda c: (f'/patient/{c.pick(Patient)}', None)),
+    ('patient.search_patients', 'GET', lambda c: (f'/patient/search?q={c.rng.choice(SURNAMES)}', None)),
+    ('patient.get_patients_batch', 'GET', lambda c: (f'/patient/batch?ids={c.ids(Patient)}', None)),
+    ('patient.update_patient', 'PUT', lambda c: (f'/patient/{c.pick(Patient)}', {"Phone": f'137{c.rng.randint(0, 99999999):08d}'})),
+    ('patient.delete_patient', 'DELETE', lambda c: (f'/patient/{_new_patient(c)}', None)),
+
+    ('admission.add_admission', 'POST', lambda c: ('/admission', {
+        "WardID": c.pick(Ward), "BedNo": str(c.rng.randint(1, 40)), "AdmissionDate": c.date(), "AdmissionReason": '压测'
+    })),
+    ('admission.discharge_patient', 'PUT', lambda c: (f'/admission/{_discharge_target(c)}/discharge', {"DischargeDate": '2025-01-31'})),
+    ('admission.check_current_patients', 'GET', lambda c: (f'/admission/active?page=1&pageSize=10&wardId={c.pick(Ward)}', None)),
+
+    ('visit.get_visits', 'GET', lambda c: (f'/visit?page=1&pageSize=10&doctorId={c.pick(Doctor)}', None)),
+    ('visit.get_visits[expand]', 'GET', lambda c: (f'/visit?page=1&pageSize=10&doctorId={c.pick(Doctor)}&expand=patient,doctor,admission', None)),
+    ('visit.get_visits[patient]', 'GET', lambda c: (f'/visit?page=1&pageSize=10&patientId={c.pick(Patient)}', None)),
+    ('visit.get_visits[cursor]', 'GET', lambda c: ('/visit?cursor=&pageSize=50&startDate=2024-01-01&endDate=2024-03-31', None)),
+    ('visit.get_visits[page500]', 'GET', lambda c: ('/visit?cursor=&pageSize=500&startDate=2024-01-01', None)),
+    ('visit.get_visits[page500+text]', 'GET', lambda c: ('/visit?cursor=&pageSize=500&startDate=2024-01-01&fields=VisitID,PatientID,DoctorID,AdmissionID,VisitDate,Complaint,Diagnosis,Prescription,Fee', None)),
+    ('visit.export_visits', 'GET', lambda c: (f'/visit/export?format=ndjson&doctorId={c.pick(Doctor)}', None)),
+    ('visit.add_visit', 'POST', lambda c: ('/visit', c.visit_body())),
+    ('visit.add_visits_batch', 'POST', lambda c: ('/visit/batch', [c.visit_body() for _ in range(20)])),
+    ('visit.check_visit', 'GET', lambda c: (f'/visit/{c.pick(Visit)}', None)),
+    ('visit.check_visits_batch', 'GET', lambda c: (f'/visit/batch?ids={c.ids(Visit)}', None)),
+    ('visit.edit_prescription', 'PUT', lambda c: (f'/visit/{c.pick(Visit)}/prescription', {"Prescription": '布洛芬 0.3g bid'})),
+
+    ('ward.get_wards', 'GET', lambda c: (f'/ward?page=1&pageSize=10&deptId={c.pick(Department)}', None)),
+    ('ward.add_ward', 'POST', lambda c: ('/ward', {"WardName": f'压测{c.unique()}', "Floor": 3, "Capacity": 20, "DeptID": c.pick(Department)})),
+    ('ward.get_wards_occupancy', 'GET', lambda c: ('/ward/occupancy', None)),
+    ('ward.get_ward_detail', 'GET', lambda c: (f'/ward/{c.pick(Ward)}', None)),
+    ('ward.edit_ward', 'PUT', lambda c: (f'/ward/{c.pick(Ward)}', {"Capacity": 40})),
+
+    ('sta.department_stats', 'GET', lambda c: (f'/department/{c.pick(Department)}/stats?startDate=2024-01-01&endDate=2024-12-31', None)),
+    ('sta.departments_stats', 'GET', lambda c: ('/department/stats?ids=all&startDate=2024-01-01&endDate=2024-12-31', None)),
+    ('sta.revenue_stats', 'GET', lambda c: ('/report/revenue?startDate=2023-01-01&endDate=2024-12-31', None)),
+    ('sta.revenue_stats[week+dept]', 'GET', lambda c: ('/report/revenue?startDate=2023-01-01&endDate=2024-12-31&granularity=week&groupBy=dept', None)),
+    ('sta.revenue_stats[day+doctor]', 'GET', lambda c: ('/report/revenue?startDate=2024-10-01&endDate=2024-12-31&granularity=day&groupBy=doctor', None)),
+    ('sta.export_revenue', 'GET', lambda c: ('/report/revenue/export?format=csv&startDate=2024-12-01&endDate=2024-12-31', None)),
+    ('sta.doctor_workload', 'GET', lambda c: (f'/doctor/{c.pick(Doctor)}/workload?startDate=2024-01-01&endDate=2024-12-31', None)),
+    ('sta.doctor_workload_ranking', 'GET', lambda c: ('/doctor/workload?startDate=2024-01-01&endDate=2024-12-31&limit=20', None)),
+]
+
+
+def run_case(ctx, method, make, iterations, warmup):
+    latencies = []
+    errors = 0
+    statuses = {}
+    for i in range(warmup + iterations):
+        url, body = make(ctx)
+        started = time.perf_counter()
+        response = ctx.client.open(url, method=method, json=body)
+        # 流式响应要读完才算结束
+        response.get_data()
+        elapsed = time.perf_counter() - started
+        if i < warmup:
+            continue
+        latencies.append(elapsed)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        if response.status_code >= 500:
+            errors += 1
+    summary = summarize(latencies, errors=errors)
+    summary["statuses"] = {str(code): count for code, count in sorted(statuses.items())}
+    return summary
+
+
+def run(app, iterations=50, warmup=5, only=None, random_seed=3170, routes=ROUTES):
+    rng = random.Random(random_seed)
+    results = {}
+    with app.app_context():
+        ctx = BenchContext(app.test_client(), rng)
+    for name, method, make in routes:
+        if only and not any(pattern in name for pattern in only):
+            continue
+        cache.clear()
+        with app.app_context():
+            results[name] = run_case(ctx, method, make, iterations, warmup)
+        print(f"{name:34s} p50 {results[name]['p50Ms']:8.2f}ms  p95 {results[name]['p95Ms']:8.2f}ms  {results[name]['statuses']}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='逐个路由的微基准测试（Flask test client）')
+    parser.add_argument('--uri', default=DEFAULT_URI)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--only', action='append', help='只跑名称包含该字符串的用例，可重复')
+    parser.add_argument('--seed', type=int, default=3170)
+    parser.add_argument('--out', help='结果 JSON 路径，默认写到 bench/results/')
+    args = parser.parse_args()
+
+    app = make_app(args.uri)
+    results = run(app, args.iterations, args.warmup, args.only, args.seed)
+    out = write_results('micro', {
+        "uri": args.uri.split('@')[-1], "iterations": args.iterations, "warmup": args.warmup, "only": args.only
+    }, results, args.out)
+    print(f"结果已写入 {out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+import argparse
+
+from common import DEFAULT_URI, make_app, write_results
+from load import SCENARIOS, run_scenario
+
+# 固定并发数，改变连接池大小（不允许溢出），看吞吐和取连接等待时间的变化
+
+
+def run(uri, sizes, scenario, concurrency, duration, random_seed=3170):
+    results = {}
+    for size in sizes:
+        app = make_app(uri, DB_POOL_SIZE=size, DB_MAX_OVERFLOW=0, DB_POOL_TIMEOUT=60)
+        result = run_scenario(app, scenario, concurrency, duration, random_seed)
+        pool = result["pools"].get('default', {})
+        checkouts = pool.get('checkouts') or 0
+        results[str(size)] = {
+            "poolSize": size,
+            "throughputRps": result["overall"]["throughputRps"],
+            "p50Ms": result["overall"]["p50Ms"],
+            "p95Ms": result["overall"]["p95Ms"],
+            "p99Ms": result["overall"]["p99Ms"],
+            "errors": result["overall"]["errors"],
+            "checkouts": checkouts,
+            "meanWaitMs": round(pool["waitSecondsSum"] / checkouts * 1000, 3) if checkouts else None,
+            "maxWaitMs": round(pool["waitSecondsMax"] * 1000, 3) if checkouts else None,
+            "timeouts": pool.get('timeouts'),
+        }
+        row = results[str(size)]
+        print(f"pool_size={size:<4d} {row['throughputRps']:9.1f} req/s  p95 {row['p95Ms']:8.2f}ms  "
+              f"wait mean {row['meanWaitMs']}ms max {row['maxWaitMs']}ms  timeouts {row['timeouts']}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='吞吐随连接池大小的变化')
+    parser.add_argument('--uri', default=DEFAULT_URI)
+    parser.add_argument('--sizes', default='1,2,4,8,16,32', help='逗号分隔的连接池大小')
+    parser.add_argument('--scenario', default='read_mostly', choices=sorted(SCENARIOS))
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--seed', type=int, default=3170)
+    parser.add_argument('--out', help='结果 JSON 路径，默认写到 bench/results/')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    results = run(args.uri, sizes, args.scenario, args.concurrency, args.duration, args.seed)
+    out = write_results('pool', {
+        "uri": args.uri.split('@')[-1], "sizes": sizes, "scenario": args.scenario,
+        "concurrency": args.concurrency, "duration": args.duration
+    }, results, args.out)
+    print(f"结果已写入 {out}")
+
+
+if __name__ == '__main__':
+    main()
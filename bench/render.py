@@ -0,0 +1,100 @@
+import argparse
+import random
+import time
+
+from common import DEFAULT_URI, make_app, summarize, write_results
+from micro import BenchContext
+from app.models.doctor import Doctor
+
+# 渲染一页就诊列表（患者姓名、医生姓名和科室）的端到端耗时，三种取数方式：
+#   n_plus_one —— 先取 /visit，再按行调 /patient/<id>、/doctor/<id>（相同 ID 只取一次）
+#   batch      —— 先取 /visit，再各调一次 /patient/batch、/doctor/batch
+#   expand     —— /visit?expand=patient,doctor 一次取完
+# 住院信息没有单独的详情接口，只有 expand=admission 能取到，所以不放进对比。
+# 用的是进程内的 test client，没有网络往返；--rtt-ms 按每次请求加一个往返时间估算真实环境的耗时。
+
+
+def _get(ctx, url):
+    response = ctx.client.get(url)
+    return response.get_json()['data']
+
+
+def n_plus_one(ctx, query):
+    visits = _get(ctx, f'/visit?{query}')
+    requests = 1
+    for kind, field in (('patient', 'PatientID'), ('doctor', 'DoctorID')):
+        for value in {visit[field] for visit in visits}:
+            _get(ctx, f'/{kind}/{value}')
+            requests += 1
+    return requests
+
+
+def batch(ctx, query):
+    visits = _get(ctx, f'/visit?{query}')
+    requests = 1
+    for kind, field in (('patient', 'PatientID'), ('doctor', 'DoctorID')):
+        ids = {visit[field] for visit in visits}
+        if ids:
+            _get(ctx, f'/{kind}/batch?ids={",".join(map(str, ids))}')
+            requests += 1
+    return requests
+
+
+def expand(ctx, query):
+    _get(ctx, f'/visit?{query}&expand=patient,doctor')
+    return 1
+
+
+STRATEGIES = [('n_plus_one', n_plus_one), ('batch', batch), ('expand', expand)]
+
+
+def run(app, page_size, iterations, warmup, rtt_ms, random_seed):
+    with app.app_context():
+        ctx = BenchContext(app.test_client(), random.Random(random_seed))
+    queries = [
+        f'page=1&pageSize={page_size}&doctorId={ctx.pick(Doctor)}' if i % 2 else f'page={ctx.rng.randint(1, 50)}&pageSize={page_size}'
+        for i in range(warmup + iterations)
+    ]
+
+    results = {}
+    for name, strategy in STRATEGIES:
+        latencies = []
+        requests = 0
+        for i, query in enumerate(queries):
+            with app.app_context():
+                started = time.perf_counter()
+                count = strategy(ctx, query)
+                elapsed = time.perf_counter() - started
+            if i < warmup:
+                continue
+            requests += count
+            latencies.append(elapsed + count * rtt_ms / 1000)
+        results[name] = summarize(latencies)
+        results[name]["requestsPerPage"] = requests / iterations
+        print(f"{name:11s} p50 {results[name]['p50Ms']:8.2f}ms  p95 {results[name]['p95Ms']:8.2f}ms  "
+              f"{results[name]['requestsPerPage']:6.1f} 次请求/页")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='就诊列表页：逐行取、批量取、expand 三种方式的端到端耗时')
+    parser.add_argument('--uri', default=DEFAULT_URI)
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--rtt-ms', type=float, default=0.0, help='每次请求额外计入的网络往返时间（毫秒）')
+    parser.add_argument('--seed', type=int, default=3170)
+    parser.add_argument('--out', help='结果 JSON 路径，默认写到 bench/results/')
+    args = parser.parse_args()
+
+    app = make_app(args.uri)
+    results = run(app, args.page_size, args.iterations, args.warmup, args.rtt_ms, args.seed)
+    out = write_results('render', {
+        "uri": args.uri.split('@')[-1], "pageSize": args.page_size, "iterations": args.iterations,
+        "warmup": args.warmup, "rttMs": args.rtt_ms
+    }, results, args.out)
+    print(f"结果已写入 {out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+import argparse
+import os
+import random
+import time
+from datetime import date, timedelta
+
+from common import RESULTS_DIR, make_app, summarize, write_results
+from seed import SURNAMES, GIVEN
+
+from app.extensions import db
+from app.models.patient import Patient
+from app.utils import search
+
+# 患者检索的压测：单独建一个只有 Patient 表的库（默认 500 万人），
+# 对比 /patient/search 各类查询和原来 /patient?surname= 的 LIKE '%x%' 全表扫描。
+# 生成数据和建索引都比较慢，库已经存在时加 --no-reset 直接测。
+
+SEARCH_URI = 'sqlite:///' + os.path.join(RESULTS_DIR, 'search.db')
+
+
+def _patient_row(rng, i):
+    birth = date(1940, 1, 1) + timedelta(days=rng.randint(0, 30000))
+    return {
+        "PatientID": i,
+        "Name": rng.choice(SURNAMES) + ''.join(rng.choice(GIVEN) for _ in range(rng.randint(1, 2))),
+        "Gender": rng.choice(['男', '女']),
+        "BirthDate": birth,
+        # 地区码按序号分段，加上序号尾数保证唯一
+        "IdentityNo": f'{110000 + i // 10000:06d}{birth:%Y%m%d}{i % 10000:04d}',
+        "Phone": f'1{rng.choice("3578")}{rng.randint(0, 999999999):09d}'
+    }
+
+
+def build(patients, batch_size, random_seed):
+    rng = random.Random(random_seed)
+    db.drop_all()
+    db.create_all()
+
+    started = time.perf_counter()
+    for low in range(1, patients + 1, batch_size):
+        high = min(low + batch_size, patients + 1)
+        db.session.execute(Patient.__table__.insert(), [_patient_row(rng, i) for i in range(low, high)])
+        db.session.commit()
+    insert_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    search.install()
+    index_seconds = time.perf_counter() - started
+    print(f"Patient: {patients} 行, 写入 {insert_seconds:.1f}s, 建检索索引 {index_seconds:.1f}s")
+    return {"insertSeconds": insert_seconds, "indexSeconds": index_seconds}
+
+
+# 每类查询从真实数据里取样，保证大部分查询有结果。
+# name_fragment 是名字中间的一两个字：MySQL 的 ngram（默认 2 字）能查到，SQLite 的 trigram 要 3 个字以上，查不到
+CASES = [
+    ('search.name_exact', lambda p, rng: f'/patient/search?q={p.Name}'),
+    ('search.name_prefix', lambda p, rng: f'/patient/search?q={p.Name[:2]}'),
+    ('search.surname', lambda p, rng: f'/patient/search?q={p.Name[0]}'),
+    ('search.name_fragment', lambda p, rng: f'/patient/search?q={p.Name[1:]}'),
+    ('search.phone_prefix', lambda p, rng: f'/patient/search?q={p.Phone[:7]}'),
+    ('search.phone_fragment', lambda p, rng: f'/patient/search?q={p.Phone[rng.randint(3, 6):][:5]}'),
+    ('search.identity_prefix', lambda p, rng: f'/patient/search?q={p.IdentityNo[:10]}'),
+    ('search.identity_exact', lambda p, rng: f'/patient/search?q={p.IdentityNo}'),
+    ('list.surname_like', lambda p, rng: f'/patient?page=1&pageSize=20&surname={p.Name[:2]}'),
+]
+
+
+def run(app, iterations, warmup, only, random_seed):
+    rng = random.Random(random_seed)
+    results = {}
+    with app.app_context():
+        max_id = db.session.query(db.func.max(Patient.PatientID)).scalar() or 0
+        samples = Patient.query.filter(Patient.PatientID.in_(
+            [rng.randint(1, max_id) for _ in range(warmup + iterations)]
+        )).all()
+        db.session.remove()
+    client = app.test_client()
+
+    for name, make in CASES:
+        if only and not any(pattern in name for pattern in only):
+            continue
+        latencies, hits, errors = [], 0, 0
+        for i in range(warmup + iterations):
+            url = make(samples[i % len(samples)], rng)
+            started = time.perf_counter()
+            response = client.get(url)
+            elapsed = time.perf_counter() - started
+            if i < warmup:
+                continue
+            latencies.append(elapsed)
+            if response.status_code >= 500:
+                errors += 1
+            elif response.get_json()['data']['list']:
+                hits += 1
+        results[name] = summarize(latencies, errors=errors)
+        results[name]["hitRatio"] = hits / iterations
+        print(f"{name:24s} p50 {results[name]['p50Ms']:9.2f}ms  p95 {results[name]['p95Ms']:9.2f}ms  "
+              f"有结果 {results[name]['hitRatio']:.0%}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='患者检索压测')
+    parser.add_argument('--uri', default=SEARCH_URI, help='默认 bench/results/search.db')
+    parser.add_argument('--patients', type=int, default=5000000)
+    parser.add_argument('--batch-size', type=int, default=20000)
+    parser.add_argument('--no-reset', action='store_true', help='不重新生成数据，直接测已有的库')
+    parser.add_argument('--iterations', type=int, default=100)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--only', action='append', help='只跑名称包含该字符串的用例，可重复')
+    parser.add_argument('--seed', type=int, default=3170)
+    parser.add_argument('--out', help='结果 JSON 路径，默认写到 bench/results/')
+    args = parser.parse_args()
+
+    app = make_app(args.uri)
+    build_stats = {}
+    if not args.no_reset:
+        with app.app_context():
+            build_stats = build(args.patients, args.batch_size, args.seed)
+    results = run(app, args.iterations, args.warmup, args.only, args.seed)
+
+    out = write_results('search', {
+        "uri": args.uri.split('@')[-1], "patients": args.patients, "iterations": args.iterations,
+        "build": build_stats
+    }, results, args.out)
+    print(f"结果已写入 {out}")
+
+
+if __name__ == '__main__':
+    main()
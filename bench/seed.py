@@ -0,0 +1,152 @@
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from common import DEFAULT_URI, make_app
+
+from app.extensions import db, versions
+from app.models.department import Department
+from app.models.doctor import Doctor
+from app.models.ward import Ward
+from app.models.patient import Patient
+from app.models.admission import Admission
+from app.models.visit import Visit
+from app.utils import rollup, occupancy, search
+
+# 按就诊量推算其余各表的规模，比例参考一家中型医院的门诊/住院数据
+START_DATE = date(2023, 1, 1)
+DAYS = 730
+WARD_CAPACITY = 40
+SURNAMES = '王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗郑梁谢宋唐许韩冯邓曹彭曾肖田董袁潘于蒋蔡余杜叶程苏魏吕丁任沈'
+GIVEN = '伟芳娜敏静丽强磊军洋勇艳杰娟涛明超秀霞平刚桂英华玉兰红梅建国志文海波宇辉'
+TITLES = ['主任医师', '副主任医师', '主治医师', '住院医师']
+COMPLAINTS = ['发热咳嗽三天', '腹痛伴恶心', '头晕乏力一周', '胸闷气短', '腰背疼痛', '皮疹瘙痒', '复诊取药']
+DIAGNOSES = ['上呼吸道感染', '急性胃肠炎', '高血压', '冠心病', '腰椎间盘突出', '湿疹', '2型糖尿病']
+PRESCRIPTIONS = ['阿莫西林 0.5g tid', '奥美拉唑 20mg qd', '硝苯地平 30mg qd', '阿司匹林 100mg qd', '布洛芬 0.3g bid']
+
+
+def scale_for(visits):
+    departments = min(200, max(5, visits // 20000))
+    return {
+        "departments": departments,
+        "doctors": max(20, visits // 500),
+        "wards": departments * 4,
+        "patients": max(100, visits // 4),
+        "admissions": max(10, visits // 20),
+        "visits": visits,
+    }
+
+
+def _name(rng):
+    return rng.choice(SURNAMES) + ''.join(rng.choice(GIVEN) for _ in range(rng.randint(1, 2)))
+
+
+def _insert(model, rows):
+    db.session.execute(model.__table__.insert(), rows)
+
+
+def _insert_batches(model, total, batch_size, make_row, label):
+    started = time.perf_counter()
+    batch = []
+    for i in range(1, total + 1):
+        batch.append(make_row(i))
+        if len(batch) >= batch_size:
+            _insert(model, batch)
+            db.session.commit()
+            batch = []
+    if batch:
+        _insert(model, batch)
+        db.session.commit()
+    print(f"{label}: {total} 行, {time.perf_counter() - started:.1f}s")
+
+
+def seed(visits, batch_size=5000, random_seed=3170, reset=True):
+    rng = random.Random(random_seed)
+    scale = scale_for(visits)
+
+    if reset:
+        db.drop_all()
+    db.create_all()
+
+    _insert_batches(Department, scale["departments"], batch_size, lambda i: {
+        "DeptID": i, "DeptName": f'科室{i:03d}', "Location": f'{(i - 1) // 10 + 1}号楼{(i - 1) % 10 + 1}层'
+    }, 'Department')
+
+    _insert_batches(Doctor, scale["doctors"], batch_size, lambda i: {
+        "DoctorID": i, "Name": _name(rng), "DeptID": rng.randint(1, scale["departments"]),
+        "Title": rng.choice(TITLES), "Phone": f'139{i:08d}'
+    }, 'Doctor')
+
+    _insert_batches(Ward, scale["wards"], batch_size, lambda i: {
+        "WardID": i, "WardName": f'病区{i:03d}', "Floor": (i - 1) % 20 + 1,
+        "Capacity": WARD_CAPACITY, "DeptID": (i - 1) // 4 + 1
+    }, 'Ward')
+
+    _insert_batches(Patient, scale["patients"], batch_size, lambda i: {
+        "PatientID": i, "Name": _name(rng), "Gender": rng.choice(['男', '女']),
+        "BirthDate": date(1940, 1, 1) + timedelta(days=rng.randint(0, 30000)),
+        "IdentityNo": f'{i:018d}', "Phone": f'138{i:08d}'
+    }, 'Patient')
+
+    # 每个病房最多留一半床位给未出院的患者，其余住院记录都已出院
+    open_slots = {ward_id: WARD_CAPACITY // 2 for ward_id in range(1, scale["wards"] + 1)}
+    admission_dates = {}
+
+    def admission_row(i):
+        ward_id = rng.randint(1, scale["wards"])
+        admitted = START_DATE + timedelta(days=rng.randint(0, DAYS - 1))
+        admission_dates[i] = admitted
+        discharged = admitted + timedelta(days=rng.randint(1, 20))
+        if discharged > START_DATE + timedelta(days=DAYS - 1) and open_slots[ward_id] > 0:
+            open_slots[ward_id] -= 1
+            discharged = None
+        return {
+            "AdmissionID": i, "WardID": ward_id, "BedNo": str(rng.randint(1, WARD_CAPACITY)),
+            "AdmissionDate": admitted, "DischargeDate": discharged, "AdmissionReason": rng.choice(DIAGNOSES)
+        }
+
+    _insert_batches(Admission, scale["admissions"], batch_size, admission_row, 'Admission')
+
+    # 约 5% 的就诊关联住院记录，就诊日期取入院当天
+    def visit_row(i):
+        admission_id = rng.randint(1, scale["admissions"]) if rng.random() < 0.05 else None
+        visit_date = admission_dates[admission_id] if admission_id \
+            else START_DATE + timedelta(days=rng.randint(0, DAYS - 1))
+        return {
+            "VisitID": i, "PatientID": rng.randint(1, scale["patients"]), "DoctorID": rng.randint(1, scale["doctors"]),
+            "AdmissionID": admission_id, "VisitDate": visit_date,
+            "Complaint": rng.choice(COMPLAINTS), "Diagnosis": rng.choice(DIAGNOSES),
+            "Prescription": rng.choice(PRESCRIPTIONS), "Fee": round(rng.uniform(20, 2000), 2)
+        }
+
+    _insert_batches(Visit, visits, batch_size, visit_row, 'Visit')
+
+    started = time.perf_counter()
+    doctor_rows, dept_rows = rollup.rebuild()
+    fixed = occupancy.reconcile()
+    search.install()
+    # 数据整体换了一批，已经发出去的 ETag 都要失效
+    versions.bump(Department, Doctor, Ward)
+    db.session.commit()
+    print(f"汇总表 {doctor_rows} + {dept_rows} 行, 占用索引 {fixed} 行, {time.perf_counter() - started:.1f}s")
+    return scale
+
+
+def main():
+    parser = argparse.ArgumentParser(description='生成压测数据')
+    parser.add_argument('--uri', default=DEFAULT_URI, help='数据库连接串，默认 bench/results/bench.db')
+    parser.add_argument('--visits', type=int, default=10000, help='就诊记录数（10k ~ 10M），其余表按比例生成')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=3170, help='随机数种子，相同参数生成相同数据')
+    parser.add_argument('--no-reset', action='store_true', help='不删除已有的表')
+    args = parser.parse_args()
+
+    app = make_app(args.uri)
+    with app.app_context():
+        scale = seed(args.visits, args.batch_size, args.seed, reset=not args.no_reset)
+    print(f"完成: {scale}")
+
+
+if __name__ == '__main__':
+    main()
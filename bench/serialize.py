@@ -0,0 +1,128 @@
+import argparse
+import time
+
+from common import DEFAULT_URI, make_app, summarize, write_results
+from app.extensions import db
+from app.models.doctor import Doctor
+from app.models.patient import Patient
+from app.models.visit import Visit
+from app.routes.visit_routes import VISIT_EXPANSIONS, _expand_visits, _visit_data
+
+# 一页就诊列表从查询结果行到 JSON 响应体的耗时（不含查库），对比：
+#   handwritten + json   —— 原来各路由里逐字段拼 dict（strftime、float 转换）+ Flask 自带的 json
+#   compiled + json      —— app/utils/serializers 生成的序列化函数 + Flask 自带的 json
+#   compiled + orjson    —— 生成的序列化函数 + OrjsonProvider
+# 另外用 test client 跑一遍 GET /visit?pageSize=N 的端到端耗时，两种 JSON_PROVIDER 各一次。
+
+
+# 改造前 visit_routes 里的写法，留作对比基线
+def handwritten_visit_data(visit, expand=()):
+    data = {
+        "VisitID": visit.VisitID,
+        "PatientID": visit.PatientID,
+        "DoctorID": visit.DoctorID,
+        "AdmissionID": visit.AdmissionID,
+        "VisitDate": visit.VisitDate.strftime('%Y-%m-%d'),
+        "Complaint": visit.Complaint,
+        "Diagnosis": visit.Diagnosis,
+        "Prescription": visit.Prescription,
+        "Fee": float(visit.Fee) if visit.Fee is not None else None
+    }
+    if 'patient' in expand:
+        data["Patient"] = {
+            "PatientID": visit.PatientID,
+            "Name": visit.PatientName,
+            "Gender": visit.PatientGender
+        }
+    if 'doctor' in expand:
+        data["Doctor"] = {
+            "DoctorID": visit.DoctorID,
+            "Name": visit.DoctorName,
+            "Title": visit.DoctorTitle,
+            "DeptID": visit.DoctorDeptID,
+            "DeptName": visit.DoctorDeptName
+        }
+    if 'admission' in expand:
+        data["Admission"] = {
+            "AdmissionID": visit.AdmissionID,
+            "WardID": visit.AdmissionWardID,
+            "WardName": visit.AdmissionWardName,
+            "BedNo": visit.AdmissionBedNo,
+            "AdmissionDate": visit.AdmissionDate.strftime('%Y-%m-%d'),
+            "DischargeDate": visit.AdmissionDischargeDate.strftime('%Y-%m-%d') if visit.AdmissionDischargeDate else None
+        } if visit.AdmissionID is not None and visit.AdmissionDate is not None else None
+    return data
+
+
+def _rows(app, count, expand):
+    with app.app_context():
+        query = db.session.query(
+            Visit.VisitID, Visit.PatientID, Visit.DoctorID, Visit.AdmissionID,
+            Visit.VisitDate, Visit.Complaint, Visit.Diagnosis, Visit.Prescription, Visit.Fee
+        ).join(Patient, Visit.PatientID == Patient.PatientID).join(Doctor, Visit.DoctorID == Doctor.DoctorID)
+        # 有住院记录的就诊排前面，保证 admission 展开的分支也被覆盖到
+        return _expand_visits(query, expand).order_by(Visit.AdmissionID.is_(None), Visit.VisitID).limit(count).all()
+
+
+def _time(func, iterations, warmup):
+    latencies = []
+    for i in range(warmup + iterations):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        if i >= warmup:
+            latencies.append(elapsed)
+    return summarize(latencies)
+
+
+def run(uri, count, iterations, warmup):
+    apps = {provider: make_app(uri, JSON_PROVIDER=provider) for provider in ('default', 'orjson')}
+    cases = [
+        ('handwritten + json', handwritten_visit_data, 'default'),
+        ('compiled + json', _visit_data, 'default'),
+        ('compiled + orjson', _visit_data, 'orjson'),
+    ]
+
+    results = {}
+    for label, expand in (('plain', ()), ('expand', VISIT_EXPANSIONS)):
+        rows = _rows(apps['default'], count, expand)
+        for name, serialize, provider in cases:
+            app = apps[provider]
+
+            def render():
+                with app.app_context():
+                    return app.json.response({"code": 200, "data": [serialize(row, expand) for row in rows]}).data
+
+            key = f'{label}: {name}'
+            results[key] = _time(render, iterations, warmup)
+            results[key]["bytes"] = len(render())
+            print(f"{key:28s} p50 {results[key]['p50Ms']:8.2f}ms  p95 {results[key]['p95Ms']:8.2f}ms  "
+                  f"{results[key]['bytes'] / 1024:8.1f} KiB")
+
+    url = f'/visit?page=1&pageSize={count}&expand={",".join(VISIT_EXPANSIONS)}'
+    for provider, app in apps.items():
+        client = app.test_client()
+        key = f'GET /visit: {provider}'
+        results[key] = _time(lambda: client.get(url), iterations, warmup)
+        print(f"{key:28s} p50 {results[key]['p50Ms']:8.2f}ms  p95 {results[key]['p95Ms']:8.2f}ms")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='就诊列表序列化：逐字段拼 dict / 预编译序列化函数，json / orjson')
+    parser.add_argument('--uri', default=DEFAULT_URI)
+    parser.add_argument('--rows', type=int, default=500, help='每页行数')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--out', help='结果 JSON 路径，默认写到 bench/results/')
+    args = parser.parse_args()
+
+    results = run(args.uri, args.rows, args.iterations, args.warmup)
+    out = write_results('serialize', {
+        "uri": args.uri.split('@')[-1], "rows": args.rows, "iterations": args.iterations, "warmup": args.warmup
+    }, results, args.out)
+    print(f"结果已写入 {out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+import argparse
+import http.client
+import multiprocessing
+import os
+import random
+import signal
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import quote
+
+from common import DEFAULT_URI, make_app, summarize, write_results
+from micro import ROUTES, BenchContext
+
+# 通过真实的 HTTP 连接对比开发服务器（run.py 的 app.run）和 gunicorn 多进程部署的吞吐。
+# 压测客户端用多个进程（每个进程若干线程、长连接），避免客户端自己先被 GIL 卡住。
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEV_SERVER = (
+    "import sys; from run import app; "
+    "app.run(host='127.0.0.1', port=int(sys.argv[1]), debug=app.config['DEBUG'], use_reloader=False, threaded=True)"
+)
+
+
+def _urls(uri, count, random_seed):
+    app = make_app(uri)
+    with app.app_context():
+        ctx = BenchContext(app.test_client(), random.Random(random_seed))
+    gets = [make for name, method, make in ROUTES if method == 'GET' and 'export' not in name]
+    return [quote(ctx.rng.choice(gets)(ctx)[0], safe='/?&=,') for _ in range(count)]
+
+
+def _start(server, port, uri, workers, threads):
+    env = dict(os.environ, DATABASE_URI=uri, SLOW_QUERY_THRESHOLD_MS='1000000000', WEB_ACCESS_LOG='')
+    if server == 'dev':
+        env['APP_ENV'] = 'development'
+        cmd = [sys.executable, '-c', DEV_SERVER, str(port)]
+    elif server == 'hypercorn':
+        env['APP_ENV'] = 'production'
+        cmd = [sys.executable, '-m', 'hypercorn', '-c', 'hypercorn.toml', '-w', str(workers),
+               '-b', f'127.0.0.1:{port}', '--access-logfile', os.devnull, 'asgi:app']
+    else:
+        env.update(APP_ENV='production', WEB_WORKERS=str(workers), WEB_THREADS=str(threads))
+        cmd = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '-b', f'127.0.0.1:{port}', 'wsgi:app']
+    process = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/cache/stats')
+            conn.getresponse().read()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f'{server} 服务器 30 秒内没有启动')
+
+
+def _client_thread(port, urls, deadline, out):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    i = 0
+    while time.perf_counter() < deadline:
+        url = urls[i % len(urls)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            conn.request('GET', url)
+            response = conn.getresponse()
+            response.read()
+            out.append((time.perf_counter() - started, response.status))
+        except (OSError, http.client.HTTPException):
+            out.append((time.perf_counter() - started, 599))
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    conn.close()
+
+
+def _client_process(args):
+    port, urls, duration, threads, offset = args
+    deadline = time.perf_counter() + duration
+    out = []
+    workers = [
+        threading.Thread(target=_client_thread, args=(port, urls[offset + i:] + urls[:offset + i], deadline, out))
+        for i in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return out
+
+
+def run_server(server, port, uri, urls, duration, clients, client_threads, workers, threads):
+    process = _start(server, port, uri, workers, threads)
+    try:
+        started = time.perf_counter()
+        with multiprocessing.Pool(clients) as pool:
+            chunks = pool.map(_client_process, [
+                (port, urls, duration, client_threads, i * client_threads) for i in range(clients)
+            ])
+        elapsed = time.perf_counter() - started
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=60)
+
+    records = [record for chunk in chunks for record in chunk]
+    return summarize(
+        [latency for latency, _ in records],
+        elapsed=elapsed,
+        errors=sum(1 for _, status in records if status >= 500)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='开发服务器和 gunicorn 的吞吐对比（只读接口）')
+    parser.add_argument('--uri', default=DEFAULT_URI)
+    parser.add_argument('--server', action='append', choices=['dev', 'gunicorn'], help='默认两个都跑')
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count() * 2 + 1, help='gunicorn 进程数')
+    parser.add_argument('--threads', type=int, default=4, help='gunicorn 每个进程的线程数')
+    parser.add_argument('--clients', type=int, default=4, help='压测客户端进程数')
+    parser.add_argument('--client-threads', type=int, default=8, help='每个客户端进程的并发连接数')
+    parser.add_argument('--duration', type=float, default=15.0)
+    parser.add_argument('--port', type=int, default=5077)
+    parser.add_argument('--seed', type=int, default=3170)
+    parser.add_argument('--out', help='结果 JSON 路径，默认写到 bench/results/')
+    args = parser.parse_args()
+
+    urls = _urls(args.uri, 2000, args.seed)
+    results = {}
+    for server in args.server or ['dev', 'gunicorn']:
+        results[server] = run_server(
+            server, args.port, args.uri, urls, args.duration,
+            args.clients, args.client_threads, args.workers, args.threads
+        )
+        summary = results[server]
+        print(f"{server:9s} {summary['throughputRps']:9.1f} req/s  p50 {summary['p50Ms']:8.2f}ms  "
+              f"p95 {summary['p95Ms']:8.2f}ms  p99 {summary['p99Ms']:8.2f}ms  errors {summary['errors']}")
+
+    out = write_results('serve', {
+        "uri": args.uri.split('@')[-1], "workers": args.workers, "threads": args.threads,
+        "clients": args.clients, "clientThreads": args.client_threads, "duration": args.duration
+    }, results, args.out)
+    print(f"结果已写入 {out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -25,4 +25,13 @@ export function getDoctorWorkload(id, params) {
     method: 'get',
     params
   })
-} 
\ No newline at end of file
+} 
+
+// 获取医师工作量排行榜
+export function getDoctorWorkloadRanking(params) {
+  return request({
+    url: '/doctor/workload',
+    method: 'get',
+    params
+  })
+}
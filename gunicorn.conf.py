@@ -0,0 +1,42 @@
+import multiprocessing
+import os
+
+# gunicorn -c gunicorn.conf.py wsgi:app
+# 进程数/线程数等都可以用环境变量覆盖；每个进程的连接池大小（DB_POOL_SIZE）建议不小于线程数
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('WEB_THREADS', 4))
+worker_class = 'gthread' if threads > 1 else 'sync'
+
+# 主进程先加载应用（导入、建引擎只做一次），再 fork 出 worker
+preload_app = True
+
+timeout = int(os.environ.get('WEB_TIMEOUT', 60))
+# 收到 SIGTERM 后等正在处理的请求结束的时间
+graceful_timeout = int(os.environ.get('WEB_GRACEFUL_TIMEOUT', 30))
+keepalive = 5
+# 定期重启 worker，防止内存慢慢涨上去；加随机抖动避免所有 worker 同时重启
+max_requests = int(os.environ.get('WEB_MAX_REQUESTS', 10000))
+max_requests_jitter = max_requests // 10
+
+# 压测时可以设成空字符串关闭访问日志
+accesslog = os.environ.get('WEB_ACCESS_LOG', '-') or None
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    from app.utils import serving
+    serving.after_fork(worker.app.wsgi())
+
+
+def post_worker_init(worker):
+    # worker 完成初始化、开始 accept 之前
+    from app.utils import serving
+    loaded = serving.warmup(worker.app.wsgi())
+    worker.log.info('预热完成 (pid: %s): %s', worker.pid, loaded)
+
+
+def worker_exit(server, worker):
+    from app.utils import serving
+    serving.shutdown(worker.app.wsgi())
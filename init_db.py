@@ -6,10 +6,51 @@ from app.models.doctor import Doctor
 from app.models.ward import Ward
 from app.models.admission import Admission
 from app.models.visit import Visit
+from app.models.doctor_daily_stats import DoctorDailyStats
+from app.models.dept_daily_stats import DeptDailyStats
+from app.models.id_sequence import IdSequence
+from app.models.ward_occupancy import WardOccupancy
+from app.models.bed_occupancy import BedOccupancy
+from app.models.entity_version import EntityVersion
+from app.utils import search, rollup
+from sqlalchemy import inspect
 
 app = create_app()
 
 with app.app_context():
+    # 记下建表之前已有的表，已有的库新加的汇总表是空的，要从明细表算出来
+    existed = set(inspect(db.engine).get_table_names())
+
     # 创建所有表
     db.create_all()
-    print("数据库表已创建") 
\ No newline at end of file
+    print("数据库表已创建")
+
+    # 汇总表是派生数据：列和模型对不上（比如旧版本 DoctorDailyStats 里的去重计数列）时删掉重建，再从明细表重算
+    inspector = inspect(db.engine)
+    stale = [model for model in (DoctorDailyStats, DeptDailyStats)
+             if {column['name'] for column in inspector.get_columns(model.__tablename__)} != set(model.__table__.columns.keys())]
+    for model in stale:
+        model.__table__.drop(bind=db.engine)
+        model.__table__.create(bind=db.engine)
+        print(f"汇总表 {model.__tablename__} 结构已更新")
+    # 刚建出来的汇总表，或者汇总表是空的而明细表有数据（比如直接往库里导过就诊、住院），同样要重算
+    missing = [model for model in (DoctorDailyStats, DeptDailyStats) if model.__tablename__ not in existed]
+    empty = [(model, source) for model, source in ((DoctorDailyStats, Visit), (DeptDailyStats, Admission))
+             if db.session.query(model).first() is None and db.session.query(source).first() is not None]
+    if stale or missing or empty:
+        rollup.rebuild()
+        print("汇总表已重建")
+
+    # create_all 不会给已存在的表补索引，这里按模型里声明的索引逐个检查补建
+    inspector = inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=db.engine)
+                print(f"已创建索引 {index.name}")
+    print("索引检查完成") 
+
+    # 患者检索用的全文索引不在模型里声明，单独建
+    rows = search.install()
+    print(f"患者检索索引已建好（{rows} 名患者）")
@@ -1,6 +1,9 @@
+import os
 from app import create_app
+from app.config import config_by_name
 
-app = create_app()
+app = create_app(config_by_name[os.environ.get('APP_ENV', 'development')])
 
+# 开发服务器，只在开发环境用；生产环境用 gunicorn -c gunicorn.conf.py wsgi:app
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=app.config['DEBUG'])
\ No newline at end of file
@@ -0,0 +1,65 @@
+import shutil
+import pytest
+from app import create_app
+from app.config import Config
+from app.extensions import db
+from app.utils.routing import replica_binds
+
+
+class TestConfig(Config):
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    TESTING = True
+
+
+@pytest.fixture
+def app():
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+    yield app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+# 两个科室、两名医生、一个病房、五名患者、一条住院记录（AdmissionID=1）
+@pytest.fixture
+def seeded(client):
+    for name, location in (('内科', 'A'), ('外科', 'B')):
+        assert client.post('/department', json={'DeptName': name, 'Location': location}).status_code == 201
+    for name, dept_name in (('张三', '内科'), ('李四', '外科')):
+        assert client.post('/doctor', json={'Name': name, 'DeptName': dept_name, 'Title': '主任'}).status_code == 201
+    assert client.post('/ward', json={'WardName': 'W1', 'Floor': 1, 'Capacity': 10, 'DeptID': 1}).status_code == 201
+    for i in range(5):
+        response = client.post('/patient', json={'Name': f'王{i}', 'Gender': '男', 'IdentityNo': f'{i:018d}', 'Phone': f'1380000{i:04d}'})
+        assert response.status_code == 201
+    response = client.post('/admission', json={'WardID': 1, 'BedNo': '3', 'AdmissionDate': '2024-01-05', 'AdmissionReason': 'x'})
+    assert response.status_code == 200
+    return client
+
+
+# 主库和一个只读副本（都是文件型 SQLite）：建好一个科室、一名医生、一名患者后把主库复制成副本，
+# 之后写入的数据只在主库里，相当于副本一直没同步
+@pytest.fixture
+def replicated(tmp_path):
+    primary, replica = tmp_path / 'primary.db', tmp_path / 'replica.db'
+
+    class ReplicaConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{primary}'
+        SQLALCHEMY_REPLICA_URIS = [f'sqlite:///{replica}']
+        TESTING = True
+
+    app = create_app(ReplicaConfig)
+    with app.app_context():
+        db.create_all()
+    client = app.test_client()
+    assert client.post('/department', json={'DeptName': '内科', 'Location': 'A'}).status_code == 201
+    assert client.post('/doctor', json={'Name': '张三', 'DeptName': '内科'}).status_code == 201
+    assert client.post('/patient', json={'Name': '王0', 'Gender': '男', 'IdentityNo': '0' * 18}).status_code == 201
+    shutil.copyfile(primary, replica)
+    yield app, client
+    # db 是全局的，副本 bind 的 metadata 会留给后面没配置副本的测试，create_all 时找不到这个 bind
+    for key in replica_binds(app.config):
+        db.metadatas.pop(key, None)
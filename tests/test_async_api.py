@@ -0,0 +1,81 @@
+import asyncio
+import pytest
+from app import create_app
+from app.async_api import create_async_app
+from app.config import Config
+from app.extensions import db, stats_cache
+
+URLS = [
+    '/ward/1', '/ward/99',
+    '/admission/active', '/admission/active?wardId=1&DeptId=1&page=1&pageSize=1',
+    '/admission/active?cursor=&pageSize=1', '/admission/active?page=0',
+    '/department/1/stats', '/department/1/stats?startDate=2024-01-01&endDate=2024-06-30',
+    '/department/7/stats', '/department/1/stats?startDate=x',
+    '/visit', '/visit?page=2&pageSize=5&doctorId=1', '/visit?patientId=2&startDate=2024-02-01&endDate=2024-06-30',
+    '/visit?cursor=&pageSize=7&withTotal=1', '/visit?cursor=bad', '/visit?startDate=2024-13-01',
+    '/visit?expand=patient,doctor,admission&pageSize=40', '/visit?cursor=&expand=doctor&pageSize=4',
+    '/visit?expand=x', '/visit?fields=Nope',
+]
+
+
+# 异步版本要连同一个库，用文件型 SQLite
+@pytest.fixture
+def apps(tmp_path):
+    class FileConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'hospital.db'}"
+        TESTING = True
+
+    app = create_app(FileConfig)
+    with app.app_context():
+        db.create_all()
+    client = app.test_client()
+    assert client.post('/department', json={'DeptName': '内科', 'Location': 'A'}).status_code == 201
+    assert client.post('/doctor', json={'Name': '张三', 'DeptName': '内科'}).status_code == 201
+    assert client.post('/ward', json={'WardName': 'W1', 'Floor': 1, 'Capacity': 10, 'DeptID': 1}).status_code == 201
+    for i in range(4):
+        assert client.post('/patient', json={'Name': f'王{i}', 'Gender': '男', 'IdentityNo': f'{i:018d}'}).status_code == 201
+    for bed in ('1', '2'):
+        assert client.post('/admission', json={'WardID': 1, 'BedNo': bed, 'AdmissionDate': '2024-01-05', 'AdmissionReason': 'x'}).status_code == 200
+    # 第一次住院：先是 3 号患者，再是 1 号患者；第二次住院还没有就诊记录
+    items = [{'PatientID': i % 4 + 1, 'DoctorID': 1, 'AdmissionID': None, 'VisitDate': f'2024-{i % 6 + 1:02d}-10',
+              'Complaint': 'c', 'Diagnosis': 'd', 'Prescription': 'p', 'Fee': 10 + i} for i in range(20)]
+    items[2]['AdmissionID'] = items[4]['AdmissionID'] = 1
+    assert client.post('/visit/batch', json=items).json['data']['created'] == 20
+    return client, create_async_app(FileConfig)
+
+
+def test_async_responses_match_flask(apps):
+    client, async_app = apps
+
+    async def compare():
+        async_client = async_app.test_client()
+        for url in URLS:
+            expected = client.get(url)
+            response = await async_client.get(url)
+            assert (response.status_code, await response.get_json()) == (expected.status_code, expected.json), url
+
+    asyncio.run(compare())
+
+
+# 共用查询之后 Flask 版的结果不变：仍按 AdmissionID = PatientID 取患者
+def test_active_admission_result_unchanged(apps):
+    client, _ = apps
+    admissions = client.get('/admission/active').json['data']['list']
+    assert [(row['AdmissionID'], row['PatientID'], row['PatientName']) for row in admissions] == \
+        [(1, 1, '王0'), (2, 2, '王1')]
+
+
+def test_async_department_stats_uses_stats_cache(apps):
+    _, async_app = apps
+    url = '/department/1/stats?startDate=2024-01-01&endDate=2024-06-30'
+
+    async def fetch_twice():
+        async_client = async_app.test_client()
+        first = await (await async_client.get(url)).get_json()
+        second = await (await async_client.get(url)).get_json()
+        return first, second
+
+    first, second = asyncio.run(fetch_twice())
+    assert first == second
+    endpoint = stats_cache.stats()['endpoints']['department_stats']
+    assert (endpoint['misses'], endpoint['hits']) == (1, 1)
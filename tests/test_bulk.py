@@ -0,0 +1,20 @@
+import json
+from app.models.admission import Admission
+
+
+# 引用不存在的病房的行单独报错，其余行照常导入
+def test_bulk_admission_rejects_unknown_ward(app, seeded):
+    rows = [
+        {'WardID': 1, 'BedNo': '7', 'AdmissionDate': '2024-03-01', 'AdmissionReason': 'r'},
+        {'WardID': 99, 'BedNo': '8', 'AdmissionDate': '2024-03-01', 'AdmissionReason': 'r'},
+        {'WardID': 'x', 'BedNo': '9', 'AdmissionDate': '2024-03-01', 'AdmissionReason': 'r'},
+    ]
+    response = seeded.post('/bulk/admission', data='\n'.join(json.dumps(row) for row in rows),
+                           content_type='application/x-ndjson')
+    data = response.json['data']
+    assert (data['inserted'], data['failed']) == (1, 2)
+    assert [(error['line'], error['error'], error['details'][0]['field']) for error in data['errors']] == \
+        [(2, 'PARAM_VALIDATION_FAILED', 'WardID'), (3, 'PARAM_VALIDATION_FAILED', 'WardID')]
+
+    with app.app_context():
+        assert {admission.WardID for admission in Admission.query.all()} == {1}
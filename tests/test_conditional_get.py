@@ -0,0 +1,38 @@
+from app.extensions import db, cache, versions
+from app.models.department import Department
+
+
+# 另一个进程改了科室名称并更新了版本号，本进程的基础数据缓存里还是旧值：
+# 带 ETag 的接口不能用新的 ETag 返回旧内容
+def test_etag_never_pairs_with_stale_cached_row(app, seeded):
+    first = seeded.get('/department/1')
+    assert first.json['data']['DeptName'] == '内科'
+
+    with app.app_context():
+        db.session.query(Department).filter_by(DeptID=1).update({Department.DeptName: '心内科'})
+        versions.bump(Department)
+        db.session.commit()
+
+    second = seeded.get('/department/1', headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 200
+    assert second.headers['ETag'] != first.headers['ETag']
+    assert second.json['data']['DeptName'] == '心内科'
+
+
+def test_cached_row_reused_while_version_unchanged(app, seeded):
+    seeded.get('/department/1')
+    hits = cache.hits
+    response = seeded.get('/department/1')
+    assert response.json['data']['DeptName'] == '内科'
+    assert cache.hits == hits + 1
+
+
+# 预热的条目记着当时的版本号，带 ETag 的接口直接命中，不用再查库
+def test_preloaded_rows_hit_on_conditional_routes(app, seeded):
+    with app.app_context():
+        cache.clear()
+        assert cache.preload(Department, 'DeptName') == 2
+    hits, misses = cache.hits, cache.misses
+    response = seeded.get('/department/1')
+    assert response.json['data']['DeptName'] == '内科'
+    assert (cache.hits, cache.misses) == (hits + 1, misses)
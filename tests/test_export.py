@@ -0,0 +1,59 @@
+import csv
+import io
+import json
+from app.utils.export import export_response
+
+VISIT = {'PatientID': 2, 'DoctorID': 1, 'AdmissionID': None, 'VisitDate': '2024-05-05',
+         'Complaint': 'c', 'Diagnosis': 'd', 'Prescription': 'p', 'Fee': 12.5}
+
+
+def _csv(response):
+    return list(csv.reader(io.StringIO(response.data.decode('utf-8-sig'))))
+
+
+# 区间内没有数据：CSV 只有表头，NDJSON 是空的
+def test_empty_range_exports(seeded):
+    response = seeded.get('/visit/export?format=csv&startDate=2030-01-01&fields=VisitID,VisitDate,Fee')
+    assert response.status_code == 200
+    assert response.headers['Content-Type'] == 'text/csv; charset=utf-8'
+    assert response.headers['Content-Disposition'] == 'attachment; filename="visits.csv"'
+    assert response.data.startswith('\ufeff'.encode('utf-8'))
+    assert _csv(response) == [['VisitID', 'VisitDate', 'Fee']]
+
+    response = seeded.get('/visit/export?format=ndjson&startDate=2030-01-01')
+    assert (response.status_code, response.data) == (200, b'')
+
+    response = seeded.get('/report/revenue/export?format=csv&startDate=2030-01-01&endDate=2030-12-31')
+    assert _csv(response) == [['Date', 'DeptID', 'DeptName', 'DoctorID', 'DoctorName', 'VisitCount', 'Revenue']]
+    response = seeded.get('/report/revenue/export?format=ndjson&startDate=2030-01-01&endDate=2030-12-31')
+    assert (response.status_code, response.data) == (200, b'')
+
+
+# 按 VisitID 顺序导出，空值在 CSV 里是空串、在 NDJSON 里是 null；过滤条件生效
+def test_visit_export_rows(seeded):
+    items = [VISIT, {**VISIT, 'AdmissionID': 1, 'Fee': 3}, {**VISIT, 'DoctorID': 2}]
+    assert seeded.post('/visit/batch', json=items).json['data']['created'] == 3
+
+    fields = 'VisitID,AdmissionID,Fee'
+    rows = _csv(seeded.get(f'/visit/export?fields={fields}&doctorId=1'))
+    assert rows == [['VisitID', 'AdmissionID', 'Fee'], ['1', '', '12.5'], ['2', '1', '3.0']]
+
+    lines = seeded.get(f'/visit/export?format=ndjson&fields={fields}').data.decode('utf-8').splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {'VisitID': 1, 'AdmissionID': None, 'Fee': 12.5},
+        {'VisitID': 2, 'AdmissionID': 1, 'Fee': 3.0},
+        {'VisitID': 3, 'AdmissionID': None, 'Fee': 12.5},
+    ]
+
+    response = seeded.get('/visit/export?format=xml')
+    assert (response.status_code, response.json['error']) == (400, 'INVALID_FORMAT')
+
+
+# 表头单独先发出去，之后每 chunk_rows 行一块，剩下不足一块的最后发
+def test_export_streams_in_chunks(app):
+    rows = [{'ID': i, 'Name': None if i == 3 else f'n{i}'} for i in range(1, 6)]
+    with app.test_request_context('/'):
+        chunks = list(export_response(['ID', 'Name'], lambda: iter(rows), 'csv', 'x', chunk_rows=2).response)
+        assert chunks == ['\ufeffID,Name\r\n', '1,n1\r\n2,n2\r\n', '3,\r\n4,n4\r\n', '5,n5\r\n']
+        chunks = list(export_response(['ID', 'Name'], lambda: iter([]), 'ndjson', 'x', chunk_rows=2).response)
+        assert chunks == ['']
@@ -0,0 +1,65 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app import create_app
+from app.config import Config
+from app.extensions import db
+from app.models.visit import Visit
+from app.utils import ids
+
+VISIT = {'PatientID': 1, 'DoctorID': 1, 'VisitDate': '2024-01-01',
+         'Complaint': 'c', 'Diagnosis': 'd', 'Prescription': 'p', 'Fee': 1}
+
+
+# 号段取得很小，多个线程频繁同时去 IdSequence 预留号段
+@pytest.fixture
+def file_config(tmp_path):
+    class FileConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'hospital.db'}"
+        SQLALCHEMY_ENGINE_OPTIONS = {'connect_args': {'timeout': 30, 'check_same_thread': False}}
+        ID_ALLOCATION = 'hilo'
+        ID_BLOCK_SIZE = 7
+    return FileConfig
+
+
+# 重启后的进程从空的号段分配器开始
+def _start(config, monkeypatch):
+    monkeypatch.setattr(ids, '_hilo', ids.HiLoAllocator())
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def _post_visits(app, count):
+    def work(_):
+        response = app.test_client().post('/visit', json=VISIT)
+        assert response.status_code == 201, response.json
+        return response.json['data']['VisitID']
+
+    with ThreadPoolExecutor(16) as pool:
+        return list(pool.map(work, range(count)))
+
+
+def _visit_ids(app):
+    with app.app_context():
+        return {visit_id for (visit_id,) in db.session.query(Visit.VisitID)}
+
+
+def test_hilo_ids_unique_under_concurrency_and_across_restart(file_config, monkeypatch):
+    app = _start(file_config, monkeypatch)
+    client = app.test_client()
+    assert client.post('/department', json={'DeptName': '内科'}).status_code == 201
+    assert client.post('/doctor', json={'Name': '张三', 'DeptName': '内科'}).status_code == 201
+    assert client.post('/patient', json={'Name': '王五', 'Gender': '男', 'IdentityNo': '1' * 18}).status_code == 201
+
+    first = _post_visits(app, 80)
+    assert len(set(first)) == len(first)
+    assert _visit_ids(app) == set(first)
+
+    # 重启：上一个进程没用完的号段作废，新进程预留的号段不能和已经发出去的重叠
+    restarted = _start(file_config, monkeypatch)
+    second = _post_visits(restarted, 40)
+    assert len(set(second)) == len(second)
+    assert min(second) > max(first)
+    assert _visit_ids(restarted) == set(first) | set(second)
@@ -0,0 +1,69 @@
+import re
+import pytest
+from sqlalchemy import event
+from app.extensions import db
+
+# 明细表和汇总表不允许全表扫描（包括按索引顺序扫完整个索引），科室、医生、病房这类小表不管
+LARGE_TABLES = ('Visit', 'Admission', 'DoctorDailyStats', 'DeptDailyStats')
+FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?(%s)\b' % '|'.join(LARGE_TABLES))
+INDEX_SEARCH = re.compile(r'^SEARCH (?:TABLE )?(%s) USING (?:COVERING )?INDEX' % '|'.join(LARGE_TABLES))
+
+RANGE = 'startDate=2024-01-01&endDate=2024-06-30'
+ENDPOINTS = [
+    '/visit?doctorId=1',
+    '/visit?patientId=2',
+    f'/visit?{RANGE}',
+    f'/visit?doctorId=1&{RANGE}',
+    f'/doctor/1/workload?{RANGE}',
+    f'/doctor/workload?{RANGE}',
+    f'/department/1/stats?{RANGE}',
+    f'/department/stats?{RANGE}',
+    f'/report/revenue?{RANGE}',
+    f'/report/revenue?{RANGE}&groupBy=dept',
+    f'/report/revenue?{RANGE}&granularity=week&groupBy=doctor',
+    '/admission/active',
+    '/admission/active?wardId=1',
+]
+
+
+@pytest.fixture
+def visits(seeded):
+    items = [{'PatientID': i % 5 + 1, 'DoctorID': i % 2 + 1, 'AdmissionID': 1 if i % 7 == 0 else None,
+              'VisitDate': f'2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}', 'Complaint': 'c', 'Diagnosis': 'd',
+              'Prescription': 'p', 'Fee': 10 + i} for i in range(60)]
+    assert seeded.post('/visit/batch', json=items).json['data']['created'] == 60
+    return seeded
+
+
+# 记下接口执行的每条 SELECT 和参数，之后用 EXPLAIN QUERY PLAN 看 SQLite 打算怎么执行
+def _capture(app, client, url):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and 'EntityVersion' not in statement:
+            statements.append((statement, parameters))
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        assert client.get(url).status_code == 200
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+    return statements
+
+
+@pytest.mark.parametrize('url', ENDPOINTS)
+def test_endpoint_queries_use_indexes(app, visits, url):
+    statements = _capture(app, visits, url)
+    assert statements
+
+    searched = []
+    with app.app_context():
+        connection = db.session.connection()
+        for statement, parameters in statements:
+            plan = [row[-1] for row in connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters)]
+            scans = [line for line in plan if FULL_SCAN.match(line)]
+            assert not scans, f'{url}: {statement}\n' + '\n'.join(plan)
+            searched += [line for line in plan if INDEX_SEARCH.match(line)]
+    assert searched, url
@@ -0,0 +1,34 @@
+import pytest
+from flask import g
+from sqlalchemy.exc import OperationalError
+from app.extensions import db, instrumentation
+
+
+# 出错的语句没有 after_cursor_execute，不能在连接上留下开始时间，也不能算到后面语句的耗时里
+def test_failed_statement_leaves_no_timing_state(app):
+    with app.test_request_context('/'):
+        instrumentation._before_request()
+        connection = db.session.connection()
+        info = dict(connection.info)
+
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                connection.exec_driver_sql('SELECT * FROM NoSuchTable')
+        connection.exec_driver_sql('SELECT 1')
+
+        assert dict(connection.info) == info
+        assert g.sql_stats.statements == 1
+        db.session.rollback()
+
+
+# 查询的 rowcount 是 -1，行数要按实际取回的行数算；写语句按影响的行数算
+def test_rows_counts_fetched_and_affected_rows(app, seeded):
+    instrumentation.reset()
+    assert seeded.get('/patient?pageSize=3').status_code == 200
+    assert seeded.put('/patient/1', json={'Name': '王九'}).status_code == 200
+    endpoints = instrumentation.snapshot()
+    # 一页 3 行 + count(*) 1 行
+    assert endpoints['patient.get_patients']['rows'] == 4
+    # 查患者 1 行 + UPDATE 1 行 + 提交后重新加载 1 行
+    assert endpoints['patient.update_patient']['rows'] == 3
+    assert 'hospital_db_rows_total{endpoint="patient.get_patients"} 4' in seeded.get('/metrics').text
@@ -0,0 +1,51 @@
+from app.utils.pagination import encode_cursor
+
+VISIT = {'PatientID': 2, 'DoctorID': 1, 'AdmissionID': None, 'VisitDate': '2024-05-05',
+         'Complaint': 'c', 'Diagnosis': 'd', 'Prescription': 'p', 'Fee': 10}
+
+
+# 按 cursor 一页页往下翻，返回每页的 ID 和最后一页的 nextCursor
+def _walk(client, url, key, page_size, **args):
+    pages, cursor = [], ''
+    while cursor is not None:
+        data = client.get(url, query_string={**args, 'cursor': cursor, 'pageSize': page_size}).json['data']
+        pages.append([row[key] for row in data['list']])
+        cursor = data['nextCursor']
+        assert len(pages) <= 20
+    return pages
+
+
+# /patient 按 PatientID 倒序：最后一页不多不少时 nextCursor 为空，不会多出一个空页
+def test_patient_cursor_pages_descending(seeded):
+    assert _walk(seeded, '/patient', 'PatientID', 2) == [[5, 4], [3, 2], [1]]
+    assert _walk(seeded, '/patient', 'PatientID', 5) == [[5, 4, 3, 2, 1]]
+    assert _walk(seeded, '/patient', 'PatientID', 6) == [[5, 4, 3, 2, 1]]
+
+
+# 就诊日期、医生、患者都相同的记录按 VisitID 排，翻页不重复也不遗漏；过滤条件在每页都生效
+def test_visit_cursor_breaks_ties_on_primary_key(seeded):
+    items = [VISIT] * 7 + [{**VISIT, 'DoctorID': 2}] * 3
+    assert seeded.post('/visit/batch', json=items).json['data']['created'] == 10
+
+    pages = _walk(seeded, '/visit', 'VisitID', 3, doctorId=1)
+    assert pages == [[1, 2, 3], [4, 5, 6], [7]]
+    pages = _walk(seeded, '/visit', 'VisitID', 4)
+    assert sum(pages, []) == list(range(1, 11))
+
+
+# cursor 指向的那一行被删掉了也照样从它后面接着翻
+def test_cursor_survives_deleted_boundary_row(seeded):
+    first = seeded.get('/patient?cursor=&pageSize=2').json['data']
+    assert [row['PatientID'] for row in first['list']] == [5, 4]
+    assert seeded.delete('/patient/4').status_code == 204
+    second = seeded.get('/patient', query_string={'cursor': first['nextCursor'], 'pageSize': 2}).json['data']
+    assert [row['PatientID'] for row in second['list']] == [3, 2]
+
+
+# 只有 withTotal=1 才统计总数；cursor 解不出整数主键时返回 400
+def test_total_and_invalid_cursor(seeded):
+    assert 'total' not in seeded.get('/patient?cursor=').json['data']
+    assert seeded.get('/patient?cursor=&withTotal=1&surname=王').json['data']['total'] == 5
+    for token in ('bad', encode_cursor('3'), encode_cursor(True)):
+        response = seeded.get('/patient', query_string={'cursor': token})
+        assert (response.status_code, response.json['error']) == (400, 'INVALID_CURSOR')
@@ -0,0 +1,57 @@
+VISIT = {'PatientID': 2, 'DoctorID': 1, 'AdmissionID': None,
+         'Complaint': 'c', 'Diagnosis': 'd', 'Prescription': 'p'}
+
+
+def _add_visits(client, *visits):
+    items = [{**VISIT, 'VisitDate': day, 'Fee': fee, 'DoctorID': doctor} for day, fee, doctor in visits]
+    assert client.post('/visit/batch', json=items).json['data']['created'] == len(items)
+
+
+def _report(client, **args):
+    response = client.get('/report/revenue', query_string=args)
+    assert response.status_code == 200
+    return [(row['Period'], row['StartDate'], row['EndDate'], row['Revenue']) for row in response.json['data']['Details']]
+
+
+# 周从周一开始、按 ISO 周编号：跨年的那一周属于 2025-W01；首尾两个分桶按 startDate / endDate 截断，没有收入的补 0
+def test_week_buckets_across_year_boundary(seeded):
+    _add_visits(seeded, ('2024-12-29', 1, 1), ('2024-12-30', 10, 1), ('2025-01-05', 100, 1), ('2025-01-06', 1000, 1))
+
+    assert _report(seeded, granularity='week', startDate='2024-12-25', endDate='2025-01-05') == [
+        ('2024-W52', '2024-12-25', '2024-12-29', 1.0),
+        ('2025-W01', '2024-12-30', '2025-01-05', 110.0),
+    ]
+    assert _report(seeded, granularity='week', startDate='2024-12-30', endDate='2025-01-13') == [
+        ('2025-W01', '2024-12-30', '2025-01-05', 110.0),
+        ('2025-W02', '2025-01-06', '2025-01-12', 1000.0),
+        ('2025-W03', '2025-01-13', '2025-01-13', 0.0),
+    ]
+
+
+# 季度的最后一天和下一季度的第一天分到不同的桶
+def test_quarter_bucket_edges(seeded):
+    _add_visits(seeded, ('2024-03-31', 1, 1), ('2024-04-01', 10, 1), ('2024-06-30', 100, 1), ('2024-07-01', 1000, 1))
+
+    assert _report(seeded, granularity='quarter', startDate='2024-02-15', endDate='2024-10-01') == [
+        ('2024-Q1', '2024-02-15', '2024-03-31', 1.0),
+        ('2024-Q2', '2024-04-01', '2024-06-30', 110.0),
+        ('2024-Q3', '2024-07-01', '2024-09-30', 1000.0),
+        ('2024-Q4', '2024-10-01', '2024-10-01', 0.0),
+    ]
+    # 已经结束的分桶第二次走缓存，结果一样
+    assert _report(seeded, granularity='quarter', startDate='2024-04-01', endDate='2024-06-30') == [
+        ('2024-Q2', '2024-04-01', '2024-06-30', 110.0),
+    ]
+
+
+# groupBy=dept：每个分桶里每个出现过的科室都有一行，没有收入的补 0
+def test_group_by_dept_zero_fills(seeded):
+    _add_visits(seeded, ('2024-01-31', 5, 1), ('2024-02-01', 7, 2))
+
+    response = seeded.get('/report/revenue?granularity=month&groupBy=dept&startDate=2024-01-01&endDate=2024-02-29')
+    data = response.json['data']
+    assert [(row['Period'], row['DeptID'], row['DeptName'], row['VisitCount'], row['Revenue']) for row in data['Details']] == [
+        ('2024-01', 1, '内科', 1, 5.0), ('2024-01', 2, '外科', 0, 0.0),
+        ('2024-02', 1, '内科', 0, 0.0), ('2024-02', 2, '外科', 1, 7.0),
+    ]
+    assert data['Total'] == 12
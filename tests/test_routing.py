@@ -0,0 +1,44 @@
+from app.utils.routing import STICKY_COOKIE
+
+PATIENT = {'Name': '王1', 'Gender': '男', 'IdentityNo': '1' * 18}
+
+
+# GET 走副本：主库里新写的患者在副本上还查不到
+def test_get_is_served_from_replica(replicated):
+    app, writer = replicated
+    assert writer.post('/patient', json=PATIENT).status_code == 201
+
+    reader = app.test_client()
+    response = reader.get('/patient/1')
+    assert (response.status_code, response.headers['X-DB-Route']) == (200, 'replica_0')
+    response = reader.get('/patient/2')
+    assert (response.status_code, response.headers['X-DB-Route']) == (404, 'replica_0')
+
+
+# 写成功之后带着 cookie 的读请求留在主库，能读到刚写的数据；写请求本身也在主库
+def test_client_sticks_to_primary_after_write(replicated):
+    app, _ = replicated
+    client = app.test_client()
+    response = client.post('/patient', json=PATIENT)
+    assert (response.status_code, response.headers['X-DB-Route']) == (201, 'primary')
+    assert STICKY_COOKIE in response.headers.get('Set-Cookie', '')
+
+    response = client.get('/patient/2')
+    assert (response.status_code, response.headers['X-DB-Route']) == (200, 'primary')
+
+    # 失败的写不会让客户端粘在主库
+    other = app.test_client()
+    response = other.post('/patient', json={})
+    assert response.status_code == 400
+    assert 'Set-Cookie' not in response.headers
+    assert other.get('/patient/1').headers['X-DB-Route'] == 'replica_0'
+
+
+# 没配置副本时一切走主库，不加路由头也不写 cookie
+def test_without_replicas_everything_uses_primary(seeded):
+    response = seeded.post('/patient', json=PATIENT)
+    assert response.status_code == 201
+    assert 'Set-Cookie' not in response.headers
+    response = seeded.get('/patient/6')
+    assert response.status_code == 200
+    assert 'X-DB-Route' not in response.headers
@@ -0,0 +1,33 @@
+def _search(client, q, limit=20):
+    response = client.get('/patient/search', query_string={'q': q, 'limit': limit})
+    assert response.status_code == 200
+    return [(row['Name'], row['MatchedOn']) for row in response.json['data']['list']]
+
+
+# 库是 db.create_all() 建的，全文索引随 Patient 表一起建好，片段查询不会报 no such table
+def test_fragment_search_on_create_all_database(seeded):
+    assert _search(seeded, '0001') == [('王1', 'IdentityNo')]
+
+
+# 完全相同 > 前缀（短的在前）> 片段
+def test_ranking_and_matched_field(seeded):
+    for i, name in enumerate(('王陈小明', '陈小明亮', '陈小明')):
+        response = seeded.post('/patient', json={'Name': name, 'Gender': '男', 'IdentityNo': f'1{i:017d}'})
+        assert response.status_code == 201
+
+    assert _search(seeded, '陈小明') == [('陈小明', 'Name'), ('陈小明亮', 'Name'), ('王陈小明', 'Name')]
+    assert _search(seeded, '陈小明', limit=2) == [('陈小明', 'Name'), ('陈小明亮', 'Name')]
+    # 手机号完全相同就不再查片段
+    assert _search(seeded, '13800000003') == [('王3', 'Phone')]
+    assert _search(seeded, '1380000000') == [(f'王{i}', 'Phone') for i in range(5)]
+
+
+# 改名、删除之后全文索引由触发器同步
+def test_fragment_index_follows_updates(seeded):
+    assert seeded.put('/patient/2', json={'Name': '赵钱孙李'}).status_code == 200
+    assert _search(seeded, '钱孙李') == [('赵钱孙李', 'Name')]
+    assert seeded.put('/patient/2', json={'Name': '周吴郑王'}).status_code == 200
+    assert _search(seeded, '钱孙李') == []
+    assert _search(seeded, '吴郑王') == [('周吴郑王', 'Name')]
+    assert seeded.delete('/patient/2').status_code == 204
+    assert _search(seeded, '吴郑王') == []
@@ -0,0 +1,51 @@
+from app.utils import rollup
+from app.utils.stats_cache import StatsCache
+
+VISIT = {'PatientID': 2, 'DoctorID': 1, 'AdmissionID': None, 'VisitDate': '2024-05-05',
+         'Complaint': 'c', 'Diagnosis': 'd', 'Prescription': 'p', 'Fee': 10}
+STATS_URL = '/department/1/stats?startDate=2024-05-01&endDate=2024-05-31'
+REVENUE_URL = '/report/revenue?startDate=2024-05-01&endDate=2024-05-31&deptId=1'
+
+
+def _revenue(client):
+    return client.get(STATS_URL).json['data'][0]['totalRevenue'], \
+        client.get(REVENUE_URL).json['data']['Details'][0]['Revenue']
+
+
+# 另一个 worker 补录了旧日期的就诊：本进程的缓存没被清，但数据库里的代数变了，下次读要重新查库
+def test_backdated_write_in_other_worker_invalidates_cache(app, seeded, monkeypatch):
+    assert seeded.post('/visit', json=VISIT).status_code == 201
+    assert _revenue(seeded) == (10, 10.0)
+    assert _revenue(seeded) == (10, 10.0)
+
+    monkeypatch.setattr(rollup, 'stats_cache', StatsCache())
+    assert seeded.post('/visit', json={**VISIT, 'VisitDate': '2024-05-06', 'Fee': 5}).status_code == 201
+    monkeypatch.undo()
+
+    assert _revenue(seeded) == (15, 15.0)
+
+
+# 本进程的补录只清掉受影响的条目，其他条目换成新代数后仍然命中
+def test_own_backdated_write_keeps_unrelated_entries(app, seeded):
+    from app.extensions import stats_cache
+
+    assert seeded.post('/visit', json=VISIT).status_code == 201
+    other_url = '/department/2/stats?startDate=2024-05-01&endDate=2024-05-31'
+    seeded.get(other_url)
+    assert seeded.post('/visit', json={**VISIT, 'VisitDate': '2024-05-06'}).status_code == 201
+
+    seeded.get(other_url)
+    endpoint = stats_cache.stats()['endpoints']['department_stats']
+    assert (endpoint['misses'], endpoint['hits']) == (1, 1)
+
+
+# 副本落后于主库时，已经结束的区间写回缓存的数据要从主库读
+def test_closed_period_fill_reads_primary(replicated):
+    app, writer = replicated
+    assert writer.post('/visit', json={**VISIT, 'PatientID': 1}).status_code == 201
+
+    reader = app.test_client()
+    response = reader.get(STATS_URL)
+    assert response.headers['X-DB-Route'] == 'replica_0'
+    assert response.json['data'][0]['totalRevenue'] == 10
+    assert reader.get(REVENUE_URL).json['data']['Details'][0]['Revenue'] == 10.0
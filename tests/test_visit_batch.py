@@ -0,0 +1,33 @@
+from app.models.doctor_daily_stats import DoctorDailyStats
+from app.utils import rollup, occupancy
+
+VISIT = {'PatientID': 2, 'DoctorID': 1, 'AdmissionID': 1, 'VisitDate': '2024-05-05',
+         'Complaint': 'c', 'Diagnosis': 'd', 'Prescription': 'p', 'Fee': 12.5}
+
+
+def _daily_stats():
+    return sorted((row.StatDate, row.DoctorID, row.VisitCount, float(row.FeeSum))
+                  for row in DoctorDailyStats.query.all())
+
+
+# 同一批里有同一天、同一医生、同一患者 / 住院记录的多条就诊，汇总表和占用索引要和按明细重算的结果一致
+def test_batch_rollup_matches_rebuild(app, seeded):
+    items = [
+        VISIT,
+        VISIT,
+        {**VISIT, 'AdmissionID': None},
+        {**VISIT, 'PatientID': 3},
+        {**VISIT, 'DoctorID': 2},
+        {**VISIT, 'VisitDate': '2024-05-06', 'Fee': 30},
+        {**VISIT, 'PatientID': 999},
+    ]
+    response = seeded.post('/visit/batch', json=items)
+    assert response.status_code == 200
+    data = response.json['data']
+    assert (data['created'], data['failed']) == (6, 1)
+
+    with app.app_context():
+        incremental = _daily_stats()
+        rollup.rebuild()
+        assert _daily_stats() == incremental
+        assert occupancy.reconcile() == 0
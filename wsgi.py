@@ -0,0 +1,6 @@
+import os
+from app import create_app
+from app.config import config_by_name
+
+# 生产环境入口：gunicorn -c gunicorn.conf.py wsgi:app
+app = create_app(config_by_name[os.environ.get('APP_ENV', 'production')])